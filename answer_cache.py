@@ -0,0 +1,216 @@
+"""
+Gemini yanıtları için önbellek.
+Anahtar; model adı, normalize edilmiş soru, bulunan bağlamın özeti ve üretim
+ayarlarından oluşur. Bellekte LRU katmanı ve isteğe bağlı SQLite katmanı vardır.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from retrieval import tokenize
+
+
+def normalize_question(question):
+    """
+    Soruyu önbellek anahtarı için normalize eder (büyük/küçük harf, noktalama, boşluk).
+
+    Args:
+        question: Kullanıcı sorusu
+
+    Returns:
+        str: Normalize edilmiş soru
+    """
+    return " ".join(tokenize(question))
+
+
+def make_key(model_name, question, context, generation_config, history=""):
+    """
+    Yanıt önbelleği anahtarını hesaplar.
+
+    Args:
+        model_name: Gemini model adı
+        question: Kullanıcı sorusu
+        context: Prompt'a eklenen belge bağlamı
+        generation_config: Üretim ayarları (dict)
+        history: Prompt'a eklenen sohbet geçmişi ve özeti; "bunu daha ayrıntılı anlat"
+            gibi bağlama bağlı sorular başka bir konuşmanın yanıtını almaz
+
+    Returns:
+        str: SHA-256 özeti (hex)
+    """
+    context_hash = hashlib.sha256(context.encode("utf-8")).hexdigest()
+    history_hash = hashlib.sha256(history.encode("utf-8")).hexdigest()
+    material = json.dumps(
+        [model_name, normalize_question(question), context_hash, history_hash, generation_config],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """
+    TTL'li, boyut sınırlı iki katmanlı yanıt önbelleği.
+    """
+
+    def __init__(self, max_entries=256, ttl_seconds=86400, db_path=None):
+        """
+        Args:
+            max_entries: Bellekte tutulacak en fazla yanıt (kalıcı katman için de sınır)
+            ttl_seconds: Yanıtların geçerlilik süresi
+            db_path: Kalıcı katman için SQLite dosyası (None = yalnızca bellek)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._memory = OrderedDict()  # anahtar -> (yanıt, oluşturulma_zamanı)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS answers ("
+                    "key TEXT PRIMARY KEY, answer TEXT NOT NULL, created REAL NOT NULL)"
+                )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # Bağlantı işlem (transaction) sonunda kapatılır
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _expired(self, created):
+        return self.ttl_seconds > 0 and time.time() - created > self.ttl_seconds
+
+    def _remember(self, key, answer, created):
+        self._memory[key] = (answer, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Önbellekteki yanıtı döndürür.
+
+        Args:
+            key: make_key ile hesaplanan anahtar
+
+        Returns:
+            str | None: Yanıt (yoksa veya süresi dolduysa None)
+        """
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                answer, created = item
+                if not self._expired(created):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return answer
+                del self._memory[key]
+
+        if self.db_path:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT answer, created FROM answers WHERE key = ?", (key,)
+                ).fetchone()
+            if row and not self._expired(row[1]):
+                with self._lock:
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                return row[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, answer):
+        """
+        Yanıtı önbelleğe yazar.
+
+        Args:
+            key: make_key ile hesaplanan anahtar
+            answer: Model yanıtı
+        """
+        created = time.time()
+        with self._lock:
+            self._remember(key, answer, created)
+
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO answers (key, answer, created) VALUES (?, ?, ?)",
+                    (key, answer, created),
+                )
+                # Süresi dolanları ve sınırı aşan en eski kayıtları temizle
+                if self.ttl_seconds > 0:
+                    conn.execute("DELETE FROM answers WHERE created < ?", (created - self.ttl_seconds,))
+                conn.execute(
+                    "DELETE FROM answers WHERE key NOT IN "
+                    "(SELECT key FROM answers ORDER BY created DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+
+    def stats(self):
+        """
+        İsabet/ıskalama sayaçlarını döndürür.
+
+        Returns:
+            dict: hits, misses, disk_hits, entries, hit_rate
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._memory),
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """
+    Ortam değişkenlerine göre yapılandırılmış süreç geneli yanıt önbelleğini döndürür.
+
+    ANSWER_CACHE_SIZE (varsayılan 256, 0 = kapalı), ANSWER_CACHE_TTL (saniye,
+    varsayılan 86400) ve ANSWER_CACHE_DB (boşsa yalnızca bellek) kullanılır.
+
+    Returns:
+        AnswerCache | None: Önbellek (kapalıysa None)
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                size = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+                ttl = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+            except ValueError:
+                size, ttl = 256, 86400.0
+            if size <= 0:
+                return None
+            _default_cache = AnswerCache(size, ttl, os.getenv("ANSWER_CACHE_DB") or None)
+        return _default_cache
+
+
+__all__ = ["normalize_question", "make_key", "AnswerCache", "get_answer_cache"]
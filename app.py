@@ -3,14 +3,18 @@ PDF Belge Asistanı - Google Gemini Edition (Optimize Edilmiş)
 Kullanıcıların PDF dosyası yükleyip sorular sorabileceği bir Streamlit uygulaması.
 """
 
+import time
+
+_import_started = time.perf_counter()
+
 import streamlit as st
-from PyPDF2 import PdfReader
-import google.generativeai as genai
 import os
 from dotenv import load_dotenv
-import json
 from datetime import datetime
-import time
+import contextlib
+import itertools
+import re
+import uuid
 
 # Ortam değişkenlerini yükle
 load_dotenv()
@@ -23,6 +27,27 @@ st.set_page_config(
 )
 
 from i18n import get_translation
+from retrieval import RETRIEVAL_MODES, default_retrieval_mode
+from answer_cache import get_answer_cache
+from rate_limit import get_rate_limiter, max_retries_setting
+from doc_cache import document_key, get_document_cache
+from doc_registry import file_key, get_document_registry, shared_document
+from pdf_pipeline import default_worker_count, large_pdf_max_mb, max_upload_mb, spool_to_file
+from metrics import get_metrics
+from corpus import Corpus
+from context_packer import get_estimator
+from chat_export import iter_export
+from chat_store import open_chat_history
+from ingest import get_ingest_queue
+from model_pool import get_model_pool, warm_up_from_env
+from qa import GENERATION_CONFIG, get_gemini_response, process_document, process_large_document
+from warmup import prewarm_enabled, prewarm_imports, record_import
+
+# İlk sayfa açılışındaki yükleme süresi (süreç başına bir kez kaydedilir; Gemini SDK'sı
+# ve PyPDF2 burada yüklenmez, ilk kullanımda veya arka plan ısıtmasında yüklenir)
+record_import("app", time.perf_counter() - _import_started, get_metrics())
+if prewarm_enabled():
+    prewarm_imports(metrics=get_metrics())
 
 
 def t(key, **kwargs):
@@ -35,493 +60,807 @@ st.title(t("title"))
 st.markdown(t("description"))
 
 
-def extract_text_from_pdf(pdf_file):
+def initialize_gemini(model_name, api_key):
     """
-    PDF dosyasından metin çıkarır.
+    Google Gemini modelini süreç geneli havuzdan alır (yoksa oluşturur).
     
     Args:
-        pdf_file: Yüklenen PDF dosyası
+        model_name: Kullanılacak Gemini model adı
+        api_key: Google API anahtarı
         
     Returns:
-        tuple: (metin, sayfa_sayısı)
+        GenerativeModel: Yapılandırılmış Gemini modeli
     """
     try:
-        pdf_reader = PdfReader(pdf_file)
-        text = ""
-        page_count = len(pdf_reader.pages)
-        
-        for page_num, page in enumerate(pdf_reader.pages, 1):
-            page_text = page.extract_text()
-            if page_text.strip():  # Boş sayfaları atla
-                text += f"\n--- Sayfa {page_num} ---\n{page_text}"
-        
-        return text, page_count
+        return get_model_pool().get(model_name, api_key, GENERATION_CONFIG)
     except Exception as e:
-        st.error(f"PDF okunurken hata oluştu: {str(e)}")
-        return None, 0
+        st.error(f"Model başlatılırken hata: {str(e)}")
+        return None
 
 
-def get_text_stats(text):
+def chat_render_window():
     """
-    Metin istatistiklerini hesaplar.
-    
-    Args:
-        text: Analiz edilecek metin
-        
+    CHAT_RENDER_WINDOW ortam değişkenini okur (varsayılan 40).
+
     Returns:
-        dict: Karakter ve kelime sayısı
+        int: Her yeniden çalıştırmada çizilecek en fazla son mesaj
     """
-    word_count = len(text.split())
-    char_count = len(text)
-    return {"words": word_count, "characters": char_count}
+    try:
+        return max(1, int(os.getenv("CHAT_RENDER_WINDOW", "40")))
+    except ValueError:
+        return 40
 
 
-def chunk_text(text, max_chars=3000):
+def render_message(message):
     """
-    Metni küçük parçalara böler (token tasarrufu için).
-    
+    Bir sohbet mesajını ve bilgi satırlarını çizer.
+
     Args:
-        text: Bölünecek metin
-        max_chars: Maksimum karakter sayısı
-        
-    Returns:
-        list: Metin parçaları
+        message: {"role", "content", ...} mesaj sözlüğü
     """
-    chunks = []
-    current_chunk = ""
-    
-    for line in text.split('\n'):
-        if len(current_chunk) + len(line) < max_chars:
-            current_chunk += line + '\n'
-        else:
-            if current_chunk:
-                chunks.append(current_chunk)
-            current_chunk = line + '\n'
-    
-    if current_chunk:
-        chunks.append(current_chunk)
-    
-    return chunks
+    with st.chat_message(message["role"]):
+        st.markdown(message["content"])
+        if message.get("cached"):
+            st.caption(t("answer_from_cache"))
+        if message.get("ttft") is not None:
+            st.caption(t("time_to_first_token", seconds=f"{message['ttft']:.2f}"))
+        if message.get("usage"):
+            st.caption(t("token_counts", **message["usage"]))
 
 
-def search_relevant_chunks(chunks, query, top_k=2):
+def profiled(profiler, label):
     """
-    Soruyla ilgili en alakalı metin parçalarını bulur (basit keyword arama).
-    
+    Profil modu açıksa bloğu profiller; kapalıysa hiçbir şey yapmaz.
+
     Args:
-        chunks: Metin parçaları listesi
-        query: Kullanıcı sorusu
-        top_k: Kaç parça döndürülecek
-        
+        profiler: SessionProfiler (profil modu kapalıysa None)
+        label: Kayıt etiketi
+
     Returns:
-        str: Birleştirilmiş alakalı metin parçaları
+        Bağlam yöneticisi
     """
-    query_words = set(query.lower().split())
-    
-    # Her chunk için skor hesapla
-    scored_chunks = []
-    for chunk in chunks:
-        chunk_words = set(chunk.lower().split())
-        score = len(query_words & chunk_words)  # Ortak kelime sayısı
-        scored_chunks.append((score, chunk))
-    
-    # En yüksek skorlu parçaları al
-    scored_chunks.sort(reverse=True, key=lambda x: x[0])
-    relevant_chunks = [chunk for score, chunk in scored_chunks[:top_k] if score > 0]
-    
-    # Eğer hiç eşleşme yoksa ilk chunk'ı döndür
-    if not relevant_chunks and chunks:
-        relevant_chunks = [chunks[0]]
-    
-    return '\n\n'.join(relevant_chunks)
+    return profiler.capture(label) if profiler else contextlib.nullcontext()
 
 
-def initialize_gemini(model_name, api_key):
+def build_chat_export(history, key):
     """
-    Google Gemini modelini başlatır.
-    
+    Sohbetin TXT ve JSON dışa aktarımını üretir.
+
+    Mesajlar veritabanından sayfa sayfa okunur ve parça parça kodlanır; yalnızca
+    indirme düğmesinin istediği bayt dizileri bellekte tutulur.
+
     Args:
-        model_name: Kullanılacak Gemini model adı
-        api_key: Google API anahtarı
-        
+        history: ChatHistory
+        key: Dışa aktarımın geçerli olduğu (oturum kimliği, mesaj sayısı)
+
     Returns:
-        GenerativeModel: Yapılandırılmış Gemini modeli
+        dict: key, stamp (dosya adı zamanı), txt ve json baytları
     """
-    try:
-        genai.configure(api_key=api_key)
-        # Model adına "models/" prefix'i ekle
-        full_model_name = f"models/{model_name}" if not model_name.startswith("models/") else model_name
-        
-        # Optimized generation config
-        generation_config = {
-            "temperature": 0.7,
-            "top_p": 0.95,
-            "top_k": 40,
-            "max_output_tokens": 2048,  # Çıkış token limiti
-        }
-        
-        model = genai.GenerativeModel(
-            full_model_name,
-            generation_config=generation_config
-        )
-        return model
-    except Exception as e:
-        st.error(f"Model başlatılırken hata: {str(e)}")
-        return None
+    now = datetime.now()
+    return {
+        "key": key,
+        "stamp": now.strftime('%Y%m%d_%H%M%S'),
+        "txt": b"".join(part.encode("utf-8") for part in iter_export(history.iter_all(), "txt", now)),
+        "json": b"".join(part.encode("utf-8") for part in iter_export(history.iter_all(), "json", now)),
+    }
 
 
-def get_gemini_response(model, prompt, pdf_chunks, chat_history):
+def resume_session(code):
     """
-    Gemini'den yanıt alır (Optimize Edilmiş - Daha Az Token).
-    
+    Devam koduyla önceki bir oturumun sohbetini açar; yüklü belgeler korunur.
+
     Args:
-        model: Gemini model instance
-        prompt: Kullanıcı sorusu
-        pdf_chunks: PDF içeriği parçaları
-        chat_history: Sohbet geçmişi
-        
+        code: Önceki oturumun devam kodu (oturum kimliği)
+
     Returns:
-        str: Model yanıtı
+        bool: Kod geçerliyse ve sohbet bulunduysa True
     """
-    try:
-        # Soruyla ilgili en alakalı metinleri bul
-        relevant_context = search_relevant_chunks(pdf_chunks, prompt, top_k=2)
-        
-        # Sadece son 2 sohbet turunu dahil et (token tasarrufu)
-        recent_history = chat_history[-4:] if len(chat_history) > 4 else chat_history
-        
-        # Kısa chat history formatla
-        history_text = ""
-        if recent_history:
-            for msg in recent_history:
-                role = "K" if msg["role"] == "user" else "A"
-                # Uzun mesajları kısalt
-                content = msg['content'][:200] + "..." if len(msg['content']) > 200 else msg['content']
-                history_text += f"{role}: {content}\n"
-        
-        # Kısaltılmış ve optimize edilmiş prompt
-        system_prompt = """PDF belge asistanısın. Sadece verilen bilgilere göre yanıt ver.
+    if not re.fullmatch(r"[0-9a-f]{32}", code) or code == st.session_state.session_id:
+        return False
+    history = open_chat_history(code)
+    if not len(history):
+        return False
+    st.session_state.session_id = code
+    st.session_state.messages = history
+    st.session_state.token_usage = history.token_totals()
+    return True
+
+
+def calibrate_estimator(model, model_name, document):
+    """
+    Yerel token tahmincisini belgenin ilk parçasıyla modele göre kalibre eder.
 
-İlgili Metin:
-{context}
+    İşleme işinin thread'inde çağrılır; count_tokens ağ çağrısı betik thread'ini
+    bekletmez, hata olursa kalibrasyon atlanır.
 
-{history}
-Soru: {question}
+    Args:
+        model: Gemini modeli (None ise kalibrasyon yapılmaz)
+        model_name: Tahmincinin model adı
+        document: İşlenmiş belge (metin yoksa None)
+    """
+    if model and document and document["chunks"]:
+        get_estimator(model_name).calibrate(model, [document["chunks"][0].text])
 
-Yanıt:"""
 
-        # Prompt'u hazırla
-        full_prompt = system_prompt.format(
-            context=relevant_context[:3500],  # Daha az token
-            history=f"Önceki:\n{history_text}\n" if history_text else "",
-            question=prompt
-        )
-        
-        # Güvenlik ayarları
-        safety_settings = [
-            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_ONLY_HIGH"},
-            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_ONLY_HIGH"},
-            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_ONLY_HIGH"},
-            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_ONLY_HIGH"}
-        ]
-        
-        # Rate limiting - her istekten önce kısa bir bekleme
-        if 'last_request_time' in st.session_state:
-            elapsed = time.time() - st.session_state.last_request_time
-            if elapsed < 2:  # 2 saniyeden kısa sürede istek atılmışsa bekle
-                time.sleep(2 - elapsed)
-        
-        st.session_state.last_request_time = time.time()
-        
-        # Gemini'den yanıt al
-        response = model.generate_content(
-            full_prompt,
-            safety_settings=safety_settings
+def submit_ingest_jobs(files, workers, model_name):
+    """
+    Külliyatta veya kuyrukta olmayan dosyaları arka plan işleme kuyruğuna gönderir.
+
+    Dosya içeriği burada (betik thread'inde) okunur; büyük dosyalar diske kopyalanır.
+
+    Args:
+        files: Yüklenen dosyalar
+        workers: Paralel çıkarma için süreç sayısı
+        model_name: Token tahmincisi kalibrasyonu için seçili model
+    """
+    queue = get_ingest_queue(get_metrics())
+    session_id = st.session_state.session_id
+    pending = {job.name for job in queue.jobs(session_id) if job.active}
+    # İşler arka plan thread'lerinde çalışır; profil orada, işin kendisi etrafında alınır
+    profiler = st.session_state.get("profiler")
+    model = st.session_state.gemini_model
+
+    for uploaded_file in files:
+        if uploaded_file.name in st.session_state.corpus or uploaded_file.name in pending:
+            continue
+        if uploaded_file.size > max_upload_mb() * 1024 * 1024:
+            # Büyük dosya: diske kopyalanır, sayfalar eşlemeli dosyadan okunur
+            pdf_path = spool_to_file(uploaded_file)
+
+            def work(job, path=pdf_path, name=uploaded_file.name):
+                with profiled(profiler, f"process_pdf:{name}"):
+                    document = shared_document(
+                        get_document_registry(),
+                        file_key(path),
+                        lambda: process_large_document(
+                            path,
+                            workers=workers,
+                            progress_callback=job.progress_callback,
+                            metrics=get_metrics(),
+                            stage_callback=job.stage_callback
+                        ),
+                        wait_callback=lambda: job.stage_callback("wait_shared_document")
+                    )
+                calibrate_estimator(model, model_name, document)
+                return document
+
+            queue.submit(session_id, uploaded_file.name, work, cleanup=lambda path=pdf_path: os.remove(path))
+        else:
+            # Aynı dosya başka oturumlarda da yüklenmişse tek kopya paylaşılır, bir kez işlenir
+            def work(job, data=uploaded_file.getvalue(), name=uploaded_file.name):
+                with profiled(profiler, f"process_pdf:{name}"):
+                    document = shared_document(
+                        get_document_registry(),
+                        document_key(data),
+                        lambda: process_document(
+                            data,
+                            workers=workers,
+                            progress_callback=job.progress_callback,
+                            doc_cache=get_document_cache(),
+                            metrics=get_metrics(),
+                            stage_callback=job.stage_callback
+                        ),
+                        wait_callback=lambda: job.stage_callback("wait_shared_document")
+                    )
+                calibrate_estimator(model, model_name, document)
+                return document
+
+            queue.submit(session_id, uploaded_file.name, work)
+
+
+# Streamlit 1.37+ st.fragment, 1.33-1.36 st.experimental_fragment
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+
+def render_ingest_progress():
+    """
+    Süren işlerin ilerlemesini ve iptal düğmelerini gösterir.
+
+    Süren iş varken fragment olarak saniyede bir yalnızca bu bölüm yenilenir;
+    bir iş bittiğinde sonucun külliyata eklenmesi için sayfa bir kez yeniden çalıştırılır.
+    """
+    queue = get_ingest_queue(get_metrics())
+    for job in queue.jobs(st.session_state.session_id):
+        if not job.active:
+            st.rerun()
+        detail = t("pages_extracted", done=job.pages_done, total=job.page_count) if job.page_count else ""
+        st.progress(
+            job.fraction,
+            text=f"{job.name}: {t('ingest_stage_' + job.stage)} {detail}".strip()
         )
-        
-        return response.text
-    
-    except Exception as e:
-        raise Exception(f"Gemini yanıt hatası: {str(e)}")
+        if job.cancel_requested:
+            st.caption(t("ingest_cancelling"))
+        elif st.button(t("cancel_ingest"), key=f"cancel_{job.id}"):
+            job.cancel()
 
 
-def export_chat_history(messages, format_type="txt"):
+def poll_ingest_jobs():
     """
-    Sohbet geçmişini dışa aktarır.
-    
-    Args:
-        messages: Sohbet mesajları listesi
-        format_type: Dosya formatı ("txt" veya "json")
-        
+    Biten işleri külliyata ekleyip kuyruktan çıkarır ve sonuç bildirimlerini gösterir.
+
     Returns:
-        str: Dışa aktarılacak içerik
+        bool: Süren iş var mı (varsa ilerleme bölümü kısa aralıklarla yenilenir)
     """
-    if format_type == "txt":
-        content = "PDF Belge Asistanı - Sohbet Geçmişi\n"
-        content += "=" * 50 + "\n"
-        content += f"Tarih: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        
-        for msg in messages:
-            role = "Kullanıcı" if msg["role"] == "user" else "Asistan"
-            content += f"{role}: {msg['content']}\n\n"
-        
-        return content
-    
-    elif format_type == "json":
-        export_data = {
-            "export_date": datetime.now().isoformat(),
-            "messages": messages
-        }
-        return json.dumps(export_data, ensure_ascii=False, indent=2)
+    queue = get_ingest_queue(get_metrics())
+    corpus = st.session_state.corpus
+    notices = st.session_state.ingest_notices
+    added = []
+    active = False
+
+    for job in queue.jobs(st.session_state.session_id):
+        if job.state == "done":
+            if job.result["from_cache"]:
+                notices.append(("caption", f"{job.name}: {t('loaded_from_cache')}"))
+            corpus.add(job.name, job.result)
+            added.append(job.result)
+            queue.forget(job.id)
+        elif job.state in ("failed", "cancelled"):
+            if job.state == "failed":
+                notices.append(("error", t("ingest_failed", name=job.name, error=job.error)))
+            else:
+                notices.append(("caption", t("ingest_cancelled", name=job.name)))
+            queue.forget(job.id)
+        else:
+            active = True
 
+    if added:
+        notices.append(("success", t(
+            "documents_loaded",
+            added=len(added),
+            documents=len(corpus),
+            pages=corpus.page_count,
+            chunks=corpus.chunk_count
+        )))
 
-# Session state başlatma
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+    for kind, text in notices:
+        getattr(st, kind)(text)
+    return active
 
-if "pdf_text" not in st.session_state:
-    st.session_state.pdf_text = None
 
-if "pdf_chunks" not in st.session_state:
-    st.session_state.pdf_chunks = []
+# Sunucu başlarken GEMINI_WARMUP_MODELS modellerini arka planda hazırla (süreç başına bir kez)
+warm_up_from_env()
 
-if "pdf_info" not in st.session_state:
-    st.session_state.pdf_info = {}
+# Session state başlatma
+if "session_id" not in st.session_state:
+    # Oturum kimliği yalnızca sunucu tarafında tutulur (URL'de değil): paylaşılan bir bağlantı
+    # sohbeti açmaz ve aynı adresi açan iki sekme ayrı oturumlardır. Sunucu yeniden başladıktan
+    # sonra sohbete kenar çubuğundaki gizli devam koduyla dönülür (hız sınırlayıcıda adil
+    # sıralama için de kullanılır)
+    st.session_state.session_id = uuid.uuid4().hex
+
+if "messages" not in st.session_state:
+    # Mesajlar eklendikçe SQLite'a yazılır; bellekte yalnızca son CHAT_MEMORY_WINDOW mesaj tutulur
+    st.session_state.messages = open_chat_history(st.session_state.session_id)
+
+if "corpus" not in st.session_state:
+    # Oturumdaki tüm PDF'ler; her belgenin kendi indeks parçası vardır. Belgelerin kendisi
+    # süreç geneli kayıtta paylaşılır, oturum yalnızca referans tutar
+    st.session_state.corpus = Corpus(registry=get_document_registry())
 
 if "gemini_model" not in st.session_state:
     st.session_state.gemini_model = None
 
-if "last_request_time" not in st.session_state:
-    st.session_state.last_request_time = 0
-
-
-# Sidebar - Ayarlar ve Kontroller
-with st.sidebar:
-    st.header(t("settings"))
-
-    # Dil seçimi
-    lang_default = st.session_state.get("selected_language", "tr")
-    lang_choice = st.selectbox(
-        t("language_label"),
-        options=[("tr", "Türkçe"), ("en", "English")],
-        format_func=lambda x: x[1],
-        index=0 if lang_default == "tr" else 1,
-    )
-    st.session_state.selected_language = lang_choice[0]
-
-    # API Key kontrolü - GEMINI
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        api_key = st.text_input(
-            t("api_key_input"),
-            type="password",
-            help=t("api_key_help")
+if "ingest_notices" not in st.session_state:
+    # Biten arka plan işlerinin mesajları (yeni işlem başlatılana kadar gösterilir)
+    st.session_state.ingest_notices = []
+
+if "token_usage" not in st.session_state:
+    # Gemini yanıtlarındaki usage_metadata'dan toplanan gerçek token sayıları
+    st.session_state.token_usage = st.session_state.messages.token_totals()
+
+# Profil modu (PROFILING=1): kapalıyken profiling modülü yüklenmez, profil nesnesi
+# oluşturulmaz ve hiçbir ölçüm yapılmaz
+profiler = st.session_state.get("profiler")
+if profiler is None and os.getenv("PROFILING", "0").strip() not in ("", "0"):
+    from profiling import SessionProfiler, profiling_enabled
+    if profiling_enabled():
+        profiler = st.session_state.profiler = SessionProfiler()
+if profiler:
+    # Kenar çubuğundan istendiyse bu yeniden çalıştırmanın tamamı profillenir
+    profiler.start_rerun()
+
+# Betik hata verse veya st.rerun() ile erken bitse de yeniden çalıştırma profili kapatılır
+try:
+    # Sidebar - Ayarlar ve Kontroller
+    with st.sidebar:
+        st.header(t("settings"))
+
+        # Dil seçimi
+        lang_default = st.session_state.get("selected_language", "tr")
+        lang_choice = st.selectbox(
+            t("language_label"),
+            options=[("tr", "Türkçe"), ("en", "English")],
+            format_func=lambda x: x[1],
+            index=0 if lang_default == "tr" else 1,
         )
+        st.session_state.selected_language = lang_choice[0]
 
-    if api_key:
-        st.success(t("api_key_loaded"))
-    else:
-        st.warning(t("api_key_missing"))
-
-    # Model seçimi - GÜNCEL GEMINI MODELLER
-    st.subheader("🤖 " + t("model_selection"))
+        # API Key kontrolü - GEMINI
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            api_key = st.text_input(
+                t("api_key_input"),
+                type="password",
+                help=t("api_key_help")
+            )
 
-    # Güncel Gemini model kategorileri ve açıklamaları
-    model_info = {
-        "gemini-flash-latest": "💨 Ultra hafif - En az token (ÖNERİLEN)",
-        "gemini-1.5-flash": "⚡ Hızlı ve dengeli",
-        "gemini-2.0-flash-exp": "🚀 Yeni deneysel model",
-        "gemini-1.5-pro": "💎 En güçlü (daha fazla token)"
-    }
+        if api_key:
+            st.success(t("api_key_loaded"))
+        else:
+            st.warning(t("api_key_missing"))
 
-    selected_model = st.selectbox(
-        t("model_selection"),
-        list(model_info.keys()),
-        index=0,
-        format_func=lambda x: f"{x} - {model_info[x]}",
-        help="Quota sorunu için gemini-1.5-flash-8b önerilir"
-    )
+        # Model seçimi - GÜNCEL GEMINI MODELLER
+        st.subheader("🤖 " + t("model_selection"))
 
-    # Model bilgisi
-    st.info(t("selected_model_info", model=selected_model))
+        # Güncel Gemini model kategorileri ve açıklamaları
+        model_info = {
+            "gemini-flash-latest": "💨 Ultra hafif - En az token (ÖNERİLEN)",
+            "gemini-1.5-flash": "⚡ Hızlı ve dengeli",
+            "gemini-2.0-flash-exp": "🚀 Yeni deneysel model",
+            "gemini-1.5-pro": "💎 En güçlü (daha fazla token)"
+        }
 
-    # Optimizasyon bilgisi
-    with st.expander(t("optimization_notes")):
-        st.markdown(t("optimization_content"))
+        selected_model = st.selectbox(
+            t("model_selection"),
+            list(model_info.keys()),
+            index=0,
+            format_func=lambda x: f"{x} - {model_info[x]}",
+            help="Quota sorunu için gemini-1.5-flash-8b önerilir"
+        )
 
-    # API Key alma bilgisi
-    with st.expander(t("how_to_get_key")):
-        st.markdown(t("how_to_get_key_steps"))
+        # Model bilgisi
+        st.info(t("selected_model_info", model=selected_model))
 
-    st.divider()
-
-    # PDF yükleme
-    st.subheader("📤 " + t("upload_pdf"))
-    uploaded_file = st.file_uploader(
-        t("upload_pdf"),
-        type=["pdf"],
-        help=t("upload_help")
-    )
-
-    # Dosya boyutu kontrolü
-    if uploaded_file is not None:
-        file_size_mb = uploaded_file.size / (1024 * 1024)
-
-        if file_size_mb > 10:
-            st.error(t("file_too_large"))
-            uploaded_file = None
-        else:
-            st.info(t("file_size_info", size=f"{file_size_mb:.2f}"))
+        # Yanıtları geldikçe göster (ilk token süresini kısaltır)
+        stream_answers = st.checkbox(
+            t("stream_answers"),
+            value=os.getenv("STREAM_RESPONSES", "1") != "0",
+            help=t("stream_answers_help")
+        )
 
-            # PDF işleme
-            if st.button(t("process_pdf"), type="primary"):
-                with st.spinner("PDF okunuyor..."):
-                    text, page_count = extract_text_from_pdf(uploaded_file)
-
-                    if text:
-                        st.session_state.pdf_text = text
-
-                        # Metni parçalara böl
-                        with st.spinner("Metin parçalanıyor..."):
-                            chunks = chunk_text(text, max_chars=3000)
-                            st.session_state.pdf_chunks = chunks
-
-                        st.session_state.pdf_info = {
-                            "filename": uploaded_file.name,
-                            "pages": page_count,
-                            "stats": get_text_stats(text),
-                            "chunks": len(chunks)
-                        }
+        # Arama modu (tamamı yerel çalışır, ağ gerektirmez)
+        retrieval_mode = st.selectbox(
+            t("retrieval_mode"),
+            list(RETRIEVAL_MODES),
+            index=RETRIEVAL_MODES.index(default_retrieval_mode()),
+            format_func=lambda x: t(f"retrieval_mode_{x}"),
+            help=t("retrieval_mode_help")
+        )
 
-                        # Gemini modelini başlat
-                        if api_key:
-                            with st.spinner(f"{selected_model} başlatılıyor..."):
-                                model = initialize_gemini(selected_model, api_key)
-                                if model:
-                                    st.session_state.gemini_model = model
-                                    st.success(f"✅ PDF yüklendi! ({page_count} sayfa, {len(chunks)} parça)")
-                                else:
-                                    st.error("❌ Model başlatılamadı. API Key'inizi kontrol edin.")
-                        else:
-                            st.error(t("api_key_missing"))
+        # Optimizasyon bilgisi
+        with st.expander(t("optimization_notes")):
+            st.markdown(t("optimization_content"))
 
-                        if st.session_state.gemini_model:
-                            st.rerun()
+        # API Key alma bilgisi
+        with st.expander(t("how_to_get_key")):
+            st.markdown(t("how_to_get_key_steps"))
 
-    # PDF bilgileri
-    if st.session_state.pdf_text:
-        st.divider()
-        st.subheader(t("document_info"))
-        st.write(f"**{t('file_label')}** {st.session_state.pdf_info['filename']}")
-        st.write(f"**{t('pages_label')}** {st.session_state.pdf_info['pages']}")
-        st.write(f"**{t('word_count')}** {st.session_state.pdf_info['stats']['words']:,}")
-        st.write(f"**{t('chunks_label')}** {st.session_state.pdf_info['chunks']}")
-
-        # Token tahmini
-        estimated_tokens = st.session_state.pdf_info['stats']['characters'] // 4
-        st.write(f"**{t('estimated_tokens')}** ~{estimated_tokens:,}")
-
-        # PDF önizleme
-        with st.expander(t("preview_label")):
-            preview_text = st.session_state.pdf_text[:500] + "..."
-            st.text_area(t('first_500_chars'), preview_text, height=150, disabled=True)
-
-    # Sohbet kontrolü
-    if st.session_state.messages:
         st.divider()
-        st.subheader(t("chat_control"))
 
-        st.info(t("chat_count_info", count=len(st.session_state.messages)))
-
-        # Sohbeti temizle
-        if st.button(t("clear_chat"), type="secondary"):
-            st.session_state.messages = []
-            st.rerun()
+        # PDF yükleme
+        st.subheader("📤 " + t("upload_pdf"))
+        uploaded_files = st.file_uploader(
+            t("upload_pdf"),
+            type=["pdf"],
+            accept_multiple_files=True,
+            help=t("upload_help", limit=f"{max(max_upload_mb(), large_pdf_max_mb()):g}")
+        )
 
-        # Sohbeti indir
-        col1, col2 = st.columns(2)
-        with col1:
-            st.download_button(
-                label=t("download_txt"),
-                data=export_chat_history(st.session_state.messages, "txt"),
-                file_name=f"chat_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                mime="text/plain",
-                use_container_width=True
+        # Dosya boyutu kontrolü: MAX_UPLOAD_MB'a kadar bellekte, LARGE_PDF_MAX_MB'a kadar diskten işlenir
+        accepted_files = []
+        for uploaded_file in uploaded_files or []:
+            file_size_mb = uploaded_file.size / (1024 * 1024)
+            if file_size_mb <= max_upload_mb():
+                accepted_files.append(uploaded_file)
+            elif file_size_mb <= large_pdf_max_mb():
+                st.caption(f"{uploaded_file.name}: {t('large_pdf_mode')}")
+                accepted_files.append(uploaded_file)
+            else:
+                limit = max(max_upload_mb(), large_pdf_max_mb())
+                st.error(f"{uploaded_file.name}: {t('file_too_large', limit=f'{limit:g}')}")
+
+        if accepted_files:
+            total_size_mb = sum(f.size for f in accepted_files) / (1024 * 1024)
+            st.info(t("file_size_info", size=f"{total_size_mb:.2f}"))
+
+            # Paralel çıkarma için süreç sayısı
+            extract_workers = st.number_input(
+                t("extract_workers"),
+                min_value=1,
+                max_value=os.cpu_count() or 1,
+                value=min(default_worker_count(), os.cpu_count() or 1),
+                help=t("extract_workers_help")
             )
-        with col2:
-            st.download_button(
-                label=t("download_json"),
-                data=export_chat_history(st.session_state.messages, "json"),
-                file_name=f"chat_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json",
+
+            # PDF işleme: külliyatta ve kuyrukta olmayan dosyalar arka planda işlenir;
+            # bu sırada mevcut belgelerle sohbete devam edilebilir
+            if st.button(t("process_pdf"), type="primary"):
+                st.session_state.ingest_notices = []
+                if api_key:
+                    model = initialize_gemini(selected_model, api_key)
+                    if model:
+                        st.session_state.gemini_model = model
+                    else:
+                        st.error("❌ Model başlatılamadı. API Key'inizi kontrol edin.")
+                else:
+                    st.error(t("api_key_missing"))
+                submit_ingest_jobs(accepted_files, int(extract_workers), selected_model)
+
+        # Arka plan işlerinin ilerlemesi; biten işlerin sonuçları bu oturumun külliyatına eklenir
+        ingest_active = poll_ingest_jobs()
+        # Yalnızca ilerleme bölümü yenilenir; sohbet geçmişi ve sayfanın geri kalanı yeniden çizilmez
+        fragment(run_every=1.0 if ingest_active else None)(render_ingest_progress)()
+
+        # PDF bilgileri
+        corpus = st.session_state.corpus
+        doc_filter = None
+        section_filter = None
+        if len(corpus):
+            st.divider()
+            st.subheader(t("document_info"))
+            total_characters = sum(d["stats"]["characters"] for d in corpus.documents.values())
+            st.write(f"**{t('pages_label')}** {corpus.page_count}")
+            st.write(f"**{t('chunks_label')}** {corpus.chunk_count}")
+
+            # Token tahmini
+            estimated_tokens = total_characters // 4
+            st.write(f"**{t('estimated_tokens')}** ~{estimated_tokens:,}")
+            if st.session_state.token_usage["prompt"]:
+                st.write(f"**{t('tokens_used')}** " + t(
+                    "token_counts",
+                    prompt=f"{st.session_state.token_usage['prompt']:,}",
+                    response=f"{st.session_state.token_usage['response']:,}"
+                ))
+
+            memory = corpus.memory_usage()
+            st.caption(t(
+                "session_memory",
+                total=f"{memory['total'] / 1024 / 1024:.1f}",
+                text=f"{memory['text'] / 1024 / 1024:.1f}",
+                vectors=f"{memory['vectors'] / 1024 / 1024:.1f}",
+                mapped=f"{memory['mapped'] / 1024 / 1024:.1f}"
+            ))
+            registry = get_document_registry()
+            if registry:
+                registry_stats = registry.stats()
+                st.caption(t(
+                    "document_registry_stats",
+                    documents=registry_stats["documents"],
+                    referenced=registry_stats["referenced"],
+                    used=f"{registry_stats['bytes'] / 1024 / 1024:.1f}",
+                    budget=f"{registry_stats['max_bytes'] / 1024 / 1024:.0f}"
+                ))
+
+            # Belge başına bilgi, önizleme ve kaldırma (yalnızca o belgenin indeksi silinir)
+            for name, document in list(corpus.documents.items()):
+                with st.expander(f"📄 {name}"):
+                    st.write(f"**{t('pages_label')}** {document['page_count']}")
+                    st.write(f"**{t('word_count')}** {document['stats']['words']:,}")
+                    st.write(f"**{t('chunks_label')}** {len(document['chunks'])}")
+                    if document.get("sections"):
+                        st.write(f"**{t('sections_label')}** {len(document['sections'])}")
+                    st.text_area(
+                        t('first_500_chars'),
+                        document["chunks"].preview(500) + "...",
+                        height=150,
+                        disabled=True,
+                        key=f"preview_{name}"
+                    )
+                    if st.button(t("remove_document"), key=f"remove_{name}"):
+                        corpus.remove(name)
+                        st.rerun()
+
+            # Belge filtresi: birden fazla belge varsa aramayı seçili belgelerle sınırla
+            if len(corpus) > 1:
+                selected_documents = st.multiselect(
+                    t("search_in_documents"),
+                    corpus.names(),
+                    default=corpus.names(),
+                    help=t("search_in_documents_help")
+                )
+                if len(selected_documents) < len(corpus):
+                    doc_filter = selected_documents
+
+            # Bölüm filtresi: aramayı seçilen bölümlerle sınırla (boşsa sorunun eşleştiği bölümler)
+            section_options = [
+                (name, i)
+                for name in (doc_filter if doc_filter is not None else corpus.names())
+                for i in range(len(corpus.sections(name) or ()))
+            ]
+            if section_options:
+                selected_sections = st.multiselect(
+                    t("search_in_sections"),
+                    section_options,
+                    format_func=lambda option: (
+                        f"{option[0]} · " if len(corpus) > 1 else ""
+                    ) + corpus.sections(option[0]).label(option[1]),
+                    help=t("search_in_sections_help")
+                )
+                if selected_sections:
+                    section_filter = {}
+                    for name, i in selected_sections:
+                        section_filter.setdefault(name, []).append(i)
+
+        # Sohbet kontrolü
+        if st.session_state.messages:
+            st.divider()
+            st.subheader(t("chat_control"))
+
+            st.info(t("chat_count_info", count=len(st.session_state.messages)))
+
+            answer_cache = get_answer_cache()
+            if answer_cache:
+                cache_stats = answer_cache.stats()
+                st.caption(t(
+                    "answer_cache_stats",
+                    hits=cache_stats["hits"],
+                    misses=cache_stats["misses"],
+                    rate=f"{cache_stats['hit_rate']:.0%}"
+                ))
+
+            # Sohbeti temizle
+            if st.button(t("clear_chat"), type="secondary"):
+                st.session_state.messages.clear()
+                st.session_state.token_usage = {"prompt": 0, "response": 0}
+                st.session_state.pop("chat_export", None)
+                st.rerun()
+
+            # Devam kodu: sunucu yeniden başladıktan sonra sohbete dönmek için; yalnızca bu
+            # kullanıcıya gösterilir, URL'de tutulmaz
+            if st.session_state.messages.persistent:
+                with st.expander(t("resume_session")):
+                    st.caption(t("resume_code_help"))
+                    st.code(st.session_state.session_id, language=None)
+                    resume_code = st.text_input(t("resume_code"), type="password").strip()
+                    if st.button(t("resume_chat"), disabled=ingest_active or not resume_code):
+                        if resume_session(resume_code):
+                            st.rerun()
+                        st.error(t("resume_code_unknown"))
+
+            # Sohbeti indir: dosyalar ilk istendiğinde geçmiş veritabanından sayfa sayfa okunarak
+            # üretilir ve geçmiş değişene kadar saklanır; indirme düğmeleri sonraki çalıştırmalarda
+            # (indirme tıklamasının tetiklediği dahil) yeniden üretilmeden gösterilir
+            history = st.session_state.messages
+            export_key = (st.session_state.session_id, len(history))
+            export = st.session_state.get("chat_export")
+            if export is None or export["key"] != export_key:
+                st.session_state.chat_export = export = None
+                if st.button(t("prepare_export"), use_container_width=True):
+                    st.session_state.chat_export = export = build_chat_export(history, export_key)
+            if export:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        label=t("download_txt"),
+                        data=export["txt"],
+                        file_name=f"chat_{export['stamp']}.txt",
+                        mime="text/plain",
+                        use_container_width=True
+                    )
+                with col2:
+                    st.download_button(
+                        label=t("download_json"),
+                        data=export["json"],
+                        file_name=f"chat_{export['stamp']}.json",
+                        mime="application/json",
+                        use_container_width=True
+                    )
+
+
+        # Tanılama paneli: aşama süreleri ve token sayılarının yüzdelikleri (süreç geneli)
+        st.divider()
+        if st.checkbox(t("show_diagnostics"), value=os.getenv("SHOW_DIAGNOSTICS", "0") == "1"):
+            metrics = get_metrics()
+            snapshot = metrics.snapshot()
+            if snapshot:
+                st.dataframe(
+                    [
+                        {
+                            t("metric_name"): name,
+                            "n": summary["count"],
+                            "p50": summary["p50"],
+                            "p90": summary["p90"],
+                            "p99": summary["p99"],
+                        }
+                        for name, summary in snapshot.items()
+                    ],
+                    hide_index=True,
+                    use_container_width=True
+                )
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        label="Prometheus",
+                        data=metrics.to_prometheus(),
+                        file_name="metrics.prom",
+                        mime="text/plain",
+                        use_container_width=True
+                    )
+                with col2:
+                    st.download_button(
+                        label="JSON",
+                        data=metrics.to_json(),
+                        file_name="metrics.json",
+                        mime="application/json",
+                        use_container_width=True
+                    )
+            else:
+                st.caption(t("no_metrics_yet"))
+
+        # Profil paneli: oturum belleği, profil kayıtları ve indirmeler (yalnızca PROFILING=1)
+        if profiler:
+            from profiling import pstats_report, session_memory_report
+
+            st.divider()
+            st.subheader(t("profiling"))
+            if st.button(t("profile_next_rerun"), use_container_width=True):
+                profiler.rerun_armed = True
+                st.rerun()
+            st.caption(t("session_memory_report"))
+            st.dataframe(
+                [
+                    {t("memory_field"): row["key"], "KB": round(row["bytes"] / 1024, 1), t("memory_detail"): row["detail"]}
+                    for row in session_memory_report(st.session_state)
+                ],
+                hide_index=True,
                 use_container_width=True
             )
-
-
-# Ana alan - Sohbet
-if not st.session_state.pdf_text:
-    st.info(t("start_hint"))
-elif not st.session_state.gemini_model:
-    st.warning(t("model_not_started"))
-else:
-    # Sohbet geçmişini göster
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
-    
-    # Kullanıcı girişi
-    if prompt := st.chat_input(t("chat_placeholder")):
-        if not api_key:
-            st.error(t("api_key_missing"))
+            captures = profiler.list()
+            if captures:
+                capture = st.selectbox(
+                    t("profile_captures"),
+                    reversed(captures),
+                    format_func=lambda capture: (
+                        f"{datetime.fromtimestamp(capture.started_at).strftime('%H:%M:%S')} "
+                        f"{capture.label} ({capture.seconds:.2f} s)"
+                    )
+                )
+                stamp = datetime.fromtimestamp(capture.started_at).strftime('%Y%m%d_%H%M%S')
+                col1, col2 = st.columns(2)
+                with col1:
+                    if capture.pstats is not None:
+                        # pstats.Stats("profile.prof") veya snakeviz ile açılabilir
+                        st.download_button(
+                            label="pstats",
+                            data=capture.pstats,
+                            file_name=f"profile_{stamp}.prof",
+                            mime="application/octet-stream",
+                            use_container_width=True
+                        )
+                with col2:
+                    st.download_button(
+                        label=t("profile_report"),
+                        data=pstats_report(capture),
+                        file_name=f"profile_{stamp}.txt",
+                        mime="text/plain",
+                        use_container_width=True
+                    )
+            else:
+                st.caption(t("no_profiles_yet"))
+
+
+    # Ana alan - Sohbet
+    if not len(st.session_state.corpus):
+        st.info(t("start_hint"))
+    elif not st.session_state.gemini_model:
+        st.warning(t("model_not_started"))
+    else:
+        # Sohbet geçmişini göster: her yeniden çalıştırmada yalnızca son mesajlar çizilir,
+        # böylece uzun sohbetlerde etkileşim süresi mesaj sayısıyla büyümez; daha eskileri
+        # istenirse veritabanından okunur
+        history = st.session_state.messages
+        older_count = max(0, len(history) - chat_render_window())
+        if older_count and st.checkbox(t("show_older_messages", count=older_count)):
+            messages = history[:]
         else:
-            # Kullanıcı mesajını ekle
-            st.session_state.messages.append({"role": "user", "content": prompt})
-            with st.chat_message("user"):
-                st.markdown(prompt)
+            messages = history.recent(chat_render_window())
+        for message in messages:
+            render_message(message)
+    
+        # Kullanıcı girişi
+        if prompt := st.chat_input(t("chat_placeholder")):
+            if not api_key:
+                st.error(t("api_key_missing"))
+            else:
+                # Kullanıcı mesajını ekle
+                st.session_state.messages.append({"role": "user", "content": prompt})
+                with st.chat_message("user"):
+                    st.markdown(prompt)
             
-            # Asistan yanıtı
-            with st.chat_message("assistant"):
-                with st.spinner(t("gemini_thinking")):
+                # Asistan yanıtı (profil modunda yanıt akışı bitene kadar profillenir)
+                with st.chat_message("assistant"), profiled(profiler, "question"):
                     try:
-                        # Gemini'den yanıt al
-                        response = get_gemini_response(
-                            st.session_state.gemini_model,
-                            prompt,
-                            st.session_state.pdf_chunks,
-                            st.session_state.messages[:-1]  # Son mesaj hariç
-                        )
-                        
-                        st.markdown(response)
-                        st.session_state.messages.append({"role": "assistant", "content": response})
+                        stream_stats = {}
+                        with st.spinner(t("gemini_thinking")):
+                            # Gemini'den yanıt al
+                            # Model değiştirildiyse havuzdan alınır; PDF'leri yeniden işlemek gerekmez
+                            model = initialize_gemini(selected_model, api_key) or st.session_state.gemini_model
+                            response, from_cache = get_gemini_response(
+                                model,
+                                prompt,
+                                None,
+                                st.session_state.messages.head(len(st.session_state.messages) - 1),  # Son mesaj hariç
+                                retrieval_mode=retrieval_mode,
+                                stream=stream_answers,
+                                stream_stats=stream_stats,
+                                session_id=st.session_state.session_id,
+                                limiter=get_rate_limiter(),
+                                answer_cache=get_answer_cache(),
+                                max_retries=max_retries_setting(),
+                                metrics=get_metrics(),
+                                corpus=st.session_state.corpus,
+                                doc_filter=doc_filter,
+                                section_filter=section_filter
+                            )
+                            streaming = stream_answers and not from_cache
+                            if streaming:
+                                # Spinner ilk parça gelene kadar gösterilir
+                                first_piece = next(response, None)
                     
+                        if streaming:
+                            pieces = itertools.chain([first_piece] if first_piece else [], response)
+                            response = st.write_stream(pieces)
+                        else:
+                            st.markdown(response)
+                    
+                        message = {"role": "assistant", "content": response}
+                        if from_cache:
+                            st.caption(t("answer_from_cache"))
+                            message["cached"] = True
+                        if "ttft" in stream_stats:
+                            message["ttft"] = round(stream_stats["ttft"], 3)
+                            st.caption(t("time_to_first_token", seconds=f"{message['ttft']:.2f}"))
+                        usage = stream_stats.get("usage")
+                        if usage is not None:
+                            message["usage"] = {
+                                "prompt": usage.prompt_token_count,
+                                "response": usage.candidates_token_count
+                            }
+                            st.session_state.token_usage["prompt"] += usage.prompt_token_count
+                            st.session_state.token_usage["response"] += usage.candidates_token_count
+                            st.caption(t("token_counts", **message["usage"]))
+                        st.session_state.messages.append(message)
+                
                     except Exception as e:
-                        error_msg = f"{t('error_prefix')} {str(e)}"
-                        st.error(error_msg)
-
-                        # Hata türüne göre öneriler (kısaltılmış, lokalize)
-                        error_str = str(e).lower()
-                        if "429" in error_str or "quota" in error_str or "limit" in error_str:
-                            st.warning(t('quota_suggestions'))
-                        elif "api key" in error_str or "authentication" in error_str or "401" in error_str:
-                            st.warning(t('invalid_key_suggestion'))
-                        elif "safety" in error_str or "blocked" in error_str:
-                            st.warning(t('safety_blocked'))
-                        elif "404" in error_str or "not found" in error_str:
-                            st.warning(t('model_not_found'))
-
-                        st.session_state.messages.append({"role": "assistant", "content": error_msg})
-
-
-# Footer
-st.divider()
-col1, col2, col3 = st.columns(3)
-with col1:
-    if st.session_state.pdf_chunks:
-        st.metric("Metin Parçaları", len(st.session_state.pdf_chunks))
-with col2:
-    if st.session_state.messages:
-        st.metric("Sohbet Mesajları", len(st.session_state.messages))
-with col3:
-    st.metric("Aktif Model", selected_model.split('-')[1] if '-' in selected_model else selected_model)
-
-st.markdown(t('footer_html'), unsafe_allow_html=True)
\ No newline at end of file
+                        partial_text = getattr(e, "partial_text", "")
+                        if partial_text:
+                            # Akış yarıda kesildi: gelen kısmı koru, kullanıcıyı bilgilendir
+                            st.warning(t("stream_interrupted"))
+                            st.session_state.messages.append({
+                                "role": "assistant",
+                                "content": f"{partial_text}\n\n_{t('stream_interrupted')}_"
+                            })
+                        else:
+                            error_msg = f"{t('error_prefix')} {str(e)}"
+                            st.error(error_msg)
+
+                            # Hata türüne göre öneriler (kısaltılmış, lokalize)
+                            error_str = str(e).lower()
+                            if "429" in error_str or "quota" in error_str or "limit" in error_str:
+                                st.warning(t('quota_suggestions'))
+                            elif "api key" in error_str or "authentication" in error_str or "401" in error_str:
+                                st.warning(t('invalid_key_suggestion'))
+                            elif "safety" in error_str or "blocked" in error_str:
+                                st.warning(t('safety_blocked'))
+                            elif "404" in error_str or "not found" in error_str:
+                                st.warning(t('model_not_found'))
+
+                            st.session_state.messages.append({"role": "assistant", "content": error_msg})
+
+
+    # Footer
+    st.divider()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if len(st.session_state.corpus):
+            st.metric("Metin Parçaları", st.session_state.corpus.chunk_count)
+    with col2:
+        if st.session_state.messages:
+            st.metric("Sohbet Mesajları", len(st.session_state.messages))
+    with col3:
+        st.metric("Aktif Model", selected_model.split('-')[1] if '-' in selected_model else selected_model)
+
+    st.markdown(t('footer_html'), unsafe_allow_html=True)
+finally:
+    if profiler:
+        profiler.stop_rerun()
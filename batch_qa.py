@@ -0,0 +1,270 @@
+"""
+Arayüzsüz toplu soru-cevap.
+Bir klasördeki PDF'lere bir soru listesini sınırlı eşzamanlılıkla sorar ve
+sonuçları geldikçe JSONL dosyasına yazar.
+
+Örnek:
+    python batch_qa.py --pdf-dir belgeler/ --questions sorular.txt --output sonuc.jsonl \\
+        --concurrency 8 --backend fake
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+from answer_cache import get_answer_cache
+from doc_cache import get_document_cache
+from fake_gemini import FakeGenerativeModel
+from metrics import get_metrics
+from qa import create_gemini_model, get_gemini_response, process_document
+from rate_limit import get_rate_limiter, max_retries_setting
+from retrieval import RETRIEVAL_MODES
+
+
+def load_questions(path):
+    """
+    Soru dosyasını okur.
+
+    Düz metin dosyasında her satır bir sorudur. JSONL dosyasında her satır
+    {"question": ..., "pdf": ...} biçimindedir; "pdf" verilirse soru yalnızca o
+    dosyaya sorulur.
+
+    Args:
+        path: Soru dosyası yolu
+
+    Returns:
+        list: {"question", "pdf"} sözlükleri
+    """
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                item = json.loads(line)
+                questions.append({"question": item["question"], "pdf": item.get("pdf")})
+            else:
+                questions.append({"question": line, "pdf": None})
+    return questions
+
+
+def load_backend(backend, model_name, api_key=None, latency=0.0):
+    """
+    Model arka ucunu oluşturur.
+
+    Args:
+        backend: "gemini", "fake" veya "modul:fabrika" (fabrika(model_name) model döndürür)
+        model_name: Model adı
+        api_key: Gemini API anahtarı
+        latency: Sahte model için yapay gecikme (saniye)
+
+    Returns:
+        object: generate_content metodu olan model
+    """
+    if backend == "fake":
+        return FakeGenerativeModel(f"models/fake-{model_name}", latency=latency)
+    if backend == "gemini":
+        if not api_key:
+            raise SystemExit("GEMINI_API_KEY tanımlı değil")
+        return create_gemini_model(model_name, api_key)
+    module_name, _, factory_name = backend.partition(":")
+    if not factory_name:
+        raise SystemExit(f"Geçersiz arka uç: {backend}")
+    factory = getattr(importlib.import_module(module_name), factory_name)
+    return factory(model_name)
+
+
+def load_documents(pdf_dir, workers=1, use_cache=True):
+    """
+    Klasördeki PDF'leri işler.
+
+    Args:
+        pdf_dir: PDF klasörü
+        workers: Paralel çıkarma için süreç sayısı
+        use_cache: İşlenmiş belge önbelleği kullanılsın mı
+
+    Returns:
+        dict: dosya_adı -> process_document sonucu
+    """
+    doc_cache = get_document_cache() if use_cache else None
+    metrics = get_metrics()
+    documents = {}
+    for name in sorted(os.listdir(pdf_dir)):
+        if not name.lower().endswith(".pdf"):
+            continue
+        with open(os.path.join(pdf_dir, name), "rb") as f:
+            document = process_document(f.read(), workers=workers, doc_cache=doc_cache, metrics=metrics)
+        if document:
+            documents[name] = document
+        else:
+            print(f"Uyarı: {name} içinden metin çıkarılamadı, atlanıyor", file=sys.stderr)
+    return documents
+
+
+def ask(model, document, pdf_name, question, retrieval_mode, limiter, answer_cache, max_retries):
+    """
+    Tek bir soruyu sorar ve JSONL kaydı döndürür.
+
+    Args:
+        model: generate_content metodu olan model
+        document: process_document sonucu
+        pdf_name: PDF dosya adı
+        question: Soru
+        retrieval_mode: Arama modu
+        limiter: RateLimiter veya None
+        answer_cache: AnswerCache veya None
+        max_retries: 429/5xx yeniden deneme sayısı
+
+    Returns:
+        dict: Sonuç kaydı (hata olursa "error" alanı dolu)
+    """
+    started = time.perf_counter()
+    record = {"pdf": pdf_name, "question": question, "answer": None, "error": None, "from_cache": False}
+    try:
+        record["answer"], record["from_cache"] = get_gemini_response(
+            model,
+            question,
+            document["chunks"],
+            [],
+            pdf_index=document["index"],
+            pdf_sections=document.get("sections"),
+            retrieval_mode=retrieval_mode,
+            session_id=f"batch:{pdf_name}",
+            limiter=limiter,
+            answer_cache=answer_cache,
+            max_retries=max_retries,
+            metrics=get_metrics(),
+        )
+    except Exception as e:
+        record["error"] = str(e)
+    record["latency_s"] = round(time.perf_counter() - started, 4)
+    return record
+
+
+def iter_jobs(documents, questions):
+    # Her soru, belirtilen PDF'e ya da PDF belirtilmemişse tüm PDF'lere sorulur
+    for question in questions:
+        targets = [question["pdf"]] if question["pdf"] else list(documents)
+        for pdf_name in targets:
+            if pdf_name in documents:
+                yield pdf_name, question["question"]
+            else:
+                print(f"Uyarı: {pdf_name} bulunamadı", file=sys.stderr)
+
+
+def run_batch(model, documents, questions, output, concurrency=4, retrieval_mode="bm25",
+              limiter=None, answer_cache=None, max_retries=3):
+    """
+    Soruları sınırlı eşzamanlılıkla sorar ve sonuçları geldikçe yazar.
+
+    Args:
+        model: generate_content metodu olan model
+        documents: load_documents sonucu
+        questions: load_questions sonucu
+        output: Yazılabilir metin dosyası (JSONL)
+        concurrency: Aynı anda en fazla model çağrısı
+        retrieval_mode: Arama modu
+        limiter: RateLimiter (None ise sınırlama yok)
+        answer_cache: AnswerCache (None ise önbellek yok)
+        max_retries: 429/5xx yeniden deneme sayısı
+
+    Returns:
+        dict: total, errors, elapsed_s, questions_per_s
+    """
+    total = errors = 0
+    started = time.perf_counter()
+    jobs = iter_jobs(documents, questions)
+
+    def submit(pool, job_id, pdf_name, question):
+        future = pool.submit(ask, model, documents[pdf_name], pdf_name, question,
+                             retrieval_mode, limiter, answer_cache, max_retries)
+        future.job_id = job_id
+        return future
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = set()
+        job_id = 0
+        # Kuyrukta en fazla 2*concurrency iş tutulur; soru listesi ne kadar uzun olursa olsun bellek sabit kalır
+        for pdf_name, question in jobs:
+            if len(pending) >= concurrency * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    errors += _write_result(output, future)
+                    total += 1
+            pending.add(submit(pool, job_id, pdf_name, question))
+            job_id += 1
+        for future in as_completed(pending):
+            errors += _write_result(output, future)
+            total += 1
+
+    elapsed = time.perf_counter() - started
+    return {
+        "total": total,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "questions_per_s": round(total / elapsed, 3) if elapsed else 0.0,
+    }
+
+
+def _write_result(output, future):
+    # Yalnızca ana iş parçacığından çağrılır; her kayıt hemen diske yazılır
+    record = dict(id=future.job_id, **future.result())
+    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    output.flush()
+    return 1 if record["error"] else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF'ler üzerinde toplu soru-cevap")
+    parser.add_argument("--pdf-dir", required=True, help="PDF klasörü")
+    parser.add_argument("--questions", required=True, help="Soru dosyası (.txt veya .jsonl)")
+    parser.add_argument("--output", required=True, help="Sonuç dosyası (.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Aynı anda en fazla model çağrısı")
+    parser.add_argument("--backend", default="gemini", help='"gemini", "fake" veya "modul:fabrika"')
+    parser.add_argument("--model", default="gemini-flash-latest", help="Model adı")
+    parser.add_argument("--retrieval-mode", default="bm25", choices=RETRIEVAL_MODES)
+    parser.add_argument("--workers", type=int, default=1, help="PDF çıkarma süreç sayısı")
+    parser.add_argument("--fake-latency", type=float, default=0.0, help="Sahte model gecikmesi (sn)")
+    parser.add_argument("--answer-cache", action="store_true", help="Yanıt önbelleğini kullan")
+    parser.add_argument("--no-doc-cache", action="store_true", help="Belge önbelleğini kullanma")
+    parser.add_argument("--no-rate-limit", action="store_true", help="Süreç geneli hız sınırını kapat")
+    parser.add_argument("--metrics-output", help="Aşama süreleri/token yüzdeliklerinin yazılacağı dosya (.json veya .prom)")
+    args = parser.parse_args(argv)
+
+    if args.backend == "gemini":
+        from dotenv import load_dotenv
+        load_dotenv()
+
+    model = load_backend(args.backend, args.model, os.getenv("GEMINI_API_KEY"), args.fake_latency)
+    documents = load_documents(args.pdf_dir, workers=args.workers, use_cache=not args.no_doc_cache)
+    questions = load_questions(args.questions)
+    # Sahte model kota tüketmez; hız sınırı yalnızca gerçek API için varsayılan olarak açıktır
+    limiter = None if args.no_rate_limit or args.backend == "fake" else get_rate_limiter()
+
+    with open(args.output, "a", encoding="utf-8") as output:
+        summary = run_batch(
+            model,
+            documents,
+            questions,
+            output,
+            concurrency=max(1, args.concurrency),
+            retrieval_mode=args.retrieval_mode,
+            limiter=limiter,
+            answer_cache=get_answer_cache() if args.answer_cache else None,
+            max_retries=max_retries_setting(),
+        )
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+    if args.metrics_output:
+        metrics = get_metrics()
+        with open(args.metrics_output, "w", encoding="utf-8") as f:
+            f.write(metrics.to_prometheus() if args.metrics_output.endswith(".prom") else metrics.to_json())
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Belge hattı için tekrarlanabilir performans ölçümleri.
+"""
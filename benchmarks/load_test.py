@@ -0,0 +1,309 @@
+"""
+Eşzamanlı oturum yük testi (tamamen çevrimdışı).
+Her simüle edilmiş oturum, uygulamadaki akışı izler: PDF'i arka plan işleme
+kuyruğuna gönderir, işlenmesini bekler, modeli paylaşılan havuzdan alır ve
+sırayla sorular sorar. Model, gecikme dağılımı ve 429/5xx enjeksiyonu
+ayarlanabilen sahte Gemini'dir; sınırlayıcı, kuyruk ve havuz süreç genelinde
+paylaşılır. Her oturum sayısı için verim, p50/p95/p99 gecikme ve hata oranları
+raporlanır; oturum sayısı artırılarak doyma noktası bulunur.
+
+Örnek:
+    python -m benchmarks.load_test --sessions 1 4 16 64 --questions 5
+    python -m benchmarks.load_test --sessions 32 --latency lognormal:0.8,0.5 --error-429 0.05 --rpm 60
+    python -m benchmarks.load_test --sessions 32 --rpm 30 --limiter-timeout 5
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.pipeline import RESULTS_DIR, _git_commit, make_queries
+from benchmarks.synthetic_pdf import make_pdf
+from corpus import Corpus
+from doc_cache import document_key
+from doc_registry import DocumentRegistry, shared_document
+from fake_gemini import FakeGenerativeModel
+from ingest import IngestQueue
+from metrics import Metrics
+from model_pool import ModelPool
+from qa import GENERATION_CONFIG, get_gemini_response, process_document
+from rate_limit import RateLimitTimeout, RateLimiter
+
+OPERATIONS = ("process", "model_init", "ask", "ttft")
+
+_STATUS_RE = re.compile(r"\b(429|5\d\d)\b")
+
+
+def percentile(values, p):
+    """
+    En yakın sıra yöntemiyle yüzdelik.
+
+    Args:
+        values: Sayılar
+        p: 0-100 arası yüzdelik
+
+    Returns:
+        float | None: Değer (boşsa None)
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1]
+
+
+def classify_error(error):
+    """
+    Hatayı ve sarmalanmış asıl hatayı (__cause__) sınıflandırır.
+
+    Returns:
+        str: "429", "5xx", "timeout" veya "other"
+    """
+    cause = error
+    while cause is not None:
+        if isinstance(cause, RateLimitTimeout):
+            return "timeout"
+        cause = cause.__cause__
+    match = _STATUS_RE.search(str(error))
+    if match:
+        return "429" if match.group(1) == "429" else "5xx"
+    return "other"
+
+
+class Recorder:
+    """Oturum thread'lerinden gelen gecikme ve hataları toplar."""
+
+    def __init__(self):
+        self.latencies = {op: [] for op in OPERATIONS}
+        self.errors = {}
+        self.attempts = {}
+        self._lock = threading.Lock()
+
+    def ok(self, op, seconds):
+        with self._lock:
+            self.latencies[op].append(seconds)
+            self.attempts[op] = self.attempts.get(op, 0) + 1
+
+    def fail(self, op, error):
+        kind = classify_error(error)
+        with self._lock:
+            self.errors.setdefault(op, {}).setdefault(kind, 0)
+            self.errors[op][kind] += 1
+            self.attempts[op] = self.attempts.get(op, 0) + 1
+
+
+def run_session(index, args, pdf_bytes, queries, queue, pool, limiter, metrics, recorder, registry):
+    """
+    Tek bir oturumun yükle -> işle -> sor döngüsü.
+    """
+    session_id = f"load-{index}"
+    name = f"doc-{index}.pdf"
+
+    started = time.perf_counter()
+    job = queue.submit(
+        session_id,
+        name,
+        lambda job: shared_document(
+            registry,
+            document_key(pdf_bytes),
+            lambda: process_document(
+                pdf_bytes,
+                progress_callback=job.progress_callback,
+                metrics=metrics,
+                stage_callback=job.stage_callback,
+            ),
+            wait_callback=lambda: job.stage_callback("wait_shared_document"),
+        ),
+    )
+    while job.active:
+        time.sleep(0.01)
+    if job.state != "done":
+        recorder.fail("process", RuntimeError(job.error or job.state))
+        return
+    recorder.ok("process", time.perf_counter() - started)
+    corpus = Corpus(registry=registry)
+    corpus.add(name, job.result)
+    queue.forget(job.id)
+
+    started = time.perf_counter()
+    try:
+        model = pool.get(args.model, f"key-{index % args.api_keys}", GENERATION_CONFIG)
+    except Exception as e:
+        recorder.fail("model_init", e)
+        return
+    recorder.ok("model_init", time.perf_counter() - started)
+
+    history = []
+    for question in queries:
+        started = time.perf_counter()
+        stats = {}
+        try:
+            answer, _ = get_gemini_response(
+                model, question, None, history,
+                stream=args.stream,
+                stream_stats=stats,
+                session_id=session_id,
+                limiter=limiter,
+                max_retries=args.max_retries,
+                limiter_timeout=args.limiter_timeout,
+                metrics=metrics,
+                corpus=corpus,
+            )
+            if args.stream:
+                answer = "".join(answer)
+        except Exception as e:
+            recorder.fail("ask", e)
+            continue
+        recorder.ok("ask", time.perf_counter() - started)
+        if "ttft" in stats:
+            recorder.ok("ttft", stats["ttft"])
+        history += [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+        if args.think_time:
+            time.sleep(args.think_time)
+
+
+def run_level(sessions, args):
+    """
+    Belirli sayıda eşzamanlı oturumla bir ölçüm turu çalıştırır.
+
+    Returns:
+        dict: Bu seviyenin sonuçları
+    """
+    metrics = Metrics(window=100000)
+    queue = IngestQueue(args.ingest_concurrency, metrics=metrics)
+    models = []
+
+    def create_model(name, key, config):
+        model = FakeGenerativeModel(
+            f"models/fake-{name}",
+            latency=args.latency,
+            error_rate_429=args.error_429,
+            error_rate_5xx=args.error_5xx,
+            seed=args.seed + len(models),
+        )
+        models.append(model)
+        return model
+
+    pool = ModelPool(create_model)
+    limiter = RateLimiter(args.rpm, args.tpm) if args.rpm else None
+    recorder = Recorder()
+    registry = DocumentRegistry(int(args.registry_mb * 1024 * 1024)) if args.registry_mb > 0 else None
+    pdfs = [make_pdf(args.pages, seed=args.seed + i) for i in range(min(sessions, args.distinct_pdfs))]
+
+    threads = [
+        threading.Thread(
+            target=run_session,
+            args=(i, args, pdfs[i % len(pdfs)], make_queries(args.questions, args.seed + i),
+                  queue, pool, limiter, metrics, recorder, registry),
+            name=f"session-{i}",
+            daemon=True,
+        )
+        for i in range(sessions)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latency = {
+        op: {
+            "count": len(values),
+            **{f"p{p}": percentile(values, p) for p in (50, 95, 99)},
+        }
+        for op, values in recorder.latencies.items()
+    }
+    error_rate = {
+        op: {kind: count / recorder.attempts[op] for kind, count in kinds.items()}
+        for op, kinds in recorder.errors.items()
+    }
+    limiter_wait = metrics.snapshot().get("limiter_wait_seconds", {})
+    return {
+        "sessions": sessions,
+        "wall_seconds": wall,
+        "questions_per_s": len(recorder.latencies["ask"]) / wall if wall else None,
+        "documents_per_s": len(recorder.latencies["process"]) / wall if wall else None,
+        "latency": latency,
+        "errors": recorder.errors,
+        "error_rate": error_rate,
+        "limiter_wait_p99": limiter_wait.get("p99"),
+        # Yeniden denemeler dahil model çağrıları ve enjekte edilen hatalar
+        "model_calls": sum(model.calls for model in models),
+        "injected_errors": sum(model.errors for model in models),
+        "model_pool": pool.stats(),
+        "document_registry": registry.stats() if registry else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eşzamanlı oturum yük testi (sahte Gemini)")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16],
+                        help="Eşzamanlı oturum sayıları (her biri ayrı tur)")
+    parser.add_argument("--questions", type=int, default=5, help="Oturum başına soru")
+    parser.add_argument("--pages", type=int, default=20, help="Sentetik PDF sayfa sayısı")
+    parser.add_argument("--distinct-pdfs", type=int, default=8, help="Farklı PDF sayısı")
+    parser.add_argument("--model", default="gemini-flash-latest", help="Model adı")
+    parser.add_argument("--api-keys", type=int, default=1, help="Oturumlara dağıtılan farklı API anahtarı")
+    parser.add_argument("--latency", default="lognormal:0.8,0.4", help="Sahte model gecikme dağılımı")
+    parser.add_argument("--error-429", type=float, default=0.0, help="429 hata oranı")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="5xx hata oranı")
+    parser.add_argument("--stream", action="store_true", help="Yanıtları akış modunda al")
+    parser.add_argument("--rpm", type=float, default=0, help="Sınırlayıcı istek/dakika (0 = sınırsız)")
+    parser.add_argument("--tpm", type=float, default=0, help="Sınırlayıcı token/dakika (0 = sınırsız)")
+    parser.add_argument("--max-retries", type=int, default=3, help="429/5xx yeniden deneme")
+    parser.add_argument("--limiter-timeout", type=float, default=None,
+                        help="Sınırlayıcıda en fazla bekleme (sn); aşılırsa soru \"timeout\" hatası sayılır")
+    parser.add_argument("--ingest-concurrency", type=int, default=2, help="Eşzamanlı PDF işleme sınırı")
+    parser.add_argument("--registry-mb", type=float, default=512,
+                        help="Paylaşılan belge kaydı bütçesi (0 = her oturum belgeyi kendisi işler)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Sorular arası bekleme (sn)")
+    parser.add_argument("--seed", type=int, default=0, help="Tohum")
+    parser.add_argument("--output", help="Sonuç JSON dosyası (varsayılan benchmarks/results/)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for sessions in args.sessions:
+        print(f"ölçülüyor: {sessions} oturum", file=sys.stderr)
+        results.append(run_level(sessions, args))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "cpu_count": os.cpu_count(),
+            **{key: value for key, value in vars(args).items() if key not in ("sessions", "output")},
+        },
+        "results": results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"load-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"sonuçlar: {output}", file=sys.stderr)
+
+    def ms(value):
+        return f"{value * 1000:8.0f}" if value is not None else f"{'-':>8s}"
+
+    print(f"\n{'oturum':>6s} {'soru/s':>8s} {'belge/s':>8s} "
+          f"{'işle p50':>8s} {'p95':>8s} {'sor p50':>8s} {'p95':>8s} {'p99':>8s} {'hata%':>6s}")
+    for row in results:
+        process, ask = row["latency"]["process"], row["latency"]["ask"]
+        failed = sum(sum(kinds.values()) for kinds in row["errors"].values())
+        attempts = process["count"] + ask["count"] + failed
+        print(
+            f"{row['sessions']:6d} {row['questions_per_s']:8.2f} {row['documents_per_s']:8.2f} "
+            f"{ms(process['p50'])} {ms(process['p95'])} {ms(ask['p50'])} {ms(ask['p95'])} {ms(ask['p99'])} "
+            f"{(failed / attempts * 100 if attempts else 0):6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
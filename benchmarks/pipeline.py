@@ -0,0 +1,269 @@
+"""
+Belge hattının sıcak noktaları için ölçüm paketi.
+Sentetik PDF'ler (varsayılan 1-1000 sayfa) ve depodaki örnek PDF üzerinde
+çıkarma, parçalama, indeksleme, arama, prompt oluşturma ve (sahte modelle)
+uçtan uca yanıt aşamalarını ölçer; sonuçları JSON olarak kaydeder.
+
+Örnek:
+    python -m benchmarks.pipeline --pages 1 10 100 1000
+    python -m benchmarks.pipeline --compare benchmarks/results/onceki.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.synthetic_pdf import VOCABULARY, make_pdf
+from fake_gemini import FakeGenerativeModel, estimate_tokens
+from pdf_pipeline import chunk_text, extract_text_from_pdf
+from qa import build_prompt, get_gemini_response, search_relevant_chunks
+from retrieval import RETRIEVAL_MODES, build_index
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUNDLED_PDF = os.path.join(REPO_ROOT, "LangChain_OpenAI_SoruCevap_Sistemi.pdf")
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+# Örnek PDF Türkçe olduğu için sorulara Türkçe kelimeler de karışır
+_QUERY_WORDS = VOCABULARY + ["langchain", "openai", "soru", "cevap", "sistem", "mimari", "model"]
+
+
+def make_queries(count, seed=0):
+    """
+    Tekrarlanabilir soru listesi üretir.
+
+    Args:
+        count: Soru sayısı
+        seed: Rastgelelik tohumu
+
+    Returns:
+        list: Sorular
+    """
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(_QUERY_WORDS) for _ in range(rng.randint(2, 6))) + " nedir?"
+        for _ in range(count)
+    ]
+
+
+def timed(fn, repeat=1):
+    """
+    fn'i repeat kez çalıştırır; en iyi süreyi ve son sonucu döndürür.
+
+    Args:
+        fn: Argümansız fonksiyon
+        repeat: Tekrar sayısı
+
+    Returns:
+        tuple: (en_iyi_süre_sn, sonuç)
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def peak_memory(fn):
+    """
+    fn çalışırken Python bellek ayırmalarının tepe değerini ölçer (tracemalloc).
+
+    Args:
+        fn: Argümansız fonksiyon
+
+    Returns:
+        int: Tepe bellek (bayt)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_document(name, pdf_bytes, queries, repeat=3, workers=1, measure_memory=True):
+    """
+    Tek bir belge için tüm aşamaları ölçer.
+
+    Args:
+        name: Raporda görünecek belge adı
+        pdf_bytes: PDF içeriği
+        queries: Arama/prompt aşamalarında kullanılacak sorular
+        repeat: Her aşamanın tekrar sayısı (en iyi süre raporlanır)
+        workers: Çıkarma süreç sayısı
+        measure_memory: Aşama başına tepe belleği ölç
+
+    Returns:
+        dict: Aşama sonuçları
+    """
+    stages = {}
+
+    def record(stage, seconds, units, unit_name, fn=None, **extra):
+        stages[stage] = dict(
+            seconds=round(seconds, 6),
+            **{f"{unit_name}_per_s": round(units / seconds, 3) if seconds else None},
+            **extra,
+        )
+        if measure_memory and fn is not None:
+            stages[stage]["peak_bytes"] = peak_memory(fn)
+
+    extract = lambda: extract_text_from_pdf(pdf_bytes, workers=workers)  # noqa: E731
+    seconds, (text, page_count) = timed(extract, repeat)
+    record("extract_text_from_pdf", seconds, page_count, "pages", extract if workers == 1 else None)
+
+    chunk = lambda: chunk_text(text)  # noqa: E731
+    seconds, chunks = timed(chunk, repeat)
+    record("chunk_text", seconds, len(chunks), "chunks", chunk)
+
+    texts = [c.text for c in chunks]
+    index_fn = lambda: build_index(texts)  # noqa: E731
+    seconds, index = timed(index_fn, repeat)
+    record("build_index", seconds, len(chunks), "chunks", index_fn)
+
+    for mode in RETRIEVAL_MODES:
+        search = lambda: [search_relevant_chunks(chunks, q, index=index, mode=mode) for q in queries]  # noqa: E731
+        seconds, _ = timed(search, repeat)
+        record(f"search_relevant_chunks[{mode}]", seconds, len(queries), "queries", search)
+
+    prompt_fn = lambda: [build_prompt(q, chunks, [], pdf_index=index)[0] for q in queries]  # noqa: E731
+    seconds, prompts = timed(prompt_fn, repeat)
+    prompt_chars = [len(p) for p in prompts]
+    record(
+        "build_prompt", seconds, len(queries), "queries", prompt_fn,
+        avg_prompt_chars=round(sum(prompt_chars) / len(prompt_chars), 1),
+        max_prompt_chars=max(prompt_chars),
+        avg_prompt_tokens=round(sum(estimate_tokens(p) for p in prompts) / len(prompts), 1),
+    )
+
+    model = FakeGenerativeModel()
+    answer = lambda: [get_gemini_response(model, q, chunks, [], pdf_index=index) for q in queries]  # noqa: E731
+    seconds, _ = timed(answer, repeat)
+    record("get_gemini_response[stub]", seconds, len(queries), "queries", answer)
+
+    return {
+        "document": name,
+        "pages": page_count,
+        "bytes": len(pdf_bytes),
+        "characters": len(text),
+        "chunks": len(chunks),
+        "stages": stages,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    """
+    İki çalıştırmanın aşama sürelerini karşılaştırır.
+
+    Args:
+        previous: Önceki sonuç (dict)
+        current: Yeni sonuç (dict)
+
+    Returns:
+        list: (belge, aşama, önceki_sn, yeni_sn, değişim_yüzdesi) satırları
+    """
+    old = {
+        (doc["document"], stage): values["seconds"]
+        for doc in previous["results"] for stage, values in doc["stages"].items()
+    }
+    rows = []
+    for doc in current["results"]:
+        for stage, values in doc["stages"].items():
+            before = old.get((doc["document"], stage))
+            if before:
+                change = (values["seconds"] - before) / before * 100
+                rows.append((doc["document"], stage, before, values["seconds"], round(change, 1)))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Belge hattı ölçümleri")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000],
+                        help="Sentetik PDF sayfa sayıları")
+    parser.add_argument("--no-bundled", action="store_true", help="Depodaki örnek PDF'i ölçme")
+    parser.add_argument("--queries", type=int, default=50, help="Arama/prompt soru sayısı")
+    parser.add_argument("--repeat", type=int, default=3, help="Aşama tekrar sayısı")
+    parser.add_argument("--workers", type=int, default=1, help="Çıkarma süreç sayısı")
+    parser.add_argument("--seed", type=int, default=0, help="Sentetik veri tohumu")
+    parser.add_argument("--no-memory", action="store_true", help="Tepe bellek ölçümünü atla")
+    parser.add_argument("--output", help="Sonuç JSON dosyası (varsayılan benchmarks/results/)")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki sonuç JSON dosyası")
+    args = parser.parse_args(argv)
+
+    queries = make_queries(args.queries, args.seed)
+    documents = [(f"synthetic-{n}p", lambda n=n: make_pdf(n, seed=args.seed)) for n in args.pages]
+    if not args.no_bundled and os.path.exists(BUNDLED_PDF):
+        documents.append((os.path.basename(BUNDLED_PDF), lambda: open(BUNDLED_PDF, "rb").read()))
+
+    results = []
+    for name, load in documents:
+        print(f"ölçülüyor: {name}", file=sys.stderr)
+        results.append(bench_document(
+            name, load(), queries, repeat=args.repeat, workers=args.workers,
+            measure_memory=not args.no_memory,
+        ))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "queries": args.queries,
+            "repeat": args.repeat,
+            "workers": args.workers,
+            "seed": args.seed,
+            # Linux'ta KiB cinsinden; süreç boyunca görülen en yüksek RSS
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        "results": results,
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"sonuçlar: {output}", file=sys.stderr)
+
+    for doc in results:
+        print(f"\n{doc['document']} ({doc['pages']} sayfa, {doc['chunks']} parça)")
+        for stage, values in doc["stages"].items():
+            rate = next((f"{v:,.1f} {k[:-6]}/s" for k, v in values.items() if k.endswith("_per_s") and v), "")
+            peak = f"  tepe {values['peak_bytes'] / 1024 / 1024:.1f} MiB" if "peak_bytes" in values else ""
+            print(f"  {stage:34s} {values['seconds'] * 1000:10.2f} ms  {rate}{peak}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        print("\nkarşılaştırma (süre değişimi, negatif = daha hızlı):")
+        for document, stage, before, after, change in compare(previous, report):
+            print(f"  {document:28s} {stage:34s} {before * 1000:9.2f} -> {after * 1000:9.2f} ms  {change:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Streamlit yeniden çalıştırma maliyetinin sohbet uzunluğuyla değişimini ölçer.
+
+Her mesaj sayısı için:
+  - export[full]: eski yol; her yeniden çalıştırmada TXT ve JSON bellekteki tüm geçmişten kodlanır
+  - export[db-paged]: uygulamanın yolu; SQLite'taki geçmişin sayfa sayfa okunup kodlanması
+    (yalnızca istendiğinde)
+  - app_rerun: (Streamlit kuruluysa) app.py'nin AppTest ile tam yeniden çalıştırılması
+
+Örnek:
+    python -m benchmarks.rerun --messages 10 100 1000 5000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks.pipeline import REPO_ROOT, RESULTS_DIR, _git_commit, make_queries, timed
+from benchmarks.synthetic_pdf import make_pdf
+from chat_export import export_chat_history, iter_export
+from chat_store import ChatHistory, ChatStore
+
+
+def make_messages(count, seed=0):
+    """
+    Soru/yanıt sırasıyla tekrarlanabilir sohbet mesajları üretir.
+
+    Args:
+        count: Mesaj sayısı
+        seed: Rastgelelik tohumu
+
+    Returns:
+        list: Mesaj sözlükleri
+    """
+    questions = make_queries((count + 1) // 2, seed)
+    messages = []
+    for i in range(count):
+        question = questions[i // 2]
+        if i % 2 == 0:
+            messages.append({"role": "user", "content": question})
+        else:
+            messages.append({
+                "role": "assistant",
+                "content": f"[Sayfa {i % 40 + 1}] " + (question.capitalize() + " ") * 12,
+                "usage": {"prompt": 900, "response": 120},
+                "ttft": 0.42,
+            })
+    return messages
+
+
+def make_history(messages, db_dir):
+    """
+    Mesajları geçici bir SQLite deposuna yazılmış ChatHistory olarak döndürür.
+    """
+    history = ChatHistory("bench", ChatStore(os.path.join(db_dir, "chat.db")))
+    for message in messages:
+        history.append(message)
+    return history
+
+
+def bench_export(messages, history, repeat=5):
+    """
+    Bir yeniden çalıştırmadaki dışa aktarım maliyetini ölçer (son mesaj yeni eklenmiş).
+
+    Returns:
+        dict: Yol -> saniye
+    """
+    full = lambda: (export_chat_history(messages, "txt"), export_chat_history(messages, "json"))  # noqa: E731
+
+    def paged():
+        return "".join(iter_export(history.iter_all(), "txt")), "".join(iter_export(history.iter_all(), "json"))
+
+    return {
+        "export[full]": timed(full, repeat)[0],
+        "export[db-paged]": timed(paged, repeat)[0],
+    }
+
+
+def bench_app_rerun(history, repeat=3):
+    """
+    app.py'yi Streamlit AppTest ile sahte model ve tek belgeyle yeniden çalıştırır.
+
+    Returns:
+        float | None: En iyi yeniden çalıştırma süresi (Streamlit kurulu değilse None)
+    """
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+    from corpus import Corpus
+    from fake_gemini import FakeGenerativeModel
+    from qa import process_document
+
+    corpus = Corpus()
+    corpus.add("synthetic.pdf", process_document(make_pdf(5)))
+    app = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=120)
+    app.session_state["messages"] = history
+    app.session_state["corpus"] = corpus
+    app.session_state["gemini_model"] = FakeGenerativeModel()
+    app.run()
+    return timed(app.run, repeat)[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Yeniden çalıştırma ölçümleri")
+    parser.add_argument("--messages", type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="Sohbet mesaj sayıları")
+    parser.add_argument("--repeat", type=int, default=5, help="Tekrar sayısı")
+    parser.add_argument("--no-app", action="store_true", help="AppTest ile tam yeniden çalıştırmayı atla")
+    parser.add_argument("--output", help="Sonuç JSON dosyası (varsayılan benchmarks/results/)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for count in args.messages:
+        print(f"ölçülüyor: {count} mesaj", file=sys.stderr)
+        messages = make_messages(count)
+        with tempfile.TemporaryDirectory() as db_dir:
+            history = make_history(messages, db_dir)
+            row = {"messages": count, **bench_export(messages, history, args.repeat)}
+            if not args.no_app:
+                row["app_rerun"] = bench_app_rerun(history, max(1, args.repeat // 2))
+        results.append(row)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"rerun-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"sonuçlar: {output}", file=sys.stderr)
+
+    columns = [key for key in results[0] if key != "messages"]
+    print(f"\n{'mesaj':>8s} " + " ".join(f"{c:>22s}" for c in columns))
+    for row in results:
+        cells = [
+            f"{row[c] * 1000:19.2f} ms" if row[c] is not None else f"{'-':>22s}"
+            for c in columns
+        ]
+        print(f"{row['messages']:8d} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Ölçümler için bağımlılıksız sentetik PDF üreticisi.
+Her sayfaya tohum (seed) ile belirlenen, Türkçe/İngilizce karışık cümleler yazar;
+aynı parametreler her zaman aynı dosyayı üretir.
+"""
+
+import random
+
+# WinAnsi kodlamasında sorun çıkarmaması için Türkçe kelimeler ASCII yazılmıştır
+VOCABULARY = (
+    "sozlesme fesih odeme fatura teslimat garanti bakim kurulum servis parca "
+    "contract termination payment invoice delivery warranty maintenance installation "
+    "service part pump valve pressure temperature sensor calibration safety procedure "
+    "musteri tedarikci sure bildirim madde kosul sorumluluk ariza kontrol test rapor "
+    "customer supplier period notice clause condition liability failure control report"
+).split()
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _sentence(rng):
+    words = [rng.choice(VOCABULARY) for _ in range(rng.randint(6, 16))]
+    words[0] = words[0].capitalize()
+    return " ".join(words) + "."
+
+
+def page_lines(page_num, seed=0, lines_per_page=45, chars_per_line=90):
+    """
+    Bir sayfanın satırlarını üretir.
+
+    Args:
+        page_num: 1'den başlayan sayfa numarası
+        seed: Rastgelelik tohumu
+        lines_per_page: Sayfadaki satır sayısı
+        chars_per_line: Satır başına yaklaşık karakter
+
+    Returns:
+        list: Satırlar
+    """
+    rng = random.Random(seed * 1_000_003 + page_num)
+    lines = [f"Bolum {page_num}: {rng.choice(VOCABULARY).capitalize()} {rng.choice(VOCABULARY)}"]
+    current = ""
+    while len(lines) < lines_per_page:
+        current = f"{current} {_sentence(rng)}".strip()
+        while len(current) > chars_per_line and len(lines) < lines_per_page:
+            cut = current.rfind(" ", 0, chars_per_line)
+            lines.append(current[:cut])
+            current = current[cut + 1:]
+    return lines
+
+
+def make_pdf(page_count, seed=0, lines_per_page=45):
+    """
+    Verilen sayfa sayısında metin içeren bir PDF üretir.
+
+    Args:
+        page_count: Sayfa sayısı
+        seed: Rastgelelik tohumu
+        lines_per_page: Sayfadaki satır sayısı
+
+    Returns:
+        bytes: PDF içeriği
+    """
+    # Nesne düzeni: 1 katalog, 2 sayfa ağacı, 3 yazı tipi, sonra her sayfa için (sayfa, içerik)
+    objects = {}
+    page_ids = [4 + 2 * i for i in range(page_count)]
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects[2] = f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode("ascii")
+    objects[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+
+    for i, pid in enumerate(page_ids):
+        lines = page_lines(i + 1, seed=seed, lines_per_page=lines_per_page)
+        ops = ["BT", "/F1 10 Tf", "12 TL", f"40 {PAGE_HEIGHT - 50} Td"]
+        ops.extend(f"({_escape(line)}) Tj T*" for line in lines)
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects[pid] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>"
+        ).encode("ascii")
+        objects[pid + 1] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n" % obj_id + objects[obj_id] + b"\nendobj\n"
+
+    xref_offset = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for obj_id in range(1, size):
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_offset)
+    return bytes(out)
+
+
+__all__ = ["VOCABULARY", "page_lines", "make_pdf"]
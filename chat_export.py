@@ -0,0 +1,70 @@
+"""
+Sohbet geçmişinin TXT/JSON dışa aktarımı.
+iter_export, mesajları (ör. veritabanından sayfa sayfa okunanları) bellekte
+biriktirmeden parça parça kodlar; çıktı, geçmişin tamamını tek seferde
+json.dumps ile kodlamakla aynıdır.
+"""
+
+import json
+from datetime import datetime
+
+TXT_TITLE = "PDF Belge Asistanı - Sohbet Geçmişi"
+
+
+def _txt_entry(message):
+    role = "Kullanıcı" if message["role"] == "user" else "Asistan"
+    return f"{role}: {message['content']}\n\n"
+
+
+def _json_entry(message):
+    # json.dumps(..., indent=2) çıktısında "messages" dizisinin elemanları 4 boşlukla girintilidir
+    encoded = json.dumps(message, ensure_ascii=False, indent=2)
+    return "    " + encoded.replace("\n", "\n    ")
+
+
+def _txt_header(now):
+    return f"{TXT_TITLE}\n{'=' * 50}\nTarih: {now.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+
+
+def iter_export(messages, format_type="txt", now=None):
+    """
+    Dışa aktarımı parça parça üretir; mesajlar tek tek tüketilir.
+
+    Args:
+        messages: Mesajların yinelenebiliri (ör. ChatHistory.iter_all())
+        format_type: Dosya formatı ("txt" veya "json")
+        now: Başlıktaki tarih (None ise şu an)
+
+    Yields:
+        str: Çıktı parçaları (birleşimi export_chat_history çıktısıyla aynıdır)
+    """
+    now = now or datetime.now()
+    if format_type == "txt":
+        yield _txt_header(now)
+        for message in messages:
+            yield _txt_entry(message)
+        return
+    date = json.dumps(now.isoformat())
+    first = True
+    for message in messages:
+        yield (f'{{\n  "export_date": {date},\n  "messages": [\n' if first else ",\n") + _json_entry(message)
+        first = False
+    yield f'{{\n  "export_date": {date},\n  "messages": []\n}}' if first else "\n  ]\n}"
+
+
+def export_chat_history(messages, format_type="txt"):
+    """
+    Sohbet geçmişini dışa aktarır.
+
+    Args:
+        messages: Sohbet mesajları listesi
+        format_type: Dosya formatı ("txt" veya "json")
+
+    Returns:
+        str: Dışa aktarılacak içerik
+    """
+    if format_type in ("txt", "json"):
+        return "".join(iter_export(messages, format_type))
+
+
+__all__ = ["iter_export", "export_chat_history"]
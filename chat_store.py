@@ -0,0 +1,376 @@
+"""
+Sohbet geçmişinin SQLite'ta kalıcı tutulması.
+Her mesaj eklendiği anda WAL modundaki veritabanına tek satır olarak yazılır
+(yalnızca ekleme); bellekte yalnızca son mesajlardan oluşan sınırlı bir pencere
+tutulur. Daha eski mesajlar kaydırıldığında, özetlendiğinde veya dışa
+aktarıldığında sayfa sayfa veritabanından okunur. Oturumlar sunucu yeniden
+başlatıldığında aynı oturum kimliğiyle kaldığı yerden açılır.
+"""
+
+import contextlib
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+
+# Dışa aktarım ve toplu okumada sayfa başına mesaj
+EXPORT_PAGE_SIZE = 200
+
+
+def _message_row(session_id, seq, message):
+    meta = {key: value for key, value in message.items() if key not in ("role", "content")}
+    usage = message.get("usage") or {}
+    return (
+        session_id,
+        seq,
+        message["role"],
+        message["content"],
+        json.dumps(meta, ensure_ascii=False) if meta else None,
+        usage.get("prompt", 0),
+        usage.get("response", 0),
+        time.time(),
+    )
+
+
+def _row_message(role, content, meta):
+    message = {"role": role, "content": content}
+    if meta:
+        message.update(json.loads(meta))
+    return message
+
+
+class ChatStore:
+    """
+    Oturum mesajlarını tutan, WAL modunda SQLite deposu.
+    """
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path: SQLite dosyası
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            # WAL: yazarlar okuyucuları bloklamaz; mod dosyada kalıcıdır
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "session_id TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL, "
+                "content TEXT NOT NULL, meta TEXT, prompt_tokens INTEGER NOT NULL DEFAULT 0, "
+                "response_tokens INTEGER NOT NULL DEFAULT 0, created REAL NOT NULL, "
+                "PRIMARY KEY (session_id, seq))"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # Bağlantı işlem (transaction) sonunda kapatılır
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def append(self, session_id, seq, message):
+        """
+        Mesajı ekler.
+
+        Args:
+            session_id: Oturum kimliği
+            seq: Mesajın oturumdaki sırası (0'dan başlar)
+            message: {"role", "content", ...} sözlüğü
+
+        Raises:
+            sqlite3.IntegrityError: Bu sıra numarası başka bir sekmece kullanılmışsa
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO messages (session_id, seq, role, content, meta, prompt_tokens, "
+                "response_tokens, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                _message_row(session_id, seq, message),
+            )
+
+    def count(self, session_id):
+        """
+        Returns:
+            int: Oturumdaki mesaj sayısı
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0]
+
+    def load(self, session_id, start, stop):
+        """
+        Args:
+            session_id: Oturum kimliği
+            start: İlk mesajın sırası
+            stop: Son mesajın sırası + 1
+
+        Returns:
+            list: [start, stop) aralığındaki mesajlar
+        """
+        if stop <= start:
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT role, content, meta FROM messages WHERE session_id = ? AND seq >= ? AND seq < ? "
+                "ORDER BY seq",
+                (session_id, start, stop),
+            ).fetchall()
+        return [_row_message(*row) for row in rows]
+
+    def iter_messages(self, session_id, page_size=EXPORT_PAGE_SIZE):
+        """
+        Oturumun tüm mesajlarını sayfa sayfa okur; bellekte bir sayfadan fazlası tutulmaz.
+
+        Args:
+            session_id: Oturum kimliği
+            page_size: Sayfa başına mesaj
+
+        Yields:
+            dict: Mesaj
+        """
+        seq = 0
+        while True:
+            page = self.load(session_id, seq, seq + page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            seq += page_size
+
+    def token_totals(self, session_id):
+        """
+        Returns:
+            dict: prompt ve response token toplamları
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(response_tokens), 0) "
+                "FROM messages WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        return {"prompt": row[0], "response": row[1]}
+
+    def clear(self, session_id):
+        """Oturumun tüm mesajlarını siler."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+
+class ChatHistory(Sequence):
+    """
+    Bir oturumun sohbet geçmişi: liste gibi okunur, mesajlar append ile eklenir.
+
+    Bellekte yalnızca son `window` mesaj tutulur; daha eski indekslere erişim
+    depodan okunur. Depo yoksa tüm mesajlar bellekte tutulur.
+    """
+
+    def __init__(self, session_id, store=None, window=50):
+        """
+        Args:
+            session_id: Oturum kimliği
+            store: ChatStore (None ise yalnızca bellek)
+            window: Bellekte tutulacak son mesaj sayısı (depo varsa)
+        """
+        self.session_id = session_id
+        self.store = store
+        self._window = deque(maxlen=window if store else None)
+        self._count = 0
+        self._lock = threading.Lock()
+        if store:
+            # Önceki çalıştırmadan kalan oturum: yalnızca son pencere yüklenir
+            self._count = store.count(session_id)
+            self._window.extend(store.load(session_id, max(0, self._count - window), self._count))
+
+    @property
+    def persistent(self):
+        return self.store is not None
+
+    def __len__(self):
+        return self._count
+
+    def _range(self, start, stop):
+        window_start = self._count - len(self._window)
+        if start >= window_start:
+            return list(itertools.islice(self._window, start - window_start, stop - window_start))
+        older = self.store.load(self.session_id, start, min(stop, window_start))
+        return older + list(itertools.islice(self._window, 0, max(0, stop - window_start)))
+
+    def __getitem__(self, i):
+        with self._lock:
+            if isinstance(i, slice):
+                start, stop, step = i.indices(self._count)
+                items = self._range(start, max(start, stop)) if step == 1 else self._range(0, self._count)[i]
+                return items
+            if i < 0:
+                i += self._count
+            if not 0 <= i < self._count:
+                raise IndexError("mesaj numarası aralık dışında")
+            return self._range(i, i + 1)[0]
+
+    def append(self, message):
+        """
+        Mesajı depoya yazar ve pencereye ekler.
+
+        Args:
+            message: {"role", "content", ...} sözlüğü
+        """
+        with self._lock:
+            if self.store:
+                try:
+                    self.store.append(self.session_id, self._count, message)
+                except sqlite3.IntegrityError:
+                    # Aynı oturum başka bir sekmede de açık: sırayı depodan tazele
+                    self._count = self.store.count(self.session_id)
+                    self.store.append(self.session_id, self._count, message)
+            self._window.append(message)
+            self._count += 1
+
+    def recent(self, count):
+        """
+        Args:
+            count: En fazla mesaj
+
+        Returns:
+            list: Son mesajlar (pencereden büyükse eksik kısım depodan okunur)
+        """
+        return self[max(0, self._count - count):]
+
+    def in_memory(self):
+        """
+        Returns:
+            list: Bellekteki pencerenin mesajları (depodan okuma yapılmaz)
+        """
+        with self._lock:
+            return list(self._window)
+
+    def head(self, length):
+        """
+        Args:
+            length: Görünümdeki mesaj sayısı
+
+        Returns:
+            HistoryView: İlk `length` mesajın kopyalanmadan okunan görünümü
+        """
+        return HistoryView(self, max(0, min(length, self._count)))
+
+    def iter_all(self):
+        """
+        Yields:
+            dict: Tüm mesajlar; depo varsa sayfa sayfa okunur
+        """
+        if self.store:
+            yield from self.store.iter_messages(self.session_id)
+        else:
+            yield from list(self._window)
+
+    def token_totals(self):
+        """
+        Returns:
+            dict: Oturum boyunca prompt ve response token toplamları
+        """
+        if self.store:
+            return self.store.token_totals(self.session_id)
+        totals = {"prompt": 0, "response": 0}
+        for message in self._window:
+            for key in totals:
+                totals[key] += (message.get("usage") or {}).get(key, 0)
+        return totals
+
+    def clear(self):
+        """Geçmişi (depodakiler dahil) siler."""
+        with self._lock:
+            if self.store:
+                self.store.clear(self.session_id)
+            self._window.clear()
+            self._count = 0
+
+
+class HistoryView(Sequence):
+    """ChatHistory'nin ilk N mesajını gösteren salt okunur görünüm."""
+
+    def __init__(self, history, length):
+        self._history = history
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._history[slice(*i.indices(self._length))]
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("mesaj numarası aralık dışında")
+        return self._history[i]
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def chat_memory_window():
+    """
+    CHAT_MEMORY_WINDOW ortam değişkenini okur (varsayılan 50).
+
+    Returns:
+        int: Oturum başına bellekte tutulacak son mesaj sayısı
+    """
+    try:
+        return max(4, int(os.getenv("CHAT_MEMORY_WINDOW", "50")))
+    except ValueError:
+        return 50
+
+
+def get_chat_store():
+    """
+    CHAT_DB ortam değişkenine göre süreç geneli sohbet deposunu döndürür.
+
+    Varsayılan .cache/chat.db; CHAT_DB boş bırakılırsa sohbetler yalnızca bellekte tutulur.
+
+    Returns:
+        ChatStore | None: Depo (kapalıysa None)
+    """
+    global _default_store
+    path = os.getenv("CHAT_DB", os.path.join(".cache", "chat.db"))
+    if not path:
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ChatStore(path)
+        return _default_store
+
+
+def open_chat_history(session_id):
+    """
+    Oturumun geçmişini açar (depoda varsa son pencere yüklenir).
+
+    Args:
+        session_id: Oturum kimliği
+
+    Returns:
+        ChatHistory: Oturum geçmişi
+    """
+    return ChatHistory(session_id, get_chat_store(), chat_memory_window())
+
+
+__all__ = [
+    "EXPORT_PAGE_SIZE",
+    "ChatStore",
+    "ChatHistory",
+    "HistoryView",
+    "chat_memory_window",
+    "get_chat_store",
+    "open_chat_history",
+]
@@ -0,0 +1,368 @@
+"""
+Belge metni için kompakt parça deposu.
+Metin tek bir UTF-8 tamponunda bir kez tutulur (bellekte, zlib blokları halinde
+sıkıştırılmış ya da diskten bellek eşlemeli); parçalar array tabanlı bir konum
+tablosuyla tanımlanır ve metinleri yalnızca erişildiğinde tampondan çözülür.
+"""
+
+import array
+import mmap
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict, deque
+
+from pdf_pipeline import Chunk
+
+STORE_MODES = ("memory", "zlib", "mmap")
+
+# zlib modunda bağımsız sıkıştırılan blok boyutu ve açık tutulan blok sayısı
+ZLIB_BLOCK_SIZE = 64 * 1024
+ZLIB_BLOCK_CACHE = 8
+
+
+def _byte_offsets(text, positions):
+    # Karakter konumlarını UTF-8 bayt konumlarına tek geçişte çevirir
+    result = {}
+    previous = 0
+    byte_pos = 0
+    for pos in sorted(set(positions)):
+        byte_pos += len(text[previous:pos].encode("utf-8"))
+        result[pos] = byte_pos
+        previous = pos
+    return result
+
+
+class ChunkStore:
+    """
+    Parça listesi gibi davranan (len, indeks, dilim, gezinme) salt okunur depo.
+
+    Erişilen her eleman bir Chunk'tır; metni o anda tampondan kopyalanmadan
+    (memoryview üzerinden) çözülür, depoda kalıcı bir kopyası tutulmaz.
+    """
+
+    def __init__(self, text, chunks, mode="memory"):
+        """
+        Args:
+            text: Belgenin tam metni (parçaların konumları bu metne göredir)
+            chunks: Chunk listesi (text[start:end] == chunk.text)
+            mode: "memory", "zlib" veya "mmap"
+        """
+        if mode not in STORE_MODES:
+            raise ValueError(f"Geçersiz depo modu: {mode}")
+
+        positions = [0, len(text)]
+        for chunk in chunks:
+            positions.extend((chunk.start, chunk.end))
+        byte_at = _byte_offsets(text, positions)
+
+        # Her parça için [başlangıç, bitiş] çiftleri
+        self._bytes = array.array("q")
+        self._chars = array.array("q")
+        self._pages = array.array("l")
+        for chunk in chunks:
+            self._bytes.extend((byte_at[chunk.start], byte_at[chunk.end]))
+            self._chars.extend((chunk.start, chunk.end))
+            self._pages.extend((chunk.page_start, chunk.page_end))
+
+        self.char_length = len(text)
+        self._load(mode, text.encode("utf-8"))
+
+    def _load(self, mode, data):
+        self.mode = mode
+        self.byte_length = len(data)
+        self._buffer = None
+        self._blocks = None
+        self._block_cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        if mode == "zlib":
+            self._blocks = [
+                zlib.compress(data[i:i + ZLIB_BLOCK_SIZE])
+                for i in range(0, len(data), ZLIB_BLOCK_SIZE)
+            ]
+        elif mode == "mmap" and data:
+            # Dosya adı hemen silinir; eşleme kapanınca disk alanı da geri verilir
+            with tempfile.TemporaryFile(dir=os.getenv("CHUNK_STORE_DIR") or None) as f:
+                f.write(data)
+                f.flush()
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._buffer = data
+
+    def _block(self, i):
+        with self._lock:
+            block = self._block_cache.get(i)
+            if block is not None:
+                self._block_cache.move_to_end(i)
+                return block
+        block = zlib.decompress(self._blocks[i])
+        with self._lock:
+            self._block_cache[i] = block
+            while len(self._block_cache) > ZLIB_BLOCK_CACHE:
+                self._block_cache.popitem(last=False)
+        return block
+
+    def read_bytes(self, start, end):
+        """
+        Tamponun [start, end) bayt aralığını çözer.
+
+        Args:
+            start: Başlangıç baytı
+            end: Bitiş baytı
+
+        Returns:
+            str: Aralıktaki metin
+        """
+        if self._blocks is None:
+            if self._buffer is None:
+                return ""
+            return str(memoryview(self._buffer)[start:end], "utf-8")
+        first, last = start // ZLIB_BLOCK_SIZE, (end - 1) // ZLIB_BLOCK_SIZE
+        if first == last:
+            block = self._block(first)
+            base = first * ZLIB_BLOCK_SIZE
+            return str(memoryview(block)[start - base:end - base], "utf-8")
+        data = b"".join(self._block(i) for i in range(first, last + 1))
+        base = first * ZLIB_BLOCK_SIZE
+        return data[start - base:end - base].decode("utf-8")
+
+    def _chunk(self, i):
+        b = self._bytes
+        c = self._chars
+        p = self._pages
+        j = 2 * i
+        return Chunk(self.read_bytes(b[j], b[j + 1]), p[j], p[j + 1], c[j], c[j + 1])
+
+    def __len__(self):
+        return len(self._chars) // 2
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._chunk(j) for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("parça numarası aralık dışında")
+        return self._chunk(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._chunk(i)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def page_spans(self):
+        """
+        Returns:
+            list: Parça başına (page_start, page_end); metin çözülmez
+        """
+        p = self._pages
+        return list(zip(p[::2], p[1::2]))
+
+    @property
+    def text(self):
+        """Belgenin tam metni (her erişimde yeniden çözülür)."""
+        return self.read_bytes(0, self.byte_length)
+
+    def preview(self, chars=500):
+        """
+        Metnin başını döndürür; tüm tamponu çözmez.
+
+        Args:
+            chars: En fazla karakter
+
+        Returns:
+            str: Önizleme metni
+        """
+        # UTF-8'de bir karakter en fazla 4 bayttır; yarım kalan son karakter atılır
+        end = min(self.byte_length, chars * 4)
+        head = self._head_bytes(end)
+        return head.decode("utf-8", errors="ignore")[:chars]
+
+    def _head_bytes(self, end):
+        if self._blocks is None:
+            return bytes(memoryview(self._buffer)[:end]) if self._buffer is not None else b""
+        data = b""
+        i = 0
+        while len(data) < end and i < len(self._blocks):
+            data += self._block(i)
+            i += 1
+        return data[:end]
+
+    def memory_usage(self):
+        """
+        Deponun bellek kullanımını döndürür.
+
+        Returns:
+            dict: heap (süreç belleğindeki bayt), mapped (diskten eşlenen bayt),
+                text_bytes (sıkıştırılmamış metin boyutu)
+        """
+        offsets = sum(a.itemsize * len(a) for a in (self._bytes, self._chars, self._pages))
+        if self._blocks is not None:
+            heap = sum(len(block) for block in self._blocks)
+            heap += sum(len(block) for block in list(self._block_cache.values()))
+            mapped = 0
+        elif self.mode == "mmap":
+            heap, mapped = 0, self.byte_length
+        else:
+            heap, mapped = self.byte_length, 0
+        return {"heap": heap + offsets, "mapped": mapped, "text_bytes": self.byte_length}
+
+    def close(self):
+        """Bellek eşlemeli tamponu kapatır."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+            self._buffer = None
+
+    def __getstate__(self):
+        # Eşleme ve kilit serileştirilemez; tampon içeriği baytlar olarak saklanır
+        if self._blocks is not None:
+            data = None
+        elif self._buffer is None:
+            data = b""
+        else:
+            data = bytes(self._buffer)
+        return {
+            "mode": self.mode,
+            "data": data,
+            "blocks": self._blocks,
+            "byte_length": self.byte_length,
+            "char_length": self.char_length,
+            "bytes": self._bytes,
+            "chars": self._chars,
+            "pages": self._pages,
+        }
+
+    def __setstate__(self, state):
+        self._bytes = state["bytes"]
+        self._chars = state["chars"]
+        self._pages = state["pages"]
+        self.char_length = state["char_length"]
+        if state["blocks"] is not None:
+            self._load("memory", b"")
+            self.mode = "zlib"
+            self._blocks = state["blocks"]
+            self.byte_length = state["byte_length"]
+        else:
+            self._load(state["mode"], state["data"])
+
+
+class ChunkStoreWriter:
+    """
+    Metni blok blok ekleyerek ChunkStore kurar.
+
+    Tam metin hiçbir zaman str olarak birleştirilmez: mmap modunda bloklar geçici
+    bir dosyaya, memory modunda tek bir bayt tamponuna yazılır, zlib modunda
+    dolan bloklar hemen sıkıştırılır. Bayt konumu hesaplamak için yalnızca son
+    birkaç blok tutulur.
+    """
+
+    def __init__(self, keep_chars, directory=None, mode="mmap"):
+        """
+        Args:
+            keep_chars: Geriye dönük tutulacak en az karakter (parça boyutu + örtüşme)
+            directory: Geçici dosya dizini (None ise CHUNK_STORE_DIR veya sistem varsayılanı)
+            mode: Kurulacak deponun modu ("memory", "zlib" veya "mmap")
+        """
+        if mode not in STORE_MODES:
+            raise ValueError(f"Geçersiz depo modu: {mode}")
+        self.mode = mode
+        self.keep_chars = keep_chars
+        self._file = None
+        if mode == "mmap":
+            self._file = tempfile.TemporaryFile(dir=directory or os.getenv("CHUNK_STORE_DIR") or None)
+        self._data = bytearray()  # memory: tüm metin; zlib: henüz sıkıştırılmamış kuyruk
+        self._blocks = []  # zlib blokları
+        self._recent = deque()  # (karakter_başı, bayt_başı, blok_metni)
+        self._bytes = array.array("q")
+        self._chars = array.array("q")
+        self._pages = array.array("l")
+        self.char_length = 0
+        self.byte_length = 0
+
+    def write_block(self, text):
+        """
+        Metnin sonuna bir blok ekler.
+
+        Args:
+            text: Blok metni (blokların birleşimi tam metindir)
+        """
+        data = text.encode("utf-8")
+        if self._file is not None:
+            self._file.write(data)
+        else:
+            self._data += data
+            while self.mode == "zlib" and len(self._data) >= ZLIB_BLOCK_SIZE:
+                self._blocks.append(zlib.compress(self._data[:ZLIB_BLOCK_SIZE]))
+                del self._data[:ZLIB_BLOCK_SIZE]
+        block_start = self.char_length
+        self._recent.append((block_start, self.byte_length, text))
+        self.char_length += len(text)
+        self.byte_length += len(data)
+        # Bu bloğu işlerken üretilen parçalar, bloğun başından en fazla keep_chars geride başlar
+        while len(self._recent) > 1 and self._recent[1][0] <= block_start - self.keep_chars:
+            self._recent.popleft()
+
+    def _byte_at(self, pos):
+        for char_start, byte_start, text in reversed(self._recent):
+            if char_start <= pos:
+                return byte_start + len(text[:pos - char_start].encode("utf-8"))
+        raise ValueError("parça konumu tutulan blokların gerisinde")
+
+    def add_chunk(self, chunk):
+        """
+        Args:
+            chunk: Yazılmış bloklar içindeki Chunk
+        """
+        self._bytes.extend((self._byte_at(chunk.start), self._byte_at(chunk.end)))
+        self._chars.extend((chunk.start, chunk.end))
+        self._pages.extend((chunk.page_start, chunk.page_end))
+
+    def finish(self):
+        """
+        Returns:
+            ChunkStore: Yazıcının modunda depo
+        """
+        store = ChunkStore.__new__(ChunkStore)
+        store._bytes = self._bytes
+        store._chars = self._chars
+        store._pages = self._pages
+        store.char_length = self.char_length
+        store._load("memory", b"")
+        store.mode = self.mode
+        store.byte_length = self.byte_length
+        if self.mode == "mmap":
+            if self.byte_length:
+                self._file.flush()
+                store._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._file.close()
+        elif self.mode == "zlib":
+            if self._data:
+                self._blocks.append(zlib.compress(self._data))
+            store._buffer = None
+            store._blocks = self._blocks
+        else:
+            # Tampon kopyalanmadan depoya devredilir
+            store._buffer = self._data
+        self._data = bytearray()
+        self._blocks = []
+        self._recent.clear()
+        return store
+
+
+def default_store_mode():
+    """
+    CHUNK_STORE_MODE ortam değişkenini okur (varsayılan "memory").
+
+    Returns:
+        str: "memory", "zlib" veya "mmap"
+    """
+    mode = os.getenv("CHUNK_STORE_MODE", "memory").strip().lower()
+    return mode if mode in STORE_MODES else "memory"
+
+
+__all__ = ["STORE_MODES", "ChunkStore", "ChunkStoreWriter", "default_store_mode"]
@@ -0,0 +1,290 @@
+"""
+Token bütçesine göre prompt bağlamı hazırlama.
+Aday parçalar token başına alaka oranına göre açgözlü (greedy) seçilir, birbirinin
+neredeyse aynısı olan parçalar elenir ve bütçeye sığmayan parça cümle sınırından
+kısaltılır. Token sayıları, modelin count_tokens sonuçları ve yanıtlardaki gerçek
+kullanımla kalibre edilen hızlı bir yerel tahminciyle hesaplanır.
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+from retrieval import tokenize
+
+# Bağlam için model başına varsayılan token bütçesi (CONTEXT_TOKEN_BUDGET ile ezilebilir)
+MODEL_CONTEXT_BUDGETS = {
+    "gemini-flash-latest": 1000,
+    "gemini-1.5-flash": 1200,
+    "gemini-2.0-flash-exp": 1200,
+    "gemini-1.5-pro": 2000,
+}
+DEFAULT_CONTEXT_BUDGET = 1000
+
+# Bütçe doluyken eklenmeye değmeyecek kadar küçük kalan alan (token)
+MIN_PASSAGE_TOKENS = 40
+
+# Bu oranın üzerinde ortak 3-kelimelik dizi içeren parçalar yinelenmiş sayılır
+DUPLICATE_CONTAINMENT = 0.8
+
+# Tahmincinin başlangıç varsayımı (karakter/token) ve bu varsayımın ağırlığı (token)
+_PRIOR_CHARS_PER_TOKEN = 4.0
+_PRIOR_TOKENS = 2000
+# Yeni gözlemlerin eski gözlemleri sönümleme katsayısı
+_DECAY = 0.9
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s+|\n\s*\n")
+
+# Aday bağlam parçası: etiket (ör. "Sayfa 3"), metin ve arama skoru
+Passage = namedtuple("Passage", ["label", "text", "score"])
+
+
+class TokenEstimator:
+    """
+    Karakter/token oranıyla çalışan, gözlemlerle kendini düzelten token tahmincisi.
+    """
+
+    def __init__(self, chars_per_token=_PRIOR_CHARS_PER_TOKEN):
+        """
+        Args:
+            chars_per_token: Başlangıç karakter/token oranı
+        """
+        self._chars = chars_per_token * _PRIOR_TOKENS
+        self._tokens = float(_PRIOR_TOKENS)
+        self._lock = threading.Lock()
+        self.observations = 0
+
+    @property
+    def chars_per_token(self):
+        return self._chars / self._tokens
+
+    def estimate(self, text):
+        """
+        Args:
+            text: Metin
+
+        Returns:
+            int: Tahmini token sayısı
+        """
+        if not text:
+            return 0
+        return max(1, math.ceil(len(text) / self.chars_per_token))
+
+    def observe(self, text, tokens):
+        """
+        Gerçek token sayısını (count_tokens veya usage_metadata) kaydeder.
+
+        Args:
+            text: Sayılan metin
+            tokens: Modelin bildirdiği token sayısı
+        """
+        if not text or not tokens:
+            return
+        with self._lock:
+            self._chars = self._chars * _DECAY + len(text)
+            self._tokens = self._tokens * _DECAY + tokens
+            self.observations += 1
+
+    def calibrate(self, model, texts):
+        """
+        Örnek metinleri modelin count_tokens metoduyla sayıp oranı günceller.
+
+        Args:
+            model: count_tokens metodu olan model
+            texts: Örnek metinler
+        """
+        for text in texts:
+            tokens = count_tokens_cached(model, text)
+            if tokens:
+                self.observe(text, tokens)
+
+
+_count_cache = OrderedDict()
+_count_cache_lock = threading.Lock()
+_COUNT_CACHE_SIZE = 1024
+
+
+def count_tokens_cached(model, text):
+    """
+    model.count_tokens sonucunu (model, metin özeti) anahtarıyla önbellekten döndürür.
+
+    Args:
+        model: count_tokens metodu olan model
+        text: Metin
+
+    Returns:
+        int | None: Token sayısı (model desteklemiyorsa veya hata olursa None)
+    """
+    if not hasattr(model, "count_tokens") or not text:
+        return None
+    key = (getattr(model, "model_name", str(model)), hashlib.sha1(text.encode("utf-8")).hexdigest())
+    with _count_cache_lock:
+        if key in _count_cache:
+            _count_cache.move_to_end(key)
+            return _count_cache[key]
+    try:
+        tokens = model.count_tokens(text).total_tokens
+    except Exception:
+        return None
+    with _count_cache_lock:
+        _count_cache[key] = tokens
+        while len(_count_cache) > _COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+    return tokens
+
+
+_estimators = {}
+_estimators_lock = threading.Lock()
+
+
+def _base_model_name(model_name):
+    return model_name[len("models/"):] if model_name.startswith("models/") else model_name
+
+
+def get_estimator(model_name):
+    """
+    Model başına süreç geneli token tahmincisini döndürür.
+
+    Args:
+        model_name: Model adı ("models/" ön eki olabilir)
+
+    Returns:
+        TokenEstimator: Paylaşılan tahminci
+    """
+    name = _base_model_name(model_name)
+    with _estimators_lock:
+        estimator = _estimators.get(name)
+        if estimator is None:
+            estimator = _estimators[name] = TokenEstimator()
+        return estimator
+
+
+def context_budget(model_name):
+    """
+    Model için bağlam token bütçesini döndürür.
+
+    CONTEXT_TOKEN_BUDGET tanımlıysa tüm modeller için o kullanılır.
+
+    Args:
+        model_name: Model adı
+
+    Returns:
+        int: Token bütçesi
+    """
+    try:
+        override = int(os.getenv("CONTEXT_TOKEN_BUDGET", "0"))
+    except ValueError:
+        override = 0
+    if override > 0:
+        return override
+    return MODEL_CONTEXT_BUDGETS.get(_base_model_name(model_name), DEFAULT_CONTEXT_BUDGET)
+
+
+def _shingles(text):
+    # Karşılaştırma yalnızca süreç içinde yapıldığından yerleşik hash yeterli
+    words = tokenize(text)
+    if len(words) < 3:
+        return {hash(tuple(words))}
+    return set(map(hash, zip(words, words[1:], words[2:])))
+
+
+def _is_duplicate(shingles, selected):
+    for other in selected:
+        common = len(shingles & other)
+        if common and common / min(len(shingles), len(other)) >= DUPLICATE_CONTAINMENT:
+            return True
+    return False
+
+
+def trim_to_budget(text, budget, estimator):
+    """
+    Metni tahmini token bütçesine sığacak şekilde cümle sınırından kısaltır.
+
+    Hiç cümle sınırı yoksa (ör. noktalama içermeyen PDF metni) kelime sınırından kesilir.
+
+    Args:
+        text: Metin
+        budget: Token bütçesi
+        estimator: TokenEstimator
+
+    Returns:
+        str: Kısaltılmış metin (sığmıyorsa boş)
+    """
+    if estimator.estimate(text) <= budget:
+        return text
+    max_chars = int(budget * estimator.chars_per_token)
+    cut = 0
+    for match in _SENTENCE_END_RE.finditer(text, 0, max_chars + 1):
+        cut = match.start()
+    if cut == 0:
+        cut = text.rfind(" ", 0, max_chars)
+    return text[:cut].rstrip() if cut > 0 else ""
+
+
+def pack_context(passages, budget, estimator):
+    """
+    Aday parçalardan token bütçesine sığan bağlamı seçer.
+
+    Args:
+        passages: Passage listesi (skora göre azalan sırada)
+        budget: Bağlam için token bütçesi
+        estimator: TokenEstimator
+
+    Returns:
+        list: Seçilen (gerekirse kısaltılmış) Passage'lar, arama sırasıyla
+    """
+    costs = [estimator.estimate(f"[{p.label}]\n{p.text}\n\n") for p in passages]
+    # Token başına alaka en yüksek olan önce; eşitlikte arama sırası korunur
+    order = sorted(range(len(passages)), key=lambda i: (-passages[i].score / max(costs[i], 1), i))
+
+    remaining = budget
+    chosen = {}
+    selected_shingles = []
+    for i in order:
+        if remaining < MIN_PASSAGE_TOKENS and chosen:
+            break
+        passage = passages[i]
+        shingles = _shingles(passage.text)
+        if _is_duplicate(shingles, selected_shingles):
+            continue
+        text = passage.text
+        cost = costs[i]
+        if cost > remaining:
+            header = estimator.estimate(f"[{passage.label}]\n\n\n")
+            text = trim_to_budget(text, remaining - header, estimator)
+            if not text:
+                continue
+            cost = estimator.estimate(f"[{passage.label}]\n{text}\n\n")
+        chosen[i] = passage._replace(text=text)
+        selected_shingles.append(shingles)
+        remaining -= cost
+
+    return [chosen[i] for i in sorted(chosen)]
+
+
+def format_context(passages):
+    """
+    Args:
+        passages: Passage listesi
+
+    Returns:
+        str: Etiketli, birleştirilmiş bağlam metni
+    """
+    return "\n\n".join(f"[{p.label}]\n{p.text}" for p in passages)
+
+
+__all__ = [
+    "MODEL_CONTEXT_BUDGETS",
+    "DEFAULT_CONTEXT_BUDGET",
+    "Passage",
+    "TokenEstimator",
+    "count_tokens_cached",
+    "get_estimator",
+    "context_budget",
+    "trim_to_budget",
+    "pack_context",
+    "format_context",
+]
@@ -0,0 +1,239 @@
+"""
+Prompt'a eklenen sohbet geçmişi için sabit boyutlu konuşma belleği.
+Son tur tam metniyle gönderilir; pencereden çıkan eski turlar, soruyla en çok
+örtüşen yanıt cümleleri seçilerek (çıkarımsal) kısa özet satırlarına katlanır.
+Özet yalnızca yeni turlar pencereyi kaydırdığında artımlı olarak güncellenir ve
+oturum başına saklanır; konuşma ne kadar uzarsa uzasın prompt boyutu sabit kalır.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict, deque
+
+from context_packer import TokenEstimator, trim_to_budget
+from retrieval import tokenize
+
+# Tam metniyle gönderilecek son tur sayısı (bir tur: soru ve yanıtı)
+RECENT_TURNS = 1
+
+# Token bütçeleri: son tur, tüm özet ve özetteki tek bir tur
+RECENT_TOKENS = 400
+SUMMARY_TOKENS = 200
+ENTRY_TOKENS = 60
+
+# Süreçte saklanacak en fazla oturum belleği
+MAX_SESSIONS = 256
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+
+def _fingerprint(message):
+    return hashlib.sha1(f"{message['role']}\0{message['content']}".encode("utf-8")).hexdigest()
+
+
+def _window_start(messages, turns):
+    # Son `turns` kullanıcı mesajının ilkinin konumu; penceredekiler özetlenmez
+    seen = 0
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i]["role"] == "user":
+            seen += 1
+            if seen == turns:
+                return i
+    return 0
+
+
+def _split_turns(messages):
+    # Her kullanıcı mesajı, ardından gelen asistan mesajlarıyla bir tur oluşturur
+    turns = []
+    for message in messages:
+        if message["role"] == "user" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _sentences(text):
+    return [sentence.strip() for sentence in _SENTENCE_RE.split(text) if sentence.strip()]
+
+
+def summarize_turn(question, answer, budget, estimator):
+    """
+    Bir turu tek satırlık çıkarımsal özete indirger.
+
+    Yanıt cümleleri soruyla ortak kelime sayısına göre (eşitlikte öndeki cümle)
+    seçilir ve özgün sıralarıyla birleştirilir.
+
+    Args:
+        question: Kullanıcı sorusu
+        answer: Asistan yanıtı
+        budget: Satır için token bütçesi
+        estimator: TokenEstimator
+
+    Returns:
+        str: "K: ... → A: ..." biçiminde özet satırı
+    """
+    question_text = trim_to_budget(" ".join(question.split()), budget // 3, estimator) or question[:80]
+    line = f"K: {question_text}"
+    remaining = budget - estimator.estimate(line)
+
+    sentences = _sentences(answer)
+    if not sentences or remaining <= 0:
+        return line
+
+    terms = set(tokenize(question))
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: (-len(terms.intersection(tokenize(sentences[i]))), i)
+    )
+    chosen = []
+    for i in ranked:
+        cost = estimator.estimate(sentences[i]) + 1
+        if cost > remaining:
+            if not chosen:
+                # Tek cümle bile sığmıyorsa kelime sınırından kısaltılır
+                trimmed = trim_to_budget(sentences[i], remaining, estimator)
+                if trimmed:
+                    chosen.append((i, trimmed))
+            continue
+        chosen.append((i, sentences[i]))
+        remaining -= cost
+    if not chosen:
+        return line
+    return f"{line} → A: {' '.join(text for i, text in sorted(chosen))}"
+
+
+class ConversationMemory:
+    """
+    Bir oturumun eski turlarının özetini ve özetlenen konumunu tutar.
+    """
+
+    def __init__(self, recent_turns=RECENT_TURNS, summary_tokens=SUMMARY_TOKENS,
+                 entry_tokens=ENTRY_TOKENS, recent_tokens=RECENT_TOKENS):
+        """
+        Args:
+            recent_turns: Tam metniyle gönderilecek son tur sayısı
+            summary_tokens: Özetin toplam token bütçesi
+            entry_tokens: Özetteki tur başına token bütçesi
+            recent_tokens: Son turların toplam token bütçesi
+        """
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.entry_tokens = entry_tokens
+        self.recent_tokens = recent_tokens
+        self.entries = deque()  # (özet_satırı, tahmini_token)
+        self.dropped_turns = 0  # Özet bütçesine sığmayıp atılan en eski turlar
+        self.updates = 0  # Özetin güncellendiği çağrı sayısı
+        self._summary_tokens_used = 0
+        self._folded = 0  # Özete katlanmış mesaj sayısı
+        self._last_folded = None  # Katlanan son mesajın özeti (geçmiş değişti mi?)
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Özeti temizler (ör. sohbet silindiğinde)."""
+        self.entries.clear()
+        self.dropped_turns = 0
+        self._summary_tokens_used = 0
+        self._folded = 0
+        self._last_folded = None
+
+    def _sync(self, messages, estimator):
+        boundary = _window_start(messages, self.recent_turns)
+        if self._folded and (
+            boundary < self._folded or _fingerprint(messages[self._folded - 1]) != self._last_folded
+        ):
+            # Geçmiş kısaldı veya değişti: özet baştan kurulur
+            self.reset()
+        if boundary <= self._folded:
+            return
+
+        for turn in _split_turns(messages[self._folded:boundary]):
+            question = " ".join(m["content"] for m in turn if m["role"] == "user")
+            answer = " ".join(m["content"] for m in turn if m["role"] != "user")
+            line = summarize_turn(question, answer, self.entry_tokens, estimator)
+            cost = estimator.estimate(line)
+            self.entries.append((line, cost))
+            self._summary_tokens_used += cost
+        # Bütçe aşılırsa en eski satırlar düşer; özet boyutu sabit kalır
+        while len(self.entries) > 1 and self._summary_tokens_used > self.summary_tokens:
+            line, cost = self.entries.popleft()
+            self._summary_tokens_used -= cost
+            self.dropped_turns += 1
+
+        self._folded = boundary
+        self._last_folded = _fingerprint(messages[boundary - 1])
+        self.updates += 1
+
+    def render(self, messages, estimator=None):
+        """
+        Geçmişi prompt'a eklenecek metne çevirir; gerekirse özeti önce günceller.
+
+        Args:
+            messages: {"role", "content"} sözlüklerinden oluşan sohbet geçmişi
+            estimator: TokenEstimator (None ise kalibre edilmemiş varsayılan)
+
+        Returns:
+            str: "Önceki özet:" ve "Önceki:" bölümleri (geçmiş yoksa boş)
+        """
+        if not messages:
+            return ""
+        estimator = estimator or TokenEstimator()
+        with self._lock:
+            self._sync(messages, estimator)
+            summary = [line for line, cost in self.entries]
+            boundary = self._folded
+
+        parts = []
+        if summary:
+            parts.append("Önceki özet:\n" + "\n".join(f"- {line}" for line in summary) + "\n")
+
+        recent = messages[boundary:]
+        if recent:
+            # Son turlar tam gönderilir; çok uzun yanıtlar cümle sınırından kısaltılır
+            share = max(self.recent_tokens // len(recent), 1)
+            lines = []
+            for message in recent:
+                role = "K" if message["role"] == "user" else "A"
+                content = message["content"]
+                if estimator.estimate(content) > share:
+                    content = (trim_to_budget(content, share, estimator) or content[:share * 4]) + " ..."
+                lines.append(f"{role}: {content}")
+            parts.append("Önceki:\n" + "\n".join(lines) + "\n")
+
+        return "\n".join(parts)
+
+
+_memories = OrderedDict()
+_memories_lock = threading.Lock()
+
+
+def get_conversation_memory(session_id):
+    """
+    Oturumun konuşma belleğini döndürür (yoksa oluşturur).
+
+    Args:
+        session_id: Oturum kimliği (None ise paylaşılmayan yeni bir bellek)
+
+    Returns:
+        ConversationMemory: Oturum belleği
+    """
+    if session_id is None:
+        return ConversationMemory()
+    with _memories_lock:
+        memory = _memories.get(session_id)
+        if memory is None:
+            memory = _memories[session_id] = ConversationMemory()
+            while len(_memories) > MAX_SESSIONS:
+                _memories.popitem(last=False)
+        else:
+            _memories.move_to_end(session_id)
+        return memory
+
+
+__all__ = [
+    "RECENT_TURNS",
+    "ConversationMemory",
+    "summarize_turn",
+    "get_conversation_memory",
+]
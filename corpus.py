@@ -0,0 +1,185 @@
+"""
+Bir oturumda birden fazla PDF'i birlikte sorgulamak için belge külliyatı.
+Her belge process_document sonucunu ve kendi indeks parçasını (shard) taşır;
+belge eklemek veya çıkarmak diğer belgelerin indekslerini yeniden kurmaz.
+"""
+
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from retrieval import ShardedIndex
+
+
+def document_memory_usage(document):
+    """
+    Bir belgenin yaklaşık bellek kullanımını döndürür.
+
+    Args:
+        document: process_document sonucu
+
+    Returns:
+        dict: text (parça deposu, süreç belleği), mapped (diskten eşlenen),
+            vectors (vektör matrisi), total (süreç belleğindeki toplam) bayt
+    """
+    usage = document["chunks"].memory_usage()
+    text, mapped, vectors = usage["heap"], usage["mapped"], 0
+    matrix = document["index"].vectors.matrix
+    # Büyük dosya modunda vektörler diskten eşlenir, süreç belleğinde tutulmaz
+    if isinstance(matrix, np.memmap):
+        mapped += matrix.nbytes
+    else:
+        vectors += matrix.nbytes
+    return {"text": text, "mapped": mapped, "vectors": vectors, "total": text + vectors}
+
+
+class Corpus:
+    """
+    Ad -> işlenmiş belge eşlemesi ve belgeler arası arama.
+    """
+
+    def __init__(self, registry=None):
+        """
+        Args:
+            registry: Belgeler oturumlar arası paylaşılıyorsa DocumentRegistry; içerik
+                anahtarlı ("content_key") belgelerin referansları burada sayılır
+        """
+        self.documents = OrderedDict()  # ad -> process_document sonucu
+        self.index = ShardedIndex()
+        self.registry = registry
+        self._keys = {}  # ad -> kayıttaki içerik anahtarı
+        if registry is not None:
+            # Oturum kapanıp külliyat toplandığında referanslar bırakılır
+            weakref.finalize(self, registry.release_all, self._keys)
+
+    def add(self, name, document):
+        """
+        Belgeyi külliyata ekler; aynı adla bir belge varsa yerine geçer.
+
+        Args:
+            name: Belge adı (ör. dosya adı)
+            document: process_document sonucu (chunks ve index alanları gerekli)
+        """
+        self._release(name)
+        key = document.get("content_key")
+        if self.registry is not None and key:
+            self.registry.retain(key, document)
+            self._keys[name] = key
+        self.documents[name] = document
+        self.index.add(name, document["index"])
+
+    def _release(self, name):
+        key = self._keys.pop(name, None)
+        if key is not None:
+            self.registry.release(key)
+
+    def remove(self, name):
+        """
+        Belgeyi ve indeks parçasını çıkarır (paylaşılan belgenin yalnızca referansı bırakılır).
+
+        Args:
+            name: Belge adı
+        """
+        self._release(name)
+        self.documents.pop(name, None)
+        self.index.remove(name)
+
+    def clear(self):
+        for name in list(self.documents):
+            self.remove(name)
+
+    def __contains__(self, name):
+        return name in self.documents
+
+    def __len__(self):
+        return len(self.documents)
+
+    def names(self):
+        """
+        Returns:
+            list: Eklenme sırasına göre belge adları
+        """
+        return list(self.documents)
+
+    @property
+    def shared_count(self):
+        """Kayıtta oturumlar arası paylaşılan belge sayısı."""
+        return len(self._keys)
+
+    @property
+    def chunk_count(self):
+        return sum(len(document["chunks"]) for document in self.documents.values())
+
+    @property
+    def page_count(self):
+        return sum(document["page_count"] for document in self.documents.values())
+
+    def memory_usage(self):
+        """
+        Külliyatın yaklaşık bellek kullanımını döndürür.
+
+        Returns:
+            dict: text (parça depoları, süreç belleği), mapped (diskten eşlenen),
+                vectors (vektör matrisleri), total (süreç belleğindeki toplam) bayt
+        """
+        totals = {"text": 0, "mapped": 0, "vectors": 0, "total": 0}
+        for document in self.documents.values():
+            for field, value in document_memory_usage(document).items():
+                totals[field] += value
+        return totals
+
+    def sections(self, name):
+        """
+        Returns:
+            SectionIndex | None: Belgenin bölüm indeksi (bölüm yoksa None)
+        """
+        return self.documents[name].get("sections")
+
+    def _section_chunks(self, query, names, sections, prune):
+        # belge_adı -> skorlanacak parça numaraları; listede olmayan belge tamamen aranır
+        chunk_ids = {}
+        for name in names:
+            section_index = self.sections(name)
+            if not section_index:
+                continue
+            if sections is not None:
+                chunk_ids[name] = section_index.chunk_ids(sections[name])
+            elif prune:
+                pruned = section_index.prune(query)
+                if pruned is not None and len(pruned) < len(self.documents[name]["chunks"]):
+                    chunk_ids[name] = pruned
+        return chunk_ids
+
+    def search(self, query, top_k=2, mode="bm25", names=None, sections=None, prune=False):
+        """
+        Tüm (veya seçili) belgelerde arar.
+
+        Args:
+            query: Kullanıcı sorusu
+            top_k: Toplamda kaç parça döndürülecek
+            mode: Arama modu ("bm25", "vector" veya "hybrid")
+            names: Yalnızca bu belgelerde ara (None ise hepsi)
+            sections: belge_adı -> bölüm numaraları; verilirse yalnızca bu belgelerin
+                bu bölümlerinde aranır (kullanıcının seçtiği bölüm filtresi)
+            prune: True ise soru önce bölüm başlıklarıyla eşleştirilir ve bölümlü
+                belgelerde yalnızca eşleşen bölümlerin parçaları skorlanır
+
+        Returns:
+            list: (belge_adı, Chunk, skor) üçlüleri, skora göre azalan sırada
+        """
+        names = [name for name in (self.names() if names is None else names) if name in self.documents]
+        if sections is not None:
+            names = [name for name in names if name in sections]
+        chunk_ids = self._section_chunks(query, names, sections, prune) if sections is not None or prune else {}
+        results = self.index.search(query, top_k=top_k, mode=mode, doc_ids=names, chunk_ids=chunk_ids)
+        if not results and chunk_ids and sections is None:
+            # Eşleşen bölümlerde sonuç yoksa budama yapılmadan aranır
+            results = self.index.search(query, top_k=top_k, mode=mode, doc_ids=names)
+        return [
+            (name, self.documents[name]["chunks"][chunk_no], score)
+            for name, chunk_no, score in results
+        ]
+
+
+__all__ = ["document_memory_usage", "Corpus"]
@@ -0,0 +1,209 @@
+"""
+İşlenmiş belgeler için içerik adresli disk önbelleği.
+Yüklenen dosyanın SHA-256 özeti anahtar olarak kullanılır; çıkarılan metin,
+parça deposu, istatistikler ve arama indeksi sıkıştırılmış ikili dosyada saklanır.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import zlib
+
+from pdf_pipeline import CHUNKER_VERSION
+from retrieval import INDEX_VERSION
+
+# Kayıt biçimi değiştiğinde artırılır
+CACHE_FORMAT_VERSION = 3
+
+_MAGIC = b"PDFC"
+_SUFFIX = ".bin"
+
+
+def document_key(pdf_bytes):
+    """
+    PDF içeriğinin önbellek anahtarını hesaplar.
+
+    Args:
+        pdf_bytes: Yüklenen dosyanın baytları
+
+    Returns:
+        str: SHA-256 özeti (hex)
+    """
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def cache_version(max_chars, overlap):
+    """
+    Kayıtlara yazılan sürüm damgasını oluşturur.
+
+    Parçalayıcı, indeks veya parça ayarları değişince damga değişir ve
+    eski kayıtlar okunmaz.
+
+    Args:
+        max_chars: Parça boyutu
+        overlap: Parçalar arası örtüşme
+
+    Returns:
+        str: Sürüm damgası
+    """
+    return f"{CACHE_FORMAT_VERSION}:{CHUNKER_VERSION}:{INDEX_VERSION}:{max_chars}:{overlap}"
+
+
+class DocumentCache:
+    """
+    Boyut sınırlı, LRU tahliyeli disk önbelleği.
+
+    Kayıtlar pickle ile serileştirildiği için dizin yalnızca uygulamanın
+    kendisi tarafından yazılabilir olmalıdır.
+    """
+
+    def __init__(self, directory, max_bytes):
+        """
+        Args:
+            directory: Önbellek dizini
+            max_bytes: Dizinin en fazla toplam boyutu
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key, version):
+        """
+        Kaydı okur; yoksa veya sürümü eskiyse None döndürür.
+
+        Args:
+            key: document_key ile hesaplanan anahtar
+            version: Beklenen sürüm damgası
+
+        Returns:
+            dict | None: Önbellekteki belge verisi
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+        except OSError:
+            return None
+
+        header_len = len(_MAGIC) + 1
+        stamp_len = blob[len(_MAGIC)] if len(blob) >= header_len else 0
+        stamp = blob[header_len:header_len + stamp_len].decode("ascii", "replace")
+        if not blob.startswith(_MAGIC) or stamp != version:
+            self._remove(path)
+            return None
+
+        try:
+            entry = pickle.loads(zlib.decompress(blob[header_len + stamp_len:]))
+        except Exception:
+            self._remove(path)
+            return None
+
+        # LRU sırası dosyanın değiştirilme zamanıyla tutulur
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, version, entry):
+        """
+        Kaydı atomik olarak yazar ve gerekirse eski kayıtları tahliye eder.
+
+        Args:
+            key: document_key ile hesaplanan anahtar
+            version: Sürüm damgası
+            entry: Saklanacak belge verisi (dict)
+        """
+        stamp = version.encode("ascii")
+        payload = zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL), 6)
+        blob = _MAGIC + bytes([len(stamp)]) + stamp + payload
+        if len(blob) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Yarım kalan geçici dosya dizinde birikmesin
+            self._remove(tmp_path)
+            raise
+        self._evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith(_SUFFIX):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def clear(self):
+        """Önbellekteki tüm kayıtları siler."""
+        for name in os.listdir(self.directory):
+            if name.endswith(_SUFFIX):
+                self._remove(os.path.join(self.directory, name))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_document_cache():
+    """
+    Ortam değişkenlerine göre yapılandırılmış süreç geneli önbelleği döndürür.
+
+    DOC_CACHE_DIR (varsayılan .cache/documents) ve DOC_CACHE_MAX_MB
+    (varsayılan 500) kullanılır; DOC_CACHE_MAX_MB=0 önbelleği kapatır.
+
+    Returns:
+        DocumentCache | None: Önbellek (kapalıysa None)
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                max_mb = float(os.getenv("DOC_CACHE_MAX_MB", "500"))
+            except ValueError:
+                max_mb = 500.0
+            if max_mb <= 0:
+                return None
+            directory = os.getenv("DOC_CACHE_DIR", os.path.join(".cache", "documents"))
+            _default_cache = DocumentCache(directory, int(max_mb * 1024 * 1024))
+        return _default_cache
+
+
+__all__ = [
+    "CACHE_FORMAT_VERSION",
+    "document_key",
+    "cache_version",
+    "DocumentCache",
+    "get_document_cache",
+]
@@ -0,0 +1,283 @@
+"""
+Oturumlar arası paylaşılan, içerik özetiyle anahtarlanan belge kaydı.
+Aynı PDF'i yükleyen oturumlar metin, parça ve indeksin tek bir kopyasına
+referans tutar. Aynı dosya aynı anda birden fazla oturumdan gelirse yalnızca
+bir kez işlenir (single-flight); diğerleri sonucu bekler. Hiçbir oturumun
+kullanmadığı belgeler, toplam bellek bütçesi aşılınca en eski kullanımdan
+başlanarak (LRU) kayıttan atılır.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from corpus import document_memory_usage
+from ingest import JobCancelled
+
+# Bekleyen oturumların iptal kontrolü için yoklama aralığı (saniye)
+WAIT_POLL_SECONDS = 0.2
+
+# Metin içermeyen dosyaların "boş" sonucunun kayıtta tutulma süresi (saniye)
+EMPTY_RESULT_TTL = 300
+
+# Büyük dosyalar özetlenirken okunan blok boyutu
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_key(path):
+    """
+    Diskteki dosyanın içerik anahtarını, dosyayı belleğe almadan hesaplar.
+
+    Args:
+        path: Dosya yolu
+
+    Returns:
+        str: SHA-256 özeti (hex); doc_cache.document_key ile aynı içerik için aynıdır
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _Entry:
+    __slots__ = ("document", "refs", "size")
+
+    def __init__(self, document, size):
+        self.document = document
+        self.refs = 0
+        self.size = size
+
+
+class _Flight:
+    # Süren tek işleme: bekleyenler done olayını bekler
+    __slots__ = ("done", "error", "empty")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error = None
+        self.empty = False  # İşleme bitti, belgede metin yok
+
+
+class DocumentRegistry:
+    """
+    İçerik anahtarı -> paylaşılan (değiştirilmeyen) belge; referans sayımı ve LRU tahliyesi.
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Args:
+            max_bytes: Kayıttaki belgelerin süreç belleğindeki toplam bütçesi; aşılınca
+                kullanılmayan belgeler atılır (kullanımdakiler atılmaz)
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # anahtar -> _Entry, en eski kullanım başta
+        self._flights = {}  # anahtar -> _Flight
+        self._empty = {}  # metin içermeyen belgenin anahtarı -> sonucun geçerlilik sonu (monotonic)
+        self._bytes = 0
+        self._hits = self._misses = self._joins = self._evictions = 0
+        self._lock = threading.Lock()
+
+    def load(self, key, loader, wait_callback=None):
+        """
+        Belgeyi kayıttan döndürür; yoksa loader ile bir kez işler.
+
+        Aynı anahtar için işleme sürüyorsa beklenir. İşleyen iptal edilirse
+        bekleyenlerden biri işlemeyi üstlenir; diğer hatalar bekleyenlere de iletilir.
+        Metin içermeyen belgelerin sonucu (None) EMPTY_RESULT_TTL süresince
+        hatırlanır; bekleyenler ve sonraki yüklemeler dosyayı yeniden işlemez.
+        Dönen belge referans sayılmaz; oturuma eklerken retain çağrılmalıdır.
+
+        Args:
+            key: İçerik anahtarı (ör. document_key)
+            loader: loader() -> belge sözlüğü (metin yoksa None)
+            wait_callback: Beklerken aralıklarla çağrılır (ör. iptal kontrolü)
+
+        Returns:
+            tuple: (belge veya None, paylaşıldı_mı)
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry.document, True
+                if self._empty.get(key, 0) > time.monotonic():
+                    self._hits += 1
+                    return None, True
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = self._flights[key] = _Flight()
+                    self._misses += 1
+                    break
+                self._joins += 1
+            while not flight.done.wait(WAIT_POLL_SECONDS):
+                if wait_callback:
+                    wait_callback()
+            if flight.error is not None:
+                raise flight.error
+            if flight.empty:
+                return None, True
+
+        try:
+            document = loader()
+        except JobCancelled:
+            # İptal bekleyenlere iletilmez; içlerinden biri işlemeyi yeniden dener
+            raise
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                if document is None:
+                    self._forget_expired()
+                    self._empty[key] = time.monotonic() + EMPTY_RESULT_TTL
+                    flight.empty = True
+                else:
+                    self._insert(key, document)
+                    self._evict()
+            return document, False
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _forget_expired(self):
+        now = time.monotonic()
+        for key in [key for key, expires in self._empty.items() if expires <= now]:
+            del self._empty[key]
+
+    def _insert(self, key, document):
+        if key in self._entries:
+            return
+        entry = _Entry(document, document_memory_usage(document)["total"])
+        self._entries[key] = entry
+        self._bytes += entry.size
+
+    def _evict(self):
+        for key in list(self._entries):
+            if self._bytes <= self.max_bytes:
+                return
+            entry = self._entries[key]
+            if entry.refs:
+                continue
+            # Belge, son referans (ör. henüz eklenmemiş bir iş sonucu) bırakıldığında serbest kalır
+            del self._entries[key]
+            self._bytes -= entry.size
+            self._evictions += 1
+
+    def retain(self, key, document):
+        """
+        Oturumun belgeye referansını sayar; belge bu arada atılmışsa yeniden kaydedilir.
+
+        Args:
+            key: İçerik anahtarı
+            document: load'un döndürdüğü belge
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._insert(key, document)
+            self._entries[key].refs += 1
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def release(self, key):
+        """
+        Oturumun referansını bırakır; belge kayıtta kalır, bütçe aşılırsa atılabilir.
+
+        Args:
+            key: İçerik anahtarı
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.refs:
+                entry.refs -= 1
+                self._evict()
+
+    def release_all(self, keys):
+        """
+        Args:
+            keys: belge_adı -> içerik anahtarı (oturum sona erdiğinde bırakılır)
+        """
+        for key in list(keys.values()):
+            self.release(key)
+        keys.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: documents, referenced, bytes, max_bytes, hits, misses, joins, evictions
+        """
+        with self._lock:
+            return {
+                "documents": len(self._entries),
+                "referenced": sum(1 for entry in self._entries.values() if entry.refs),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "joins": self._joins,
+                "evictions": self._evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._empty.clear()
+            self._bytes = 0
+
+
+def shared_document(registry, key, loader, wait_callback=None):
+    """
+    Belgeyi kayıt üzerinden yükler ve oturuma eklenecek sözlüğü döndürür.
+
+    Dönen sözlük paylaşılan belgenin sığ kopyasıdır: metin, parça ve indeks
+    nesneleri oturumlar arasında ortaktır, yalnızca oturuma özel alanlar ayrıdır.
+
+    Args:
+        registry: DocumentRegistry (None ise loader doğrudan çağrılır)
+        key: İçerik anahtarı
+        loader: loader() -> belge sözlüğü (metin yoksa None)
+        wait_callback: Aynı belge başka bir oturumda işlenirken aralıklarla çağrılır
+
+    Returns:
+        dict | None: content_key alanı eklenmiş belge; kayıttan gelmişse from_cache True
+    """
+    if registry is None:
+        return loader()
+    document, shared = registry.load(key, loader, wait_callback=wait_callback)
+    if document is None:
+        return None
+    return dict(document, content_key=key, from_cache=shared or document["from_cache"])
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_document_registry():
+    """
+    DOC_REGISTRY_MB ortam değişkenine göre (varsayılan 512) süreç geneli kaydı döndürür.
+
+    Returns:
+        DocumentRegistry | None: Paylaşılan kayıt (DOC_REGISTRY_MB=0 ise None; her oturum
+            belgeyi kendisi işler)
+    """
+    global _default_registry
+    try:
+        max_mb = float(os.getenv("DOC_REGISTRY_MB", "512"))
+    except ValueError:
+        max_mb = 512.0
+    if max_mb <= 0:
+        return None
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = DocumentRegistry(int(max_mb * 1024 * 1024))
+        return _default_registry
+
+
+__all__ = ["file_key", "DocumentRegistry", "shared_document", "get_document_registry"]
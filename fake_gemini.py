@@ -0,0 +1,274 @@
+"""
+Çevrimdışı testler ve ölçümler için sahte Gemini modeli.
+google.generativeai.GenerativeModel ile aynı generate_content arayüzünü sunar;
+yanıtı prompt'taki bağlamdan çıkararak üretir ve ağ bağlantısı gerektirmez.
+Gecikme bir dağılımdan örneklenebilir, 429 ve 5xx hataları belirli oranlarla
+enjekte edilebilir. GEMINI_BACKEND=fake ile uygulama da bu modeli kullanır.
+"""
+
+import os
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+
+UsageMetadata = namedtuple(
+    "UsageMetadata", ["prompt_token_count", "candidates_token_count", "total_token_count"]
+)
+
+CountTokensResponse = namedtuple("CountTokensResponse", ["total_tokens"])
+
+_CONTEXT_RE = re.compile(r"İlgili Metin:\n(.*?)\n\n(?:Önceki|Soru:)", re.DOTALL)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+
+def estimate_tokens(text):
+    """
+    Kaba token tahmini (karakter / 4).
+
+    Args:
+        text: Metin
+
+    Returns:
+        int: Tahmini token sayısı
+    """
+    return max(1, len(text) // 4) if text else 0
+
+
+class FakeAPIError(Exception):
+    """google.api_core hataları gibi HTTP durum kodunu "code" alanında taşıyan hata."""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class LatencyModel:
+    """
+    Çağrı gecikmesi dağılımı.
+
+    Tanım "dağılım:parametreler" biçimindedir (saniye):
+        fixed:0.5, uniform:0.2,1.0, normal:0.8,0.2, lognormal:0.8,0.5 (medyan, sigma),
+        exponential:0.8 (ortalama). Yalnızca sayı verilirse sabit gecikmedir.
+    """
+
+    def __init__(self, spec=0.0):
+        """
+        Args:
+            spec: Dağılım tanımı (metin) veya sabit gecikme (sayı)
+        """
+        if isinstance(spec, (int, float)):
+            self.kind, self.params = "fixed", (float(spec),)
+        else:
+            kind, _, params = str(spec).partition(":")
+            if not params:
+                kind, params = "fixed", kind
+            if kind not in LATENCY_DISTRIBUTIONS:
+                raise ValueError(f"Geçersiz gecikme dağılımı: {kind}")
+            self.kind = kind
+            self.params = tuple(float(p) for p in params.split(","))
+
+    def sample(self, rng):
+        """
+        Args:
+            rng: random.Random
+
+        Returns:
+            float: Gecikme (saniye, negatif olmaz)
+        """
+        p = self.params
+        if self.kind == "fixed":
+            value = p[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            value = rng.gauss(p[0], p[1])
+        elif self.kind == "lognormal":
+            value = p[0] * rng.lognormvariate(0.0, p[1])
+        else:
+            value = rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, value)
+
+    def __bool__(self):
+        return not (self.kind == "fixed" and self.params[0] == 0)
+
+    def __repr__(self):
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+class FakeResponse:
+    """generate_content yanıtının .text ve .usage_metadata alanlarını taklit eder."""
+
+    def __init__(self, text, usage_metadata):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeStreamResponse:
+    """Akış modundaki yanıt: üzerinde gezinildikçe FakeResponse parçaları üretir."""
+
+    def __init__(self, pieces, usage_metadata, piece_delay):
+        self._pieces = pieces
+        self._piece_delay = piece_delay
+        self.usage_metadata = usage_metadata
+
+    def __iter__(self):
+        for piece in self._pieces:
+            if self._piece_delay:
+                time.sleep(self._piece_delay)
+            yield FakeResponse(piece, None)
+
+
+class FakeGenerativeModel:
+    """
+    Prompt'taki bağlamın ilk cümlelerini yanıt olarak döndüren sahte model.
+    """
+
+    def __init__(self, model_name="models/fake", latency=0.0, max_sentences=2, piece_chars=40,
+                 error_rate_429=0.0, error_rate_5xx=0.0, seed=None):
+        """
+        Args:
+            model_name: Raporlarda ve önbellek anahtarında görünecek ad
+            latency: Her çağrıda beklenecek süre (saniye) veya LatencyModel tanımı
+            max_sentences: Yanıta alınacak en fazla cümle
+            piece_chars: Akış modunda parça başına karakter
+            error_rate_429: Çağrıların bu oranı 429 (kota) hatasıyla döner
+            error_rate_5xx: Çağrıların bu oranı 500/503 hatasıyla döner
+            seed: Gecikme ve hata örneklemesi için tohum (tekrarlanabilir ölçümler)
+        """
+        self.model_name = model_name
+        self.latency = latency if isinstance(latency, LatencyModel) else LatencyModel(latency)
+        self.max_sentences = max_sentences
+        self.piece_chars = piece_chars
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _answer(self, prompt):
+        match = _CONTEXT_RE.search(prompt)
+        context = match.group(1).strip() if match else ""
+        sentences = [s for s in _SENTENCE_RE.split(context) if s.strip()]
+        if not sentences:
+            return "Belgede bu soruyla ilgili bilgi bulunamadı."
+        return " ".join(sentences[:self.max_sentences])
+
+    def _draw(self):
+        # Eşzamanlı oturumlar aynı modeli paylaşır; örnekleme kilit altında yapılır
+        with self._lock:
+            self.calls += 1
+            latency = self.latency.sample(self._rng) if self.latency else 0.0
+            roll = self._rng.random()
+            error = None
+            if roll < self.error_rate_429:
+                error = FakeAPIError(429, "Resource has been exhausted (e.g. check quota).")
+            elif roll < self.error_rate_429 + self.error_rate_5xx:
+                error = FakeAPIError(self._rng.choice((500, 503)), "The service is currently unavailable.")
+            if error is not None:
+                self.errors += 1
+        return latency, error
+
+    def count_tokens(self, contents, **kwargs):
+        """
+        Args:
+            contents: Sayılacak metin
+
+        Returns:
+            CountTokensResponse: total_tokens alanıyla token sayısı
+        """
+        return CountTokensResponse(estimate_tokens(contents))
+
+    def generate_content(self, prompt, safety_settings=None, stream=False, **kwargs):
+        """
+        Args:
+            prompt: Tam prompt metni
+            safety_settings: Yok sayılır (arayüz uyumu için)
+            stream: True ise parça parça yanıt döner
+
+        Returns:
+            FakeResponse | FakeStreamResponse: Yanıt
+
+        Raises:
+            FakeAPIError: Enjekte edilen 429/5xx hatası
+        """
+        latency, error = self._draw()
+        if error is not None:
+            # Hatalar da gerçek API gibi bir süre sonra döner
+            time.sleep(latency / 4)
+            raise error
+
+        text = self._answer(prompt)
+        prompt_tokens = estimate_tokens(prompt)
+        answer_tokens = estimate_tokens(text)
+        usage = UsageMetadata(prompt_tokens, answer_tokens, prompt_tokens + answer_tokens)
+
+        if stream:
+            # İlk parçaya kadar gecikmenin yarısı, kalanı parçalara bölünür
+            pieces = [text[i:i + self.piece_chars] for i in range(0, len(text), self.piece_chars)]
+            if latency:
+                time.sleep(latency / 2)
+            piece_delay = latency / 2 / len(pieces) if latency else 0.0
+            return FakeStreamResponse(pieces, usage, piece_delay)
+
+        if latency:
+            time.sleep(latency)
+        return FakeResponse(text, usage)
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return float(default)
+
+
+def fake_backend_enabled():
+    """
+    Returns:
+        bool: GEMINI_BACKEND=fake ise True (uygulama gerçek API yerine sahte modeli kullanır)
+    """
+    return os.getenv("GEMINI_BACKEND", "gemini").strip().lower() == "fake"
+
+
+def fake_model_from_env(model_name):
+    """
+    FAKE_GEMINI_* ortam değişkenlerine göre sahte model oluşturur.
+
+    FAKE_GEMINI_LATENCY (gecikme tanımı, varsayılan "lognormal:0.8,0.4"),
+    FAKE_GEMINI_429_RATE, FAKE_GEMINI_5XX_RATE (varsayılan 0) ve
+    FAKE_GEMINI_SEED kullanılır.
+
+    Args:
+        model_name: Model adı
+
+    Returns:
+        FakeGenerativeModel: Sahte model
+    """
+    seed = os.getenv("FAKE_GEMINI_SEED")
+    return FakeGenerativeModel(
+        f"models/fake-{model_name}",
+        latency=os.getenv("FAKE_GEMINI_LATENCY", "lognormal:0.8,0.4"),
+        error_rate_429=_env_float("FAKE_GEMINI_429_RATE", "0"),
+        error_rate_5xx=_env_float("FAKE_GEMINI_5XX_RATE", "0"),
+        seed=int(seed) if seed else None,
+    )
+
+
+__all__ = [
+    "UsageMetadata",
+    "CountTokensResponse",
+    "LATENCY_DISTRIBUTIONS",
+    "FakeAPIError",
+    "LatencyModel",
+    "FakeResponse",
+    "FakeStreamResponse",
+    "FakeGenerativeModel",
+    "estimate_tokens",
+    "fake_backend_enabled",
+    "fake_model_from_env",
+]
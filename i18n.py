@@ -15,32 +15,88 @@ translations = {
         "api_key_missing": "⚠️ Lütfen Gemini API Key girin",
         "model_selection": "Model",
         "selected_model_info": "ℹ️ Seçili: **{model}**",
+        "stream_answers": "Yanıtları akış halinde göster",
+        "stream_answers_help": "Yanıt tamamlanmadan, parçalar geldikçe ekrana yazılır",
+        "retrieval_mode": "🔎 Arama modu",
+        "retrieval_mode_help": "Anahtar kelime (BM25), anlamsal (yerel vektör) ya da ikisinin birleşimi",
+        "retrieval_mode_bm25": "Anahtar kelime (BM25)",
+        "retrieval_mode_vector": "Anlamsal (vektör)",
+        "retrieval_mode_hybrid": "Karma (BM25 + vektör)",
         "optimization_notes": "⚡ Optimizasyon Notları",
-        "optimization_content": "**Token Tasarrufu İçin Yapılanlar:**\n- ✅ Akıllı metin parçalama (chunking)\n- ✅ Soruyla ilgili kısımlar aranıyor\n- ✅ Sadece son 2 sohbet turunu gönderme\n- ✅ 2 saniye rate limiting\n- ✅ Kısaltılmış prompt formatı\n- ✅ Maksimum 3500 karakter context\n\n**Öneriler:**\n- Kısa ve net sorular sorun\n- gemini-1.5-flash-8b modelini kullanın\n- Çok uzun PDF'ler için soruları spesifik yapın",
+        "optimization_content": "**Token Tasarrufu İçin Yapılanlar:**\n- ✅ Akıllı metin parçalama (chunking)\n- ✅ Soruyla ilgili kısımlar aranıyor\n- ✅ Eski sohbet turları kısa özet, son tur tam metin\n- ✅ Sunucu geneli istek/token limiti, 429'da otomatik yeniden deneme\n- ✅ Kısaltılmış prompt formatı\n- ✅ Model başına token bütçesine göre seçilen, tekrarsız bağlam\n\n**Öneriler:**\n- Kısa ve net sorular sorun\n- gemini-1.5-flash-8b modelini kullanın\n- Çok uzun PDF'ler için soruları spesifik yapın",
         "how_to_get_key": "🔑 Gemini API Key nasıl alınır?",
         "how_to_get_key_steps": "**Gemini API Key Alma Adımları:**\n1. Google AI Studio sayfasına gidin\n2. Google hesabınızla giriş yapın\n3. API Key oluşturun ve kopyalayın\n4. `.env` dosyasına `GEMINI_API_KEY=your_key_here` ekleyin",
         "upload_pdf": "PDF Dosyası Seçin",
-        "upload_help": "Maksimum 10MB boyutunda PDF yükleyebilirsiniz",
-        "file_too_large": "❌ Dosya boyutu 10MB'dan büyük olamaz!",
+        "upload_help": "Birden fazla PDF seçebilirsiniz (her biri en fazla {limit}MB)",
+        "documents_loaded": "✅ {added} yeni PDF yüklendi! Toplam {documents} belge, {pages} sayfa, {chunks} parça",
+        "remove_document": "🗑️ Belgeyi Kaldır",
+        "document_registry_stats": "🗂️ Paylaşılan belgeler: {documents} ({referenced} kullanımda), {used} / {budget} MB",
+        "session_memory": "💾 Oturum belleği: ~{total} MB (metin {text} MB, vektörler {vectors} MB, diskten eşlenen {mapped} MB)",
+        "search_in_documents": "🔎 Aranacak Belgeler",
+        "search_in_documents_help": "Sorular yalnızca seçili belgelerde aranır",
+        "search_in_sections": "📑 Aranacak Bölümler",
+        "search_in_sections_help": "Seçim yoksa sorular, başlığı soruyla eşleşen bölümlerde aranır",
+        "file_too_large": "❌ Dosya boyutu {limit}MB'dan büyük olamaz!",
+        "large_pdf_mode": "🗄️ Büyük dosya: diskten, düşük bellekle işlenecek",
+        "show_older_messages": "Önceki {count} mesajı göster",
+        "cancel_ingest": "İptal et",
+        "ingest_cancelling": "İptal ediliyor...",
+        "ingest_failed": "{name}: PDF okunurken hata oluştu: {error}",
+        "ingest_cancelled": "{name}: işleme iptal edildi",
+        "ingest_stage_queued": "Sırada bekliyor",
+        "ingest_stage_running": "Başlıyor",
+        "ingest_stage_extract_text_from_pdf": "Sayfalar okunuyor",
+        "ingest_stage_build_sections": "Bölümler çıkarılıyor",
+        "ingest_stage_build_index": "İndeks kuruluyor",
+        "ingest_stage_wait_shared_document": "Aynı belge başka bir oturumda işleniyor, bekleniyor",
+        "ingest_stage_process_large_document": "Okunuyor ve indeksleniyor",
         "file_size_info": "📊 Dosya boyutu: {size} MB",
         "process_pdf": "📖 PDF'i İşle",
+        "extract_workers": "Çıkarma işçi sayısı",
+        "extract_workers_help": "Büyük PDF'lerde sayfalar bu kadar süreçte paralel okunur (1 = sıralı)",
+        "pages_extracted": "📄 {done}/{total} sayfa okundu",
+        "loaded_from_cache": "⚡ Bu dosya daha önce işlenmiş, önbellekten yüklendi",
         "document_info": "📋 Belge Bilgileri",
         "file_label": "Dosya:",
         "pages_label": "Sayfa Sayısı:",
         "word_count": "Kelime Sayısı:",
         "chunks_label": "Metin Parçaları:",
+        "sections_label": "Bölümler:",
         "estimated_tokens": "Tahmini Token:",
         "preview_label": "👁️ Metin Önizleme",
         "first_500_chars": "İlk 500 karakter",
         "chat_control": "💬 Sohbet Kontrolü",
         "chat_count_info": "📊 {count} mesaj",
+        "resume_session": "🔑 Sohbete devam et",
+        "resume_code_help": "Bu kodu saklayın: sunucu yeniden başladıktan sonra sohbete bununla dönebilirsiniz. Kodu bilen herkes sohbeti okuyabilir.",
+        "resume_code": "Devam kodu",
+        "resume_chat": "Sohbeti aç",
+        "resume_code_unknown": "Bu koda ait sohbet bulunamadı.",
+        "answer_cache_stats": "⚡ Yanıt önbelleği: {hits} isabet / {misses} ıskalama ({rate})",
+        "answer_from_cache": "⚡ Önbellekten yanıtlandı",
         "clear_chat": "🗑️ Sohbeti Temizle",
+        "prepare_export": "📦 Sohbeti dışa aktar",
         "download_txt": "📄 TXT",
         "download_json": "📋 JSON",
         "start_hint": "👈 Başlamak için sol taraftan bir PDF dosyası yükleyin",
         "model_not_started": "⚠️ Model başlatılamadı. Lütfen Gemini API Key'inizi kontrol edip PDF'i tekrar işleyin.",
         "chat_placeholder": "PDF hakkında bir soru sorun...",
         "gemini_thinking": "Gemini düşünüyor...",
+        "time_to_first_token": "⏱️ İlk token: {seconds} sn",
+        "tokens_used": "Kullanılan Token:",
+        "token_counts": "🔢 Prompt: {prompt} · Yanıt: {response} token",
+        "show_diagnostics": "🩺 Tanılama panelini göster",
+        "metric_name": "Ölçüm",
+        "no_metrics_yet": "Henüz ölçüm yok.",
+        "profiling": "🔬 Profil",
+        "profile_next_rerun": "Sonraki çalıştırmayı profille",
+        "session_memory_report": "Oturum belleği (yaklaşık)",
+        "memory_field": "Alan",
+        "memory_detail": "Ayrıntı",
+        "profile_captures": "Profil kayıtları",
+        "profile_report": "Rapor (.txt)",
+        "no_profiles_yet": "Henüz profil kaydı yok: bir PDF işleyin, soru sorun veya sonraki çalıştırmayı profilleyin.",
+        "stream_interrupted": "⚠️ Yanıt akışı yarıda kesildi; gelen kısım gösteriliyor.",
         "error_prefix": "❌ Hata oluştu:",
         "quota_suggestions": "Quota aşıldı — lütfen bekleyin veya daha az token kullanan modeli deneyin.",
         "invalid_key_suggestion": "API Key'iniz geçersiz olabilir. Yeni bir key alın.",
@@ -59,32 +115,88 @@ translations = {
         "api_key_missing": "⚠️ Please enter your Gemini API Key",
         "model_selection": "Model",
         "selected_model_info": "ℹ️ Selected: **{model}**",
+        "stream_answers": "Stream answers",
+        "stream_answers_help": "Write the answer as it arrives instead of waiting for the full text",
+        "retrieval_mode": "🔎 Retrieval mode",
+        "retrieval_mode_help": "Keyword (BM25), semantic (local vectors) or a fusion of both",
+        "retrieval_mode_bm25": "Keyword (BM25)",
+        "retrieval_mode_vector": "Semantic (vector)",
+        "retrieval_mode_hybrid": "Hybrid (BM25 + vector)",
         "optimization_notes": "⚡ Optimization Notes",
-        "optimization_content": "**Token saving techniques used:**\n- ✅ Smart text chunking\n- ✅ Searching for relevant parts\n- ✅ Sending only last 2 chat turns\n- ✅ 2s rate limiting\n- ✅ Shortened prompt format\n- ✅ Max 3500 character context\n\n**Suggestions:**\n- Ask short, clear questions\n- Use gemini-1.5-flash-8b for lower tokens\n- Make questions specific for very long PDFs",
+        "optimization_content": "**Token saving techniques used:**\n- ✅ Smart text chunking\n- ✅ Searching for relevant parts\n- ✅ Older chat turns as a compact summary, last turn in full\n- ✅ Server-wide request/token budget with automatic 429 retries\n- ✅ Shortened prompt format\n- ✅ Deduplicated context packed to a per-model token budget\n\n**Suggestions:**\n- Ask short, clear questions\n- Use gemini-1.5-flash-8b for lower tokens\n- Make questions specific for very long PDFs",
         "how_to_get_key": "🔑 How to get Gemini API Key",
         "how_to_get_key_steps": "**How to get an API key:**\n1. Go to Google AI Studio\n2. Sign in with Google account\n3. Create/Get API key and copy it\n4. Add `GEMINI_API_KEY=your_key_here` to your `.env`",
         "upload_pdf": "Select PDF File",
-        "upload_help": "You can upload PDFs up to 10MB",
-        "file_too_large": "❌ File size cannot exceed 10MB!",
+        "upload_help": "You can select multiple PDFs (up to {limit}MB each)",
+        "documents_loaded": "✅ {added} new PDF(s) loaded! {documents} documents, {pages} pages, {chunks} chunks in total",
+        "remove_document": "🗑️ Remove Document",
+        "document_registry_stats": "🗂️ Shared documents: {documents} ({referenced} in use), {used} / {budget} MB",
+        "session_memory": "💾 Session memory: ~{total} MB (text {text} MB, vectors {vectors} MB, disk-mapped {mapped} MB)",
+        "search_in_documents": "🔎 Documents to Search",
+        "search_in_documents_help": "Questions are searched only in the selected documents",
+        "search_in_sections": "📑 Sections to Search",
+        "search_in_sections_help": "Without a selection, questions are searched in the sections whose titles match them",
+        "file_too_large": "❌ File size cannot exceed {limit}MB!",
+        "large_pdf_mode": "🗄️ Large file: will be processed from disk with low memory",
+        "show_older_messages": "Show {count} earlier messages",
+        "cancel_ingest": "Cancel",
+        "ingest_cancelling": "Cancelling...",
+        "ingest_failed": "{name}: error while reading PDF: {error}",
+        "ingest_cancelled": "{name}: processing cancelled",
+        "ingest_stage_queued": "Queued",
+        "ingest_stage_running": "Starting",
+        "ingest_stage_extract_text_from_pdf": "Reading pages",
+        "ingest_stage_build_sections": "Extracting sections",
+        "ingest_stage_build_index": "Building index",
+        "ingest_stage_wait_shared_document": "Same document is being processed in another session, waiting",
+        "ingest_stage_process_large_document": "Reading and indexing",
         "file_size_info": "📊 File size: {size} MB",
         "process_pdf": "📖 Process PDF",
+        "extract_workers": "Extraction workers",
+        "extract_workers_help": "Pages of large PDFs are read in parallel by this many processes (1 = serial)",
+        "pages_extracted": "📄 {done}/{total} pages read",
+        "loaded_from_cache": "⚡ This file was processed before and loaded from cache",
         "document_info": "📋 Document Info",
         "file_label": "File:",
         "pages_label": "Pages:",
         "word_count": "Word Count:",
         "chunks_label": "Text Chunks:",
+        "sections_label": "Sections:",
         "estimated_tokens": "Estimated Tokens:",
         "preview_label": "👁️ Text Preview",
         "first_500_chars": "First 500 characters",
         "chat_control": "💬 Chat Controls",
         "chat_count_info": "📊 {count} messages",
+        "resume_session": "🔑 Resume a chat",
+        "resume_code_help": "Keep this code to return to the chat after a server restart. Anyone who has the code can read the chat.",
+        "resume_code": "Resume code",
+        "resume_chat": "Open chat",
+        "resume_code_unknown": "No chat found for this code.",
+        "answer_cache_stats": "⚡ Answer cache: {hits} hits / {misses} misses ({rate})",
+        "answer_from_cache": "⚡ Answered from cache",
         "clear_chat": "🗑️ Clear Chat",
+        "prepare_export": "📦 Export chat",
         "download_txt": "📄 TXT",
         "download_json": "📋 JSON",
         "start_hint": "👈 Upload a PDF from the left to get started",
         "model_not_started": "⚠️ Model could not be started. Check your Gemini API Key and reprocess the PDF.",
         "chat_placeholder": "Ask a question about the PDF...",
         "gemini_thinking": "Gemini is thinking...",
+        "time_to_first_token": "⏱️ First token: {seconds} s",
+        "tokens_used": "Tokens Used:",
+        "token_counts": "🔢 Prompt: {prompt} · Response: {response} tokens",
+        "show_diagnostics": "🩺 Show diagnostics panel",
+        "metric_name": "Metric",
+        "no_metrics_yet": "No measurements yet.",
+        "profiling": "🔬 Profiling",
+        "profile_next_rerun": "Profile next rerun",
+        "session_memory_report": "Session memory (approximate)",
+        "memory_field": "Field",
+        "memory_detail": "Detail",
+        "profile_captures": "Profile captures",
+        "profile_report": "Report (.txt)",
+        "no_profiles_yet": "No profiles yet: process a PDF, ask a question or profile the next rerun.",
+        "stream_interrupted": "⚠️ The answer stream was interrupted; showing the part received.",
         "error_prefix": "❌ Error:",
         "quota_suggestions": "Quota exceeded — please wait or try a lower-token model.",
         "invalid_key_suggestion": "Your API key may be invalid. Create a new key.",
@@ -0,0 +1,235 @@
+"""
+Arka planda belge işleme (ingestion) iş kuyruğu.
+PDF işleme, oturumun betiğini bloklamak yerine süreç geneli, eşzamanlılığı
+sınırlı bir iş havuzuna kimlikli iş olarak gönderilir. İşler ilerlemesini
+(aşama, çıkarılan sayfa, parça sayısı) raporlar ve iptal edilebilir; arayüz
+işleri yoklar ve biten işin sonucunu kendi oturum durumuna kendisi yayınlar.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+
+# Sonucu alınmamış bitmiş işlerin tutulacağı süre (saniye)
+FINISHED_JOB_TTL = 3600
+
+
+class JobCancelled(Exception):
+    """İş, iptal isteği üzerine durduruldu."""
+
+
+class IngestJob:
+    """
+    Tek bir belge işleme işi ve ilerleme durumu.
+    """
+
+    def __init__(self, session_id, name):
+        """
+        Args:
+            session_id: İşi gönderen oturum
+            name: Belge adı
+        """
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.name = name
+        self.state = "queued"
+        self.stage = "queued"
+        self.pages_done = 0
+        self.page_count = 0
+        self.chunks = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def active(self):
+        return self.state in ("queued", "running")
+
+    @property
+    def fraction(self):
+        """İlerleme oranı (0-1); sayfa sayısı henüz bilinmiyorsa 0."""
+        if self.state == "done":
+            return 1.0
+        return self.pages_done / self.page_count if self.page_count else 0.0
+
+    def cancel(self):
+        """İptal ister; iş bir sonraki sayfa veya aşama sınırında durur."""
+        self._cancel.set()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        """
+        Raises:
+            JobCancelled: İptal istenmişse
+        """
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+
+    def progress_callback(self, page_num, page_count):
+        """process_document için sayfa ilerleme bildirimi (iptal noktası)."""
+        self.check_cancelled()
+        self.pages_done = page_num
+        self.page_count = page_count
+
+    def stage_callback(self, stage):
+        """process_document için aşama bildirimi (iptal noktası)."""
+        self.check_cancelled()
+        self.stage = stage
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Arayüzde gösterilecek durum alanları
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "state": self.state,
+            "stage": self.stage,
+            "pages_done": self.pages_done,
+            "page_count": self.page_count,
+            "chunks": self.chunks,
+            "error": self.error,
+        }
+
+
+class IngestQueue:
+    """
+    Eşzamanlı işleme sayısı sınırlı, süreç geneli iş kuyruğu.
+    """
+
+    def __init__(self, max_concurrent=2, metrics=None):
+        """
+        Args:
+            max_concurrent: Aynı anda çalışacak en fazla iş (fazlası sırada bekler)
+            metrics: Bekleme ve işleme sürelerinin yazılacağı Metrics
+        """
+        self.max_concurrent = max_concurrent
+        self.metrics = metrics
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="ingest")
+        self._jobs = OrderedDict()  # iş kimliği -> IngestJob
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, name, work, cleanup=None):
+        """
+        İşi kuyruğa ekler.
+
+        Args:
+            session_id: Gönderen oturum
+            name: Belge adı
+            work: work(job) -> belge sözlüğü; job.progress_callback ve job.stage_callback'i
+                process_document'a iletmelidir
+            cleanup: İş nasıl biterse bitsin sonunda çağrılır (ör. geçici dosyayı silmek)
+
+        Returns:
+            IngestJob: Gönderilen iş
+        """
+        job = IngestJob(session_id, name)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, work, cleanup)
+        return job
+
+    def _run(self, job, work, cleanup):
+        job.started_at = time.time()
+        if self.metrics is not None:
+            self.metrics.observe("ingest_queue_seconds", job.started_at - job.created_at)
+        try:
+            job.check_cancelled()
+            job.state = job.stage = "running"
+            result = work(job)
+            job.check_cancelled()
+            if result is None:
+                raise ValueError("PDF'ten metin çıkarılamadı")
+            job.chunks = len(result["chunks"])
+            job.result = result
+            job.state = job.stage = "done"
+        except JobCancelled:
+            job.state = job.stage = "cancelled"
+        except Exception as e:
+            job.error = str(e)
+            job.state = job.stage = "failed"
+        finally:
+            job.finished_at = time.time()
+            if self.metrics is not None and job.state == "done":
+                self.metrics.observe("ingest_job_seconds", job.finished_at - job.started_at)
+            if cleanup:
+                try:
+                    cleanup()
+                except OSError:
+                    pass
+
+    def _prune(self):
+        # Sahibi sonucu almadan ayrılan oturumların bitmiş işleri süresi dolunca atılır
+        now = time.time()
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if not job.active and job.finished_at and now - job.finished_at > FINISHED_JOB_TTL
+        ]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, session_id):
+        """
+        Returns:
+            list: Oturumun işleri, gönderilme sırasıyla
+        """
+        with self._lock:
+            return [job for job in self._jobs.values() if job.session_id == session_id]
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def forget(self, job_id):
+        """Sonucu alınmış işi kuyruktan çıkarır (belge nesnesine kuyrukta referans kalmaz)."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def active_count(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.active)
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_ingest_queue(metrics=None):
+    """
+    INGEST_MAX_CONCURRENT ortam değişkenine göre (varsayılan 2) süreç geneli kuyruğu döndürür.
+
+    Args:
+        metrics: İlk oluşturmada kullanılacak Metrics
+
+    Returns:
+        IngestQueue: Paylaşılan kuyruk
+    """
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            try:
+                max_concurrent = max(1, int(os.getenv("INGEST_MAX_CONCURRENT", "2")))
+            except ValueError:
+                max_concurrent = 2
+            _default_queue = IngestQueue(max_concurrent, metrics=metrics)
+        return _default_queue
+
+
+__all__ = ["JOB_STATES", "JobCancelled", "IngestJob", "IngestQueue", "get_ingest_queue"]
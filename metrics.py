@@ -0,0 +1,212 @@
+"""
+Aşama bazlı süre ve token ölçümleri.
+PDF çıkarma, parçalama, arama, prompt oluşturma, hız sınırı bekleme ve model
+çağrısı gibi aşamaların son N ölçümü tutulur; yüzdelikler tanılama panelinde
+gösterilir ve Prometheus metin formatında veya JSON olarak dışa aktarılabilir.
+"""
+
+import contextlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+
+# Raporlanan yüzdelikler
+PERCENTILES = (50, 90, 99)
+
+
+def _nearest_rank(ordered, p):
+    return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1]
+
+
+class RollingStat:
+    """Son N değeri tutan, yüzdelik hesaplayan pencere; toplam sayaçlar pencereden bağımsızdır."""
+
+    def __init__(self, window=500):
+        """
+        Args:
+            window: Yüzdelikler için tutulacak en fazla değer
+        """
+        self._values = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self._values.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, p):
+        """
+        En yakın sıra (nearest-rank) yöntemiyle yüzdelik hesaplar.
+
+        Args:
+            p: 0-100 arası yüzdelik
+
+        Returns:
+            float | None: Değer (ölçüm yoksa None)
+        """
+        if not self._values:
+            return None
+        return _nearest_rank(sorted(self._values), p)
+
+    def summary(self):
+        """
+        Returns:
+            dict: count, sum, last, pXX değerleri
+        """
+        ordered = sorted(self._values)
+        result = {"count": self.count, "sum": self.total, "last": self._values[-1] if self._values else None}
+        for p in PERCENTILES:
+            result[f"p{p}"] = _nearest_rank(ordered, p) if ordered else None
+        return result
+
+
+class Metrics:
+    """
+    İş parçacığı güvenli ölçüm kaydı.
+
+    Süreler saniye cinsinden "<aşama>_seconds" adıyla, token sayıları
+    "<ad>_tokens" adıyla dağılım olarak tutulur.
+    """
+
+    def __init__(self, window=500):
+        """
+        Args:
+            window: Her ölçüm için yüzdelik penceresi
+        """
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value):
+        """
+        Bir ölçüm ekler.
+
+        Args:
+            name: Ölçüm adı (ör. "generate_content_seconds")
+            value: Değer
+        """
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = RollingStat(self.window)
+            stat.add(float(value))
+
+    @contextlib.contextmanager
+    def span(self, stage):
+        """
+        Blok süresini "<stage>_seconds" olarak kaydeder (hata olsa da).
+
+        Args:
+            stage: Aşama adı
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{stage}_seconds", time.perf_counter() - started)
+
+    def observe_usage(self, usage):
+        """
+        Model yanıtının usage_metadata alanındaki gerçek token sayılarını kaydeder.
+
+        Args:
+            usage: prompt_token_count / candidates_token_count alanları olan nesne
+        """
+        if usage is None:
+            return
+        for field, name in (("prompt_token_count", "prompt_tokens"),
+                            ("candidates_token_count", "response_tokens")):
+            value = getattr(usage, field, None)
+            if value is not None:
+                self.observe(name, value)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: ölçüm_adı -> RollingStat.summary()
+        """
+        with self._lock:
+            return {name: stat.summary() for name, stat in sorted(self._stats.items())}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def to_json(self):
+        """
+        Returns:
+            str: Anlık görüntünün JSON metni
+        """
+        return json.dumps(
+            {"generated_at": time.time(), "window": self.window, "metrics": self.snapshot()},
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    def to_prometheus(self, prefix="document_assistant"):
+        """
+        Anlık görüntüyü Prometheus metin formatında (summary tipi) döndürür.
+
+        Args:
+            prefix: Metrik adı ön eki
+
+        Returns:
+            str: Prometheus exposition metni
+        """
+        lines = []
+        for name, summary in self.snapshot().items():
+            metric = f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+            lines.append(f"# TYPE {metric} summary")
+            for p in PERCENTILES:
+                value = summary[f"p{p}"]
+                if value is not None:
+                    lines.append(f'{metric}{{quantile="{p / 100:g}"}} {value:g}')
+            lines.append(f"{metric}_sum {summary['sum']:g}")
+            lines.append(f"{metric}_count {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def span(metrics, stage):
+    """
+    metrics None değilse aşama süresini ölçen, değilse hiçbir şey yapmayan bağlam yöneticisi.
+
+    Args:
+        metrics: Metrics veya None
+        stage: Aşama adı
+
+    Returns:
+        contextmanager: Bağlam yöneticisi
+    """
+    return metrics.span(stage) if metrics is not None else contextlib.nullcontext()
+
+
+_default_metrics = None
+_default_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """
+    Süreç geneli ölçüm kaydını döndürür.
+
+    METRICS_WINDOW (varsayılan 500) her ölçüm için tutulacak son değer sayısıdır.
+
+    Returns:
+        Metrics: Paylaşılan kayıt
+    """
+    global _default_metrics
+    with _default_metrics_lock:
+        if _default_metrics is None:
+            try:
+                window = int(os.getenv("METRICS_WINDOW", "500"))
+            except ValueError:
+                window = 500
+            _default_metrics = Metrics(max(1, window))
+        return _default_metrics
+
+
+__all__ = ["PERCENTILES", "RollingStat", "Metrics", "span", "get_metrics"]
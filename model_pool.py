@@ -0,0 +1,232 @@
+"""
+Süreç geneli Gemini model havuzu.
+Modeller (API anahtarı özeti, model adı, üretim ayarları) anahtarıyla bir kez
+oluşturulup oturumlar ve yeniden çalıştırmalar arasında paylaşılır; böylece
+bağlantılar yeniden kullanılır ve farklı anahtarlı oturumlar global SDK
+yapılandırması üzerinde yarışmaz. Uzun süre kullanılmayan modeller atılır.
+SDK anahtara özel istemciyi desteklemiyorsa create_gemini_model ikinci bir
+anahtarı reddeder; havuzda da yalnızca tek anahtarın modelleri bulunur.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def _env_number(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return float(default)
+
+
+def api_key_hash(api_key):
+    """
+    Args:
+        api_key: API anahtarı
+
+    Returns:
+        str: Anahtarın kısa SHA-256 özeti (anahtarın kendisi bellekte anahtar olarak tutulmaz)
+    """
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+class ModelPool:
+    """
+    Thread-safe, en uzun süre kullanılmayanı atan model havuzu.
+    """
+
+    def __init__(self, factory, max_size=32, idle_seconds=1800.0, clock=time.monotonic):
+        """
+        Args:
+            factory: factory(model_name, api_key, generation_config) -> model
+            max_size: Havuzda tutulacak en fazla model
+            idle_seconds: Bu kadar süre kullanılmayan model atılır (0 = süresiz)
+            clock: Zaman kaynağı (testlerde değiştirilebilir)
+        """
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self._entries = OrderedDict()  # anahtar -> [model, son_kullanım]
+        self._pending = {}  # anahtar -> oluşturma kilidi (aynı model bir kez kurulur)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model_name, api_key, generation_config=None):
+        """
+        Returns:
+            tuple: (anahtar_özeti, model_adı, ayarların JSON'u)
+        """
+        config = json.dumps(generation_config or {}, sort_keys=True, default=str)
+        return api_key_hash(api_key), model_name, config
+
+    def _evict_idle(self, now):
+        if self.idle_seconds > 0:
+            while self._entries:
+                key, (model, last_used) = next(iter(self._entries.items()))
+                if now - last_used < self.idle_seconds:
+                    break
+                del self._entries[key]
+                self.evictions += 1
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, model_name, api_key, generation_config=None):
+        """
+        Havuzdaki modeli döndürür; yoksa oluşturur.
+
+        Aynı anahtar için eşzamanlı ilk istekler tek bir oluşturmayı bekler.
+
+        Args:
+            model_name: Model adı
+            api_key: API anahtarı
+            generation_config: Üretim ayarları
+
+        Returns:
+            Model nesnesi
+        """
+        key = self.make_key(model_name, api_key, generation_config)
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._evict_idle(now)
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry[1] = now
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Lock()
+                    pending.acquire()
+                    self.misses += 1
+                    break
+            # Başka bir thread oluşturuyor: bitmesini bekleyip havuza yeniden bak
+            with pending:
+                pass
+
+        try:
+            model = self.factory(model_name, api_key, generation_config)
+            with self._lock:
+                self._entries[key] = [model, self.clock()]
+                self._evict_idle(self.clock())
+            return model
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.release()
+
+    def warm_up(self, model_names, api_key, generation_config=None, ping=True):
+        """
+        Modelleri önceden oluşturur; istenirse küçük bir count_tokens çağrısıyla bağlantıyı açar.
+
+        Args:
+            model_names: Model adları
+            api_key: API anahtarı
+            generation_config: Üretim ayarları
+            ping: True ise her model için count_tokens çağrılır (kota harcamaz)
+
+        Returns:
+            dict: Model adı -> ısınma süresi (saniye) veya hata metni
+        """
+        results = {}
+        for name in model_names:
+            started = time.perf_counter()
+            try:
+                model = self.get(name, api_key, generation_config)
+                if ping and hasattr(model, "count_tokens"):
+                    model.count_tokens("ping")
+                results[name] = time.perf_counter() - started
+            except Exception as e:
+                results[name] = str(e)
+        return results
+
+    def stats(self):
+        """
+        Returns:
+            dict: size, hits, misses, evictions
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+_warm_up_started = False
+
+
+def get_model_pool():
+    """
+    Ortam değişkenlerine göre yapılandırılmış süreç geneli havuzu döndürür.
+
+    MODEL_POOL_MAX (varsayılan 32) ve MODEL_POOL_IDLE_SECONDS (varsayılan 1800, 0 = süresiz) kullanılır.
+
+    Returns:
+        ModelPool: Paylaşılan havuz
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            # qa bu modülü içe aktarmaz; döngüsel içe aktarma olmaması için burada yüklenir
+            from qa import create_gemini_model
+
+            _default_pool = ModelPool(
+                create_gemini_model,
+                max_size=max(1, int(_env_number("MODEL_POOL_MAX", "32"))),
+                idle_seconds=max(0.0, _env_number("MODEL_POOL_IDLE_SECONDS", "1800")),
+            )
+        return _default_pool
+
+
+def warm_up_from_env(api_key=None):
+    """
+    GEMINI_WARMUP_MODELS içindeki (virgülle ayrılmış) modelleri arka planda ısıtır.
+
+    Süreç başına yalnızca bir kez çalışır (Streamlit her yeniden çalıştırmada çağırabilir).
+
+    Args:
+        api_key: API anahtarı (None ise GEMINI_API_KEY)
+
+    Returns:
+        threading.Thread | None: Isınma thread'i (yapılacak bir şey yoksa None)
+    """
+    global _warm_up_started
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
+    names = [name.strip() for name in os.getenv("GEMINI_WARMUP_MODELS", "").split(",") if name.strip()]
+    if not api_key or not names:
+        return None
+    with _default_pool_lock:
+        if _warm_up_started:
+            return None
+        _warm_up_started = True
+    from qa import GENERATION_CONFIG
+
+    thread = threading.Thread(
+        target=get_model_pool().warm_up,
+        args=(names, api_key, GENERATION_CONFIG),
+        name="gemini-warmup",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+__all__ = ["api_key_hash", "ModelPool", "get_model_pool", "warm_up_from_env"]
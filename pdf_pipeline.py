@@ -0,0 +1,423 @@
+"""
+PDF metin çıkarma ve parçalama hattı.
+Sayfaları sırayla ya da bir süreç havuzunda paralel olarak çıkarır, sonuçları
+sayfa sırasıyla akış (generator) halinde döndürür ve cümle sınırlarına uyan,
+sayfa aralığı ile karakter konumlarını taşıyan metin parçalarına böler.
+Büyük dosyalar diskteki bir geçici dosyadan bellek eşlemeli (mmap) olarak okunur.
+"""
+
+import io
+import mmap
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# Her süreç görevine verilecek sayfa sayısı
+PAGES_PER_TASK = 8
+
+# Havuz başlatma maliyetine değmeyecek kadar küçük belgeler sırayla işlenir
+MIN_PAGES_FOR_POOL = PAGES_PER_TASK * 2
+
+# Parçalama mantığı değiştiğinde artırılır (önbellekteki eski parçaları geçersiz kılar)
+CHUNKER_VERSION = 1
+
+# Varsayılan parça boyutu ve parçalar arası örtüşme (karakter)
+DEFAULT_CHUNK_CHARS = 1600
+DEFAULT_CHUNK_OVERLAP = 200
+
+# Dosya yolundan okurken PdfReader bu kadar sayfada bir yeniden açılır; PyPDF2'nin
+# çözümlenmiş nesne önbelleği büyümez, bellek kullanımı sayfa sayısından bağımsız kalır
+LARGE_PDF_BATCH_PAGES = 64
+
+# Yüklemelerin diske kopyalanırken okunduğu blok boyutu
+SPOOL_BLOCK_SIZE = 1024 * 1024
+
+# Cümle sonu ya da paragraf boşluğu: birimler bu konumlardan sonra biter
+_BOUNDARY_RE = re.compile(r"[.!?…]+[\"'”’)\]]*\s+|\n\s*\n")
+_PAGE_MARKER_RE = re.compile(r"\n--- Sayfa (\d+) ---\n")
+
+# Metin parçası: metin, sayfa aralığı ve tam metin içindeki [start, end) konumları
+Chunk = namedtuple("Chunk", ["text", "page_start", "page_end", "start", "end"])
+
+# Süreç içi PdfReader (havuz işçilerinde _init_worker ile kurulur)
+_worker_reader = None
+_worker_source = None
+_worker_pages = 0
+
+
+def _pool_context():
+    # Havuz fork ile değil forkserver (yoksa spawn) ile başlatılır: işler çok thread'li
+    # sunucunun arka plan thread'lerinden başlatılır ve fork, başka bir thread'in tuttuğu
+    # kilidi (logging, import, SQLite) alt sürece kopyalayıp kilitlenmesine yol açabilir
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def default_worker_count():
+    """
+    Ortam değişkeninden varsayılan çıkarma işçisi sayısını okur.
+
+    Returns:
+        int: İşçi sayısı (1 = sıralı çıkarma)
+    """
+    try:
+        return max(1, int(os.getenv("PDF_EXTRACT_WORKERS", "1")))
+    except ValueError:
+        return 1
+
+
+def _env_megabytes(name, default):
+    try:
+        return max(0.0, float(os.getenv(name, default)))
+    except ValueError:
+        return float(default)
+
+
+def max_upload_mb():
+    """
+    Bellekte işlenecek dosyalar için üst sınır (MAX_UPLOAD_MB, varsayılan 10).
+
+    Returns:
+        float: Megabayt
+    """
+    return _env_megabytes("MAX_UPLOAD_MB", "10")
+
+
+def large_pdf_max_mb():
+    """
+    Büyük dosya modunda kabul edilecek üst sınır (LARGE_PDF_MAX_MB, varsayılan 200).
+    MAX_UPLOAD_MB'dan büyük, bu değerden küçük dosyalar diskten işlenir.
+
+    Returns:
+        float: Megabayt (0 = büyük dosya modu kapalı)
+    """
+    return _env_megabytes("LARGE_PDF_MAX_MB", "200")
+
+
+def spool_to_file(pdf_file, directory=None):
+    """
+    Yüklenen dosyayı bloklar halinde geçici bir dosyaya kopyalar.
+
+    Args:
+        pdf_file: Okunabilir dosya nesnesi (ör. Streamlit UploadedFile)
+        directory: Geçici dosya dizini (None ise LARGE_PDF_DIR veya sistem varsayılanı)
+
+    Returns:
+        str: Geçici dosya yolu; işi biten çağıran siler
+    """
+    pdf_file.seek(0)
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=directory or os.getenv("LARGE_PDF_DIR") or None)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(pdf_file, out, SPOOL_BLOCK_SIZE)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def read_pdf_bytes(pdf_file):
+    """
+    Yüklenen dosyayı ya da dosya yolunu bayt dizisine çevirir.
+
+    Args:
+        pdf_file: Dosya yolu, bayt dizisi veya okunabilir dosya nesnesi
+
+    Returns:
+        bytes: PDF içeriği
+    """
+    if isinstance(pdf_file, (bytes, bytearray)):
+        return bytes(pdf_file)
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, "rb") as f:
+            return f.read()
+    if hasattr(pdf_file, "getvalue"):
+        return pdf_file.getvalue()
+    pdf_file.seek(0)
+    return pdf_file.read()
+
+
+def format_page(page_num, page_text):
+    """
+    Sayfa metnini "--- Sayfa N ---" başlığıyla biçimlendirir.
+
+    Args:
+        page_num: 1'den başlayan sayfa numarası
+        page_text: Sayfadan çıkarılan metin
+
+    Returns:
+        str: Biçimlendirilmiş sayfa metni
+    """
+    return f"\n--- Sayfa {page_num} ---\n{page_text}"
+
+
+def _open_reader(source):
+    # PyPDF2 ilk PDF işlenirken yüklenir; uygulamanın ilk sayfa açılışı bunu beklemez
+    from PyPDF2 import PdfReader
+
+    # Bayt dizisi bellekten, dosya yolu ise bellek eşlemeli olarak okunur
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return PdfReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return PdfReader(io.BytesIO(source))
+
+
+def _init_worker(source):
+    global _worker_reader, _worker_source, _worker_pages
+    _worker_reader = _open_reader(source)
+    _worker_source = source
+    _worker_pages = 0
+
+
+def _extract_range(start, end):
+    # İşçi süreçte çalışır: [start, end) aralığındaki sayfaların metnini döndürür
+    global _worker_reader, _worker_pages
+    if isinstance(_worker_source, (str, os.PathLike)) and _worker_pages >= LARGE_PDF_BATCH_PAGES:
+        _worker_reader = _open_reader(_worker_source)
+        _worker_pages = 0
+    _worker_pages += end - start
+    return [_worker_reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def iter_page_texts(pdf_bytes, workers=1, pages_per_task=PAGES_PER_TASK):
+    """
+    Sayfa metinlerini sayfa sırasıyla üretir.
+
+    Args:
+        pdf_bytes: PDF içeriği ya da PDF dosyasının yolu (yol verilirse dosya
+            bellek eşlemeli okunur, işçilere yalnızca yol gönderilir)
+        workers: Süreç havuzu boyutu (1 ise sıralı çıkarma)
+        pages_per_task: Her süreç görevine düşen sayfa sayısı
+
+    Yields:
+        tuple: (sayfa_no, sayfa_metni, toplam_sayfa)
+    """
+    from_file = isinstance(pdf_bytes, (str, os.PathLike))
+    reader = _open_reader(pdf_bytes)
+    page_count = len(reader.pages)
+
+    if workers <= 1 or page_count < MIN_PAGES_FOR_POOL:
+        for i in range(page_count):
+            if from_file and i and i % LARGE_PDF_BATCH_PAGES == 0:
+                reader = _open_reader(pdf_bytes)
+            yield i + 1, reader.pages[i].extract_text() or "", page_count
+        return
+    del reader
+
+    ranges = [(start, min(start + pages_per_task, page_count))
+              for start in range(0, page_count, pages_per_task)]
+    # PDF baytları (ya da dosya yolu) her işçiye bir kez gönderilir, görev başına kopyalanmaz
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                             initializer=_init_worker, initargs=(pdf_bytes,)) as pool:
+        # Bellekte bekleyen sonuçları sınırlamak için en fazla 2*workers görev kuyrukta tutulur
+        max_in_flight = workers * 2
+        pending = deque()
+        next_range = 0
+        try:
+            while next_range < len(ranges) or pending:
+                while next_range < len(ranges) and len(pending) < max_in_flight:
+                    start, end = ranges[next_range]
+                    pending.append((start, pool.submit(_extract_range, start, end)))
+                    next_range += 1
+                start, future = pending.popleft()
+                for offset, page_text in enumerate(future.result()):
+                    yield start + offset + 1, page_text, page_count
+        finally:
+            # Tüketici erken bırakırsa (hata, iptal) kuyruktaki görevleri çalıştırma
+            for _, future in pending:
+                future.cancel()
+
+
+def read_outline(pdf_file):
+    """
+    PDF'in içindekiler (outline/bookmark) girdilerini okur.
+
+    Args:
+        pdf_file: Dosya yolu, bayt dizisi veya yüklenen dosya
+
+    Returns:
+        list: (başlık, düzey, sayfa_no) üçlüleri; outline yoksa veya okunamazsa boş liste
+    """
+    source = pdf_file if isinstance(pdf_file, (str, os.PathLike)) else read_pdf_bytes(pdf_file)
+    try:
+        reader = _open_reader(source)
+        outline = reader.outline
+    except Exception:
+        return []  # Bozuk outline metin çıkarmayı engellememeli
+
+    entries = []
+
+    def walk(items, level):
+        for item in items:
+            # İç içe liste, bir önceki girdinin alt başlıklarıdır
+            if isinstance(item, list):
+                walk(item, level + 1)
+                continue
+            try:
+                page_index = reader.get_destination_page_number(item)
+            except Exception:
+                continue
+            title = " ".join(str(getattr(item, "title", "") or "").split())
+            if title and page_index is not None and page_index >= 0:
+                entries.append((title, level, page_index + 1))
+
+    walk(outline, 1)
+    return entries
+
+
+def extract_text_from_pdf(pdf_file, workers=1, progress_callback=None):
+    """
+    PDF dosyasından metin çıkarır; okunamayan dosyada PyPDF2 hatası yükselir.
+
+    Args:
+        pdf_file: Dosya yolu, bayt dizisi veya yüklenen dosya
+        workers: Paralel çıkarma için süreç sayısı (1 = sıralı)
+        progress_callback: Her sayfadan sonra (sayfa_no, toplam_sayfa) ile çağrılır
+
+    Returns:
+        tuple: (metin, sayfa_sayısı)
+    """
+    parts = []
+    page_count = 0
+
+    for page_num, page_text, page_count in iter_page_texts(read_pdf_bytes(pdf_file), workers=workers):
+        if page_text.strip():  # Boş sayfaları atla
+            parts.append(format_page(page_num, page_text))
+        if progress_callback:
+            progress_callback(page_num, page_count)
+
+    return "".join(parts), page_count
+
+
+def _split_units(block, max_chars):
+    # Bloğu cümle/paragraf sınırlarından birimlere böler; birimler bitişiktir
+    # (aradaki boşluklar dahil), böylece birleştirilmeleri orijinal metni verir.
+    # max_chars'tan uzun birimler boşluktan, yoksa doğrudan sınırdan kesilir.
+    start = 0
+    ends = [m.end() for m in _BOUNDARY_RE.finditer(block)]
+    if not ends or ends[-1] != len(block):
+        ends.append(len(block))
+    for end in ends:
+        while end - start > max_chars:
+            cut = block.rfind(" ", start + max_chars // 2, start + max_chars)
+            cut = cut + 1 if cut != -1 else start + max_chars
+            yield start, cut
+            start = cut
+        if end > start:
+            yield start, end
+            start = end
+
+
+def iter_chunks(blocks, max_chars=DEFAULT_CHUNK_CHARS, overlap=DEFAULT_CHUNK_OVERLAP):
+    """
+    Sayfa bloklarını cümle sınırlarına uyan, boyutu sınırlı parçalara böler.
+
+    Yalnızca o anki sayfa ve açık parça bellekte tutulur.
+
+    Args:
+        blocks: (sayfa_no, blok_metni) demetleri; blokların birleşimi tam metindir
+        max_chars: Bir parçanın en fazla karakter sayısı (kesin sınır)
+        overlap: Ardışık parçalar arasında tekrarlanacak en fazla karakter
+
+    Yields:
+        Chunk: Metin parçası
+    """
+    if overlap >= max_chars:
+        raise ValueError("overlap, max_chars değerinden küçük olmalı")
+
+    units = deque()  # (metin, sayfa_no, başlangıç) - açık parçanın birimleri
+    size = 0
+    fresh = False  # Son yayımlanan parçadan sonra yeni birim eklendi mi
+    offset = 0
+
+    def emit():
+        text = "".join(u[0] for u in units)
+        return Chunk(text, units[0][1], units[-1][1], units[0][2], units[0][2] + len(text))
+
+    for page_num, block in blocks:
+        for start, end in _split_units(block, max_chars):
+            unit_len = end - start
+            if size + unit_len > max_chars and fresh:
+                chunk = emit()
+                if chunk.text.strip():
+                    yield chunk
+                # Örtüşme: sondaki birimler overlap sınırına kadar yeni parçaya taşınır
+                kept = keep_count = 0
+                for unit in reversed(units):
+                    if kept + len(unit[0]) > overlap:
+                        break
+                    kept += len(unit[0])
+                    keep_count += 1
+                while len(units) > keep_count:
+                    size -= len(units.popleft()[0])
+                fresh = False
+            while units and size + unit_len > max_chars:
+                size -= len(units.popleft()[0])
+            units.append((block[start:end], page_num, offset + start))
+            size += unit_len
+            fresh = True
+        offset += len(block)
+
+    if units and fresh:
+        chunk = emit()
+        if chunk.text.strip():
+            yield chunk
+
+
+def iter_text_blocks(text):
+    """
+    Önceden çıkarılmış metni "--- Sayfa N ---" işaretlerine göre sayfa bloklarına ayırır.
+
+    Args:
+        text: extract_text_from_pdf çıktısı
+
+    Yields:
+        tuple: (sayfa_no, blok_metni); blokların birleşimi text'tir
+    """
+    markers = list(_PAGE_MARKER_RE.finditer(text))
+    if not markers or markers[0].start() > 0:
+        first_end = markers[0].start() if markers else len(text)
+        yield 1, text[:first_end]
+    for i, marker in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+        yield int(marker.group(1)), text[marker.start():end]
+
+
+def chunk_text(text, max_chars=DEFAULT_CHUNK_CHARS, overlap=DEFAULT_CHUNK_OVERLAP):
+    """
+    Önceden çıkarılmış metni "--- Sayfa N ---" işaretlerine göre sayfalara ayırıp parçalar.
+
+    Args:
+        text: extract_text_from_pdf çıktısı
+        max_chars: Bir parçanın en fazla karakter sayısı
+        overlap: Ardışık parçalar arasında tekrarlanacak en fazla karakter
+
+    Returns:
+        list: Chunk listesi (konumlar text içindeki konumlardır)
+    """
+    return list(iter_chunks(iter_text_blocks(text), max_chars=max_chars, overlap=overlap))
+
+
+__all__ = [
+    "CHUNKER_VERSION",
+    "DEFAULT_CHUNK_CHARS",
+    "DEFAULT_CHUNK_OVERLAP",
+    "Chunk",
+    "LARGE_PDF_BATCH_PAGES",
+    "default_worker_count",
+    "max_upload_mb",
+    "large_pdf_max_mb",
+    "spool_to_file",
+    "read_pdf_bytes",
+    "format_page",
+    "iter_page_texts",
+    "read_outline",
+    "extract_text_from_pdf",
+    "iter_chunks",
+    "iter_text_blocks",
+    "chunk_text",
+]
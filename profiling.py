@@ -0,0 +1,250 @@
+"""
+İsteğe bağlı profil ve bellek muhasebesi modu (PROFILING=1).
+Açıkken PDF işleme ve soru yanıtlama (get_gemini_response) cProfile ile
+profillenir ve öncesi/sonrası tracemalloc anlık görüntüleri karşılaştırılır;
+istenirse bir sonraki yeniden çalıştırmanın tamamı da profillenir. Kayıtlar
+oturum başına tutulur ve kenar çubuğundan pstats dökümü ve en çok bellek
+ayıran satırlar raporu olarak indirilebilir. Kapalıyken uygulama bu modülün
+hiçbir kodunu çalıştırmaz.
+"""
+
+import contextlib
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque, namedtuple
+
+from chat_store import ChatHistory
+from corpus import Corpus
+
+# Oturum başına tutulacak en fazla kayıt
+MAX_CAPTURES = 10
+
+# Raporlarda gösterilecek en fazla satır
+TOP_ALLOCATIONS = 25
+TOP_FUNCTIONS = 30
+
+# Profil kaydı: etiket, başlangıç, süre, pstats dökümü (marshal; cProfile kullanılamadıysa None),
+# tracemalloc farkı (bayt), en çok ayıran satırlar ve zirve bellek (bayt)
+Capture = namedtuple(
+    "Capture", ["label", "started_at", "seconds", "pstats", "allocated", "top_allocations", "peak"]
+)
+
+# tracemalloc süreç genelidir; eşzamanlı kayıtlar bitene kadar açık tutulur
+_trace_users = 0
+_trace_lock = threading.Lock()
+
+
+def profiling_enabled():
+    """
+    PROFILING ortam değişkenini okur (varsayılan kapalı).
+
+    Returns:
+        bool: Profil ve bellek muhasebesi modu açık mı
+    """
+    return os.getenv("PROFILING", "0").strip().lower() in ("1", "true", "yes")
+
+
+def _start_tracing():
+    global _trace_users
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _trace_users += 1
+
+
+def _stop_tracing():
+    global _trace_users
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0:
+            tracemalloc.stop()
+
+
+def _enable_profiler():
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+: aynı anda yalnızca bir profil aracı çalışabilir
+        return None
+    return profiler
+
+
+def _finish(label, started_at, started, profiler, before):
+    seconds = time.perf_counter() - started
+    dump = None
+    if profiler is not None:
+        profiler.disable()
+        profiler.create_stats()
+        dump = marshal.dumps(profiler.stats)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    diff = after.compare_to(before, "lineno")
+    allocated = sum(stat.size_diff for stat in diff)
+    top = [str(stat) for stat in diff[:TOP_ALLOCATIONS]]
+    _stop_tracing()
+    return Capture(label, started_at, seconds, dump, allocated, top, peak)
+
+
+class SessionProfiler:
+    """
+    Bir oturumun profil kayıtları.
+
+    Kayıtlar arka plan işlerinin thread'lerinden de eklenebilir. tracemalloc
+    süreç genelidir: eşzamanlı başka oturumların ayırmaları da farka girebilir.
+    """
+
+    def __init__(self, max_captures=MAX_CAPTURES):
+        self.captures = deque(maxlen=max_captures)
+        self.rerun_armed = False
+        self._rerun = None  # Süren yeniden çalıştırma profili
+        self._rerun_thread = None  # Profilin açıldığı betik thread'i
+        self._lock = threading.Lock()
+
+    def _add(self, capture):
+        with self._lock:
+            self.captures.append(capture)
+
+    @contextlib.contextmanager
+    def capture(self, label):
+        """
+        Bloğu cProfile ile profiller ve tracemalloc farkını kaydeder.
+
+        Args:
+            label: Kayıt etiketi (ör. "process_pdf:rapor.pdf", "question")
+        """
+        _start_tracing()
+        before = tracemalloc.take_snapshot()
+        started_at = time.time()
+        started = time.perf_counter()
+        # cProfile thread'e özeldir: süren yeniden çalıştırma profili yalnızca kendi
+        # thread'indeki blokları kapsar, orada iç içe profil açılmaz
+        nested = self._rerun is not None and threading.get_ident() == self._rerun_thread
+        profiler = None if nested else _enable_profiler()
+        try:
+            yield
+        finally:
+            self._add(_finish(label, started_at, started, profiler, before))
+
+    def start_rerun(self):
+        """
+        İşaretlenmişse bu yeniden çalıştırmanın profilini başlatır.
+
+        Önceki çalıştırmanın profili kapatılmadan kaldıysa (ör. betik thread'i durdurulduysa)
+        burada kapatılır.
+        """
+        self.stop_rerun(label="rerun (interrupted)")
+        if not self.rerun_armed:
+            return
+        self.rerun_armed = False
+        _start_tracing()
+        self._rerun_thread = threading.get_ident()
+        self._rerun = ("rerun", time.time(), time.perf_counter(), _enable_profiler(),
+                       tracemalloc.take_snapshot())
+
+    def stop_rerun(self, label=None):
+        """Süren yeniden çalıştırma profilini kapatır ve kaydeder."""
+        if self._rerun is None:
+            return
+        default_label, started_at, started, profiler, before = self._rerun
+        self._rerun = None
+        self._rerun_thread = None
+        self._add(_finish(label or default_label, started_at, started, profiler, before))
+
+    def list(self):
+        with self._lock:
+            return list(self.captures)
+
+
+def pstats_report(capture, limit=TOP_FUNCTIONS):
+    """
+    Args:
+        capture: Capture
+        limit: Gösterilecek fonksiyon sayısı
+
+    Returns:
+        str: Kümülatif süreye göre sıralı pstats özeti ve en çok bellek ayıran satırlar
+    """
+    out = io.StringIO()
+    out.write(f"{capture.label}: {capture.seconds:.3f} s, "
+              f"+{capture.allocated / 1024 / 1024:.2f} MB, zirve {capture.peak / 1024 / 1024:.2f} MB\n\n")
+    if capture.pstats is not None:
+        stats = pstats.Stats(_StatsSource(capture.pstats), stream=out)
+        stats.sort_stats("cumulative").print_stats(limit)
+    else:
+        out.write("(cProfile kaydı yok: blok aynı thread'de süren yeniden çalıştırma profilinin içinde çalıştı (süreleri o kayıtta) veya başka bir profil aracı etkindi)\n")
+    out.write("\nEn çok bellek ayıran satırlar (tracemalloc farkı):\n")
+    out.write("\n".join(capture.top_allocations) + "\n")
+    return out.getvalue()
+
+
+class _StatsSource:
+    # pstats.Stats, create_stats() sonrası "stats" alanı olan her nesneyi kabul eder
+    def __init__(self, dump):
+        self.stats = marshal.loads(dump)
+
+    def create_stats(self):
+        pass
+
+
+def _deep_sizeof(obj, seen, depth=0, max_depth=6):
+    # Kapsayıcıları sınırlı derinlikte dolaşır; aynı nesne bir kez sayılır
+    if id(obj) in seen or depth > max_depth:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen, depth + 1) + _deep_sizeof(v, seen, depth + 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(_deep_sizeof(item, seen, depth + 1) for item in obj)
+    return size
+
+
+def session_memory_report(session_state):
+    """
+    Oturum durumundaki alanların yaklaşık bellek kullanımını döndürür.
+
+    Külliyat için parça deposu ve vektörler (paylaşılan belgeler dahil), sohbet
+    için bellekteki mesaj penceresi, diğer alanlar için iç içe boyut sayılır.
+
+    Args:
+        session_state: st.session_state veya sözlük
+
+    Returns:
+        list: {"key", "bytes", "detail"} satırları, büyükten küçüğe
+    """
+    rows = []
+    for key in list(session_state.keys()):
+        value = session_state[key]
+        detail = ""
+        if isinstance(value, Corpus):
+            usage = value.memory_usage()
+            size = usage["total"]
+            detail = (f"{len(value)} belge ({value.shared_count} paylaşılan), metin {usage['text']:,} B, "
+                      f"vektörler {usage['vectors']:,} B, diskten eşlenen {usage['mapped']:,} B")
+        elif isinstance(value, ChatHistory):
+            window = value.in_memory()
+            size = _deep_sizeof(window, set())
+            detail = f"{len(window)} / {len(value)} mesaj bellekte"
+        else:
+            size = _deep_sizeof(value, set())
+        rows.append({"key": str(key), "bytes": size, "detail": detail})
+    rows.sort(key=lambda row: row["bytes"], reverse=True)
+    return rows
+
+
+__all__ = [
+    "Capture",
+    "MAX_CAPTURES",
+    "profiling_enabled",
+    "SessionProfiler",
+    "pstats_report",
+    "session_memory_report",
+]
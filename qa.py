@@ -0,0 +1,682 @@
+"""
+Streamlit'ten bağımsız soru-cevap çekirdeği.
+Belge işleme, ilgili parçaların bulunması, prompt oluşturma ve Gemini çağrısı
+hem Streamlit arayüzü hem de toplu (batch) çalıştırma tarafından kullanılır.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import warnings
+
+from answer_cache import make_key
+from context_packer import (
+    DEFAULT_CONTEXT_BUDGET,
+    Passage,
+    TokenEstimator,
+    context_budget,
+    format_context,
+    get_estimator,
+    pack_context,
+)
+from conversation import ConversationMemory, get_conversation_memory
+from chunk_store import ChunkStoreWriter, default_store_mode
+from doc_cache import cache_version, document_key
+from fake_gemini import fake_backend_enabled, fake_model_from_env
+from metrics import span
+from pdf_pipeline import (
+    DEFAULT_CHUNK_CHARS,
+    DEFAULT_CHUNK_OVERLAP,
+    format_page,
+    iter_chunks,
+    iter_page_texts,
+    read_outline,
+)
+from rate_limit import call_with_retry
+from retrieval import IndexBuilder, build_index
+from sections import build_section_index, drop_repeated, page_headings, section_pruning_enabled
+
+
+def get_text_stats(text):
+    """
+    Metin istatistiklerini hesaplar.
+    
+    Args:
+        text: Analiz edilecek metin
+        
+    Returns:
+        dict: Karakter ve kelime sayısı
+    """
+    word_count = len(text.split())
+    char_count = len(text)
+    return {"words": word_count, "characters": char_count}
+
+
+def format_page_range(chunk):
+    """
+    Parçanın kaynak sayfa aralığını etiket olarak döndürür.
+    
+    Args:
+        chunk: Metin parçası (Chunk)
+        
+    Returns:
+        str: "Sayfa 3" veya "Sayfa 3-4"
+    """
+    if chunk.page_start == chunk.page_end:
+        return f"Sayfa {chunk.page_start}"
+    return f"Sayfa {chunk.page_start}-{chunk.page_end}"
+
+
+def retrieve_passages(chunks, query, top_k=2, index=None, mode="bm25", section_index=None):
+    """
+    Soruyla ilgili en alakalı metin parçalarını skorlarıyla bulur.
+    
+    Args:
+        chunks: Metin parçaları (Chunk) listesi
+        query: Kullanıcı sorusu
+        top_k: Kaç parça döndürülecek
+        index: Önceden oluşturulmuş belge indeksi (yoksa burada kurulur)
+        mode: Arama modu ("bm25", "vector" veya "hybrid")
+        section_index: Belgenin SectionIndex'i; verilirse ve SECTION_PRUNING açıksa
+            yalnızca soruyla başlığı eşleşen bölümlerin parçaları skorlanır
+        
+    Returns:
+        list: Sayfa etiketli Passage'lar, skora göre azalan sırada
+    """
+    if index is None:
+        index = build_index([chunk.text for chunk in chunks])
+    
+    # En yüksek skorlu parçaları al (eşleşen bölümlerde sonuç yoksa tüm belgede)
+    results = []
+    if section_index and section_pruning_enabled():
+        chunk_ids = section_index.prune(query)
+        if chunk_ids is not None:
+            results = index.search(query, top_k=top_k, mode=mode, chunk_ids=chunk_ids)
+    if not results:
+        results = index.search(query, top_k=top_k, mode=mode)
+    results = [(chunks[doc_id], score) for doc_id, score in results]
+    
+    # Anahtar kelime modunda hiç eşleşme yoksa ilk chunk'ı döndür; vektör modlarında
+    # eşik altı parçalar gönderilmez (alakasız bağlam token harcamasın)
+    if not results and chunks and mode == "bm25":
+        results = [(chunks[0], 0.0)]
+    
+    return [Passage(format_page_range(chunk), chunk.text, score) for chunk, score in results]
+
+
+def search_relevant_chunks(chunks, query, top_k=2, index=None, mode="bm25", section_index=None):
+    """
+    Soruyla ilgili en alakalı metin parçalarını bulur.
+    
+    Args:
+        chunks: Metin parçaları (Chunk) listesi
+        query: Kullanıcı sorusu
+        top_k: Kaç parça döndürülecek
+        index: Önceden oluşturulmuş belge indeksi (yoksa burada kurulur)
+        mode: Arama modu ("bm25", "vector" veya "hybrid")
+        section_index: Bölüm budaması için belgenin SectionIndex'i
+        
+    Returns:
+        str: Sayfa etiketli, birleştirilmiş alakalı metin parçaları
+    """
+    return format_context(retrieve_passages(
+        chunks, query, top_k=top_k, index=index, mode=mode, section_index=section_index
+    ))
+
+
+def retrieve_corpus_passages(corpus, query, top_k=2, mode="bm25", names=None, sections=None):
+    """
+    Külliyattaki (seçili) belgelerde soruyla ilgili parçaları skorlarıyla bulur.
+    
+    Args:
+        corpus: Corpus
+        query: Kullanıcı sorusu
+        top_k: Toplamda kaç parça döndürülecek
+        mode: Arama modu ("bm25", "vector" veya "hybrid")
+        names: Yalnızca bu belgelerde ara (None ise hepsi)
+        sections: belge_adı -> bölüm numaraları; verilirse yalnızca bu bölümlerde aranır
+        
+    Returns:
+        list: Belge adı ve sayfa etiketli Passage'lar, skora göre azalan sırada
+    """
+    results = corpus.search(
+        query, top_k=top_k, mode=mode, names=names, sections=sections, prune=section_pruning_enabled()
+    )
+    
+    # Tek belgeli aramadaki gibi: anahtar kelime modunda eşleşme yoksa ilk seçili belgenin ilk parçası
+    if not results and mode == "bm25":
+        # (bölüm filtresi varsa ilk seçili bölümün ilk parçası)
+        for name in (corpus.names() if names is None else names):
+            if name not in corpus or not corpus.documents[name]["chunks"]:
+                continue
+            if sections is not None:
+                if not sections.get(name):
+                    continue
+                first = corpus.sections(name)[sections[name][0]].chunk_start
+            else:
+                first = 0
+            results = [(name, corpus.documents[name]["chunks"][first], 0.0)]
+            break
+    
+    return [
+        Passage(f"{name} · {format_page_range(chunk)}", chunk.text, score)
+        for name, chunk, score in results
+    ]
+
+
+def search_corpus(corpus, query, top_k=2, mode="bm25", names=None, sections=None):
+    """
+    Külliyattaki (seçili) belgelerde soruyla ilgili parçaları bulur.
+    
+    Args:
+        corpus: Corpus
+        query: Kullanıcı sorusu
+        top_k: Toplamda kaç parça döndürülecek
+        mode: Arama modu ("bm25", "vector" veya "hybrid")
+        names: Yalnızca bu belgelerde ara (None ise hepsi)
+        sections: belge_adı -> bölüm numaraları; verilirse yalnızca bu bölümlerde aranır
+        
+    Returns:
+        str: Belge adı ve sayfa etiketli, birleştirilmiş alakalı metin parçaları
+    """
+    return format_context(retrieve_corpus_passages(
+        corpus, query, top_k=top_k, mode=mode, names=names, sections=sections
+    ))
+
+
+def _stream_document(source, writer, builder, workers=1, progress_callback=None, stage=None):
+    # Sayfaları okur, parçalar ve indeksler; tek geçişte, tam metni birleştirmeden
+    totals = {"pages": 0, "words": 0}
+    headings = []
+
+    def blocks():
+        for page_num, page_text, page_count in iter_page_texts(source, workers=workers):
+            totals["pages"] = page_count
+            if page_text.strip():  # Boş sayfaları atla
+                block = format_page(page_num, page_text)
+                writer.write_block(block)
+                totals["words"] += len(block.split())
+                headings.extend(page_headings(page_num, block))
+                yield page_num, block
+            if progress_callback:
+                progress_callback(page_num, page_count)
+
+    for chunk in iter_chunks(blocks(), max_chars=DEFAULT_CHUNK_CHARS, overlap=DEFAULT_CHUNK_OVERLAP):
+        writer.add_chunk(chunk)
+        builder.add(chunk.text)
+    store = writer.finish()
+    if stage:
+        stage("build_index")
+    index = builder.finish()
+    return store, index, totals, drop_repeated(headings)
+
+
+def process_document(pdf_bytes, workers=1, progress_callback=None, doc_cache=None, metrics=None,
+                     store_mode=None, stage_callback=None):
+    """
+    PDF'i işler (metin, parçalar, indeks, istatistik); aynı dosya daha önce
+    işlendiyse sonucu disk önbelleğinden döndürür.
+    
+    Sayfalar akış halinde okunur, parçalanır ve indekslenir: tam metin str olarak
+    birleştirilmez ve parça listesi tutulmaz, metin doğrudan depoya yazılır.
+    
+    Args:
+        pdf_bytes: Yüklenen dosyanın baytları
+        workers: Paralel çıkarma için süreç sayısı
+        progress_callback: Her sayfadan sonra (sayfa_no, toplam_sayfa) ile çağrılır
+        doc_cache: DocumentCache (None ise önbellek kullanılmaz)
+        metrics: Aşama sürelerinin yazılacağı Metrics (None ise ölçülmez)
+        store_mode: Parça deposu modu ("memory", "zlib", "mmap"; None ise CHUNK_STORE_MODE)
+        stage_callback: Her aşamanın başında aşama adıyla çağrılır ("extract_text_from_pdf",
+            "build_index", "build_sections"); okuma, parçalama ve indeksleme tek geçişte yapılır
+        
+    Returns:
+        dict: page_count, chunks (ChunkStore), index, sections (SectionIndex veya None),
+            stats, from_cache (metin yoksa None)
+    """
+    stage = stage_callback or (lambda name: None)
+    cache_key = document_key(pdf_bytes)
+    version = cache_version(DEFAULT_CHUNK_CHARS, DEFAULT_CHUNK_OVERLAP)
+    
+    if doc_cache:
+        cached = doc_cache.get(cache_key, version)
+        if cached:
+            return dict(cached, from_cache=True)
+    
+    # Arama indeksi bir kez kurulur, her soruda tekrar kullanılır
+    stage("extract_text_from_pdf")
+    with span(metrics, "extract_text_from_pdf"):
+        store, index, totals, headings = _stream_document(
+            pdf_bytes,
+            ChunkStoreWriter(keep_chars=2 * DEFAULT_CHUNK_CHARS, mode=store_mode or default_store_mode()),
+            IndexBuilder(in_memory=True),
+            workers=workers,
+            progress_callback=progress_callback,
+            stage=stage,
+        )
+    if not store.char_length:
+        return None
+    
+    # Bölüm ağacı: PDF'in outline'ı, yoksa sayfa metnindeki başlık satırları
+    stage("build_sections")
+    with span(metrics, "build_sections"):
+        sections = build_section_index(
+            read_outline(pdf_bytes) or headings, store.page_spans(), totals["pages"]
+        )
+    document = {
+        "page_count": totals["pages"],
+        "chunks": store,
+        "index": index,
+        "sections": sections,
+        "stats": {"words": totals["words"], "characters": store.char_length},
+    }
+    
+    if doc_cache:
+        try:
+            doc_cache.put(cache_key, version, document)
+        except OSError:
+            pass  # Önbelleğe yazılamaması işlemeyi engellememeli
+    
+    return dict(document, from_cache=False)
+
+
+def process_large_document(pdf_path, workers=1, progress_callback=None, metrics=None, stage_callback=None):
+    """
+    Diskteki büyük bir PDF'i bellek kullanımı dosya boyutundan bağımsız kalacak şekilde işler.
+    
+    Sayfalar bellek eşlemeli dosyadan partiler halinde okunur; metin ve vektörler
+    geçici dosyalara yazılır, tam metin hiçbir zaman bellekte birleştirilmez.
+    Sonuç disk önbelleğine yazılmaz.
+    
+    Args:
+        pdf_path: PDF dosyasının yolu (ör. spool_to_file sonucu)
+        workers: Paralel çıkarma için süreç sayısı
+        progress_callback: Her sayfadan sonra (sayfa_no, toplam_sayfa) ile çağrılır
+        metrics: Aşama sürelerinin yazılacağı Metrics (None ise ölçülmez)
+        stage_callback: Aşama başlarken aşama adıyla çağrılır ("process_large_document",
+            "build_index"); çıkarma, parçalama, başlık bulma ve indeksleme tek geçişte yapılır
+        
+    Returns:
+        dict: page_count, chunks (mmap ChunkStore), index, sections (SectionIndex veya None),
+            stats, from_cache (metin yoksa None)
+    """
+    stage = stage_callback or (lambda name: None)
+    
+    # Çıkarma, parçalama ve indeksleme tek geçişte, akış halinde yapılır
+    stage("process_large_document")
+    with span(metrics, "process_large_document"):
+        store, index, totals, headings = _stream_document(
+            pdf_path,
+            ChunkStoreWriter(keep_chars=2 * DEFAULT_CHUNK_CHARS),
+            IndexBuilder(directory=os.getenv("CHUNK_STORE_DIR") or None),
+            workers=workers,
+            progress_callback=progress_callback,
+            stage=stage,
+        )
+    
+    if not store.char_length:
+        return None
+    
+    with span(metrics, "build_sections"):
+        sections = build_section_index(
+            read_outline(pdf_path) or headings, store.page_spans(), totals["pages"]
+        )
+    
+    return {
+        "page_count": totals["pages"],
+        "chunks": store,
+        "index": index,
+        "sections": sections,
+        "stats": {"words": totals["words"], "characters": store.char_length},
+        "from_cache": False,
+    }
+
+
+# Bütçeye göre seçim yapılacak aday parça sayısı
+CONTEXT_CANDIDATES = 8
+
+
+# Optimized generation config (yanıt önbelleği anahtarının da parçası)
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 2048,  # Çıkış token limiti
+}
+
+
+def create_gemini_model(model_name, api_key, generation_config=None):
+    """
+    Google Gemini modelini oluşturur.
+    
+    Model, global genai.configure yerine yalnızca bu anahtarla yapılandırılmış kendi
+    istemcisini kullanır; farklı anahtarlı oturumlar birbirinin ayarını ezmez. Bunun
+    için SDK'nın belgelenmemiş istemci yöneticisi kullanılır (requirements.txt'de
+    sabitlenen sürüm); SDK'da bulunmazsa bir kez uyarı verilerek global
+    genai.configure'a dönülür. Bu modda süreç yalnızca ilk yapılandırılan anahtarı
+    kullanır: başka bir anahtarla model istenirse ValueError fırlatılır (oturumlar
+    birbirinin anahtarıyla istek atmasın ve havuzda anahtar başına model tutulmasın).
+    GEMINI_BACKEND=fake ise ağa çıkmayan sahte model (FAKE_GEMINI_* ayarlarıyla) döner.
+    
+    Args:
+        model_name: Kullanılacak Gemini model adı
+        api_key: Google API anahtarı
+        generation_config: Üretim ayarları (None ise GENERATION_CONFIG)
+        
+    Returns:
+        GenerativeModel: Yapılandırılmış Gemini modeli
+
+    Raises:
+        ValueError: Global yapılandırma modunda farklı bir API anahtarı verildiğinde
+    """
+    if fake_backend_enabled():
+        return fake_model_from_env(model_name)
+    
+    # SDK yalnızca gerçek Gemini kullanılırken gerekir (sahte modelle toplu çalıştırmada değil)
+    import google.generativeai as genai
+    
+    # Model adına "models/" prefix'i ekle
+    full_model_name = f"models/{model_name}" if not model_name.startswith("models/") else model_name
+    
+    model = genai.GenerativeModel(
+        full_model_name,
+        generation_config=generation_config or GENERATION_CONFIG
+    )
+    client = _private_client(api_key)
+    if client is None or not hasattr(model, "_client"):
+        _configure_global(genai, api_key)
+    else:
+        model._client = client
+    return model
+
+
+_global_key_hash = None  # Global yapılandırmaya dönüldüyse kullanılan anahtarın özeti
+_global_key_lock = threading.Lock()
+
+
+def _configure_global(genai, api_key):
+    # Global yapılandırma süreç genelidir; ikinci bir anahtar ilkini sessizce ezerdi
+    global _global_key_hash
+    key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+    with _global_key_lock:
+        if _global_key_hash is None:
+            warnings.warn(
+                "google-generativeai sürümünde anahtara özel istemci bulunamadı; global "
+                "genai.configure kullanılıyor, süreç tek bir API anahtarıyla sınırlı",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+        elif key_hash != _global_key_hash:
+            raise ValueError(
+                "Bu google-generativeai sürümünde aynı süreçte birden fazla API anahtarı "
+                "kullanılamaz; sunucuyu tek bir anahtarla (GEMINI_API_KEY) çalıştırın"
+            )
+        genai.configure(api_key=api_key)
+        _global_key_hash = key_hash
+
+
+def _private_client(api_key):
+    # Anahtara özel istemci; SDK iç yapısı değiştiyse None (global yapılandırmaya dönülür)
+    try:
+        from google.generativeai import client as genai_client
+        client_manager = genai_client._ClientManager()
+        client_manager.configure(api_key=api_key)
+        return client_manager.make_client("generative")
+    except (ImportError, AttributeError, TypeError):
+        return None
+
+
+# Güvenlik ayarları
+SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_ONLY_HIGH"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_ONLY_HIGH"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_ONLY_HIGH"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_ONLY_HIGH"}
+]
+
+
+class GeminiStreamError(Exception):
+    """Akış yarıda kesildiğinde o ana kadar gelen metinle birlikte fırlatılır."""
+
+    def __init__(self, message, partial_text):
+        super().__init__(message)
+        self.partial_text = partial_text
+
+
+def build_prompt(prompt, pdf_chunks, chat_history, pdf_index=None, retrieval_mode="bm25", metrics=None,
+                 corpus=None, doc_filter=None, context_budget=DEFAULT_CONTEXT_BUDGET, estimator=None,
+                 memory=None, section_filter=None, pdf_sections=None):
+    """
+    Soru, ilgili belge parçaları ve kısa sohbet geçmişinden prompt oluşturur.
+    
+    Args:
+        prompt: Kullanıcı sorusu
+        pdf_chunks: PDF içeriği parçaları
+        chat_history: Sohbet geçmişi
+        pdf_index: PDF parçalarının arama indeksi
+        retrieval_mode: Arama modu ("bm25", "vector" veya "hybrid")
+        metrics: Aşama sürelerinin yazılacağı Metrics (None ise ölçülmez)
+        corpus: Çok belgeli arama için Corpus (verilirse pdf_chunks/pdf_index kullanılmaz)
+        doc_filter: Külliyatta yalnızca bu belgelerde ara (None ise hepsi)
+        context_budget: Belge bağlamı için token bütçesi
+        estimator: TokenEstimator (None ise kalibre edilmemiş varsayılan)
+        memory: Geçmişi özetleyen ConversationMemory (None ise çağrıya özel yeni bellek)
+        section_filter: Külliyatta belge_adı -> bölüm numaraları; verilirse yalnızca bu
+            bölümlerde aranır
+        pdf_sections: Tek belgeli aramada bölüm budaması için SectionIndex
+        
+    Returns:
+        tuple: (tam_prompt, ilgili_bağlam, geçmiş_metni)
+    """
+    # Soruyla ilgili aday parçaları bul
+    with span(metrics, "search_relevant_chunks"):
+        if corpus is not None:
+            passages = retrieve_corpus_passages(
+                corpus, prompt, top_k=CONTEXT_CANDIDATES, mode=retrieval_mode, names=doc_filter,
+                sections=section_filter
+            )
+        else:
+            passages = retrieve_passages(
+                pdf_chunks, prompt, top_k=CONTEXT_CANDIDATES, index=pdf_index, mode=retrieval_mode,
+                section_index=pdf_sections
+            )
+    
+    with span(metrics, "build_prompt"):
+        # Bütçeye token başına en alakalı, birbirini tekrar etmeyen parçalar sığdırılır
+        estimator = estimator or TokenEstimator()
+        packed = pack_context(passages, context_budget, estimator)
+        relevant_context = format_context(packed)
+        # Eski turlar özet, son tur tam metin (prompt boyutu konuşma uzadıkça büyümez)
+        history_text = (memory or ConversationMemory()).render(chat_history, estimator)
+        return _format_prompt(prompt, relevant_context, history_text), relevant_context, history_text
+
+
+def _format_prompt(prompt, relevant_context, history_text):
+    # Kısaltılmış ve optimize edilmiş prompt
+    system_prompt = """PDF belge asistanısın. Sadece verilen bilgilere göre yanıt ver, kullandığın belge ve sayfaları belirt.
+
+İlgili Metin:
+{context}
+
+{history}
+Soru: {question}
+
+Yanıt:"""
+
+    # Prompt'u hazırla
+    return system_prompt.format(
+        context=relevant_context,
+        history=f"{history_text}\n" if history_text else "",
+        question=prompt
+    )
+
+
+def stream_response_text(response, started_at, stream_stats, on_complete=None):
+    """
+    Gemini akış yanıtından metin parçalarını üretir ve ilk token süresini ölçer.
+    
+    Args:
+        response: generate_content(stream=True) sonucu
+        started_at: İsteğin gönderildiği an (time.perf_counter)
+        stream_stats: "ttft" (saniye), "text" (tam metin) ve "usage" (token kullanımı)
+            yazılacak sözlük
+        on_complete: Akış sorunsuz bittiğinde tam metin ve kullanım bilgisiyle çağrılır
+        
+    Yields:
+        str: Yanıt metni parçaları
+    """
+    parts = []
+    try:
+        for chunk in response:
+            try:
+                piece = chunk.text
+            except ValueError:
+                continue  # Metin içermeyen parça (ör. bitiş/güvenlik bilgisi)
+            if not piece:
+                continue
+            if "ttft" not in stream_stats:
+                stream_stats["ttft"] = time.perf_counter() - started_at
+            parts.append(piece)
+            yield piece
+    except Exception as e:
+        stream_stats["text"] = "".join(parts)
+        raise GeminiStreamError(f"Gemini yanıt hatası: {str(e)}", stream_stats["text"]) from e
+    
+    stream_stats["text"] = "".join(parts)
+    # Akış yanıtında token kullanımı ancak tüm parçalar okunduktan sonra kesinleşir
+    stream_stats["usage"] = getattr(response, "usage_metadata", None)
+    if on_complete:
+        on_complete(stream_stats["text"], stream_stats["usage"])
+
+
+def get_gemini_response(model, prompt, pdf_chunks, chat_history, pdf_index=None,
+                        retrieval_mode="bm25", stream=False, stream_stats=None,
+                        session_id=None, limiter=None, answer_cache=None, max_retries=3,
+                        metrics=None, corpus=None, doc_filter=None, section_filter=None, pdf_sections=None,
+                        limiter_timeout=None):
+    """
+    Gemini'den yanıt alır (Optimize Edilmiş - Daha Az Token).
+    
+    Args:
+        model: Gemini model instance
+        prompt: Kullanıcı sorusu
+        pdf_chunks: PDF içeriği parçaları
+        chat_history: Sohbet geçmişi
+        pdf_index: PDF parçalarının arama indeksi
+        retrieval_mode: Arama modu ("bm25", "vector" veya "hybrid")
+        stream: True ise yanıt, parçalar geldikçe okunabilen bir üreteç olarak döner
+        stream_stats: İlk token süresi (akış), tam metin ve gerçek token kullanımının
+            ("usage") yazılacağı sözlük
+        session_id: Hız sınırlayıcıda adil sıralama ve konuşma özeti için oturum kimliği
+        limiter: RateLimiter (None ise sınırlama yapılmaz)
+        answer_cache: AnswerCache (None ise önbellek kullanılmaz)
+        max_retries: 429/5xx hatalarında en fazla yeniden deneme
+        metrics: Aşama süreleri ve token sayılarının yazılacağı Metrics (None ise ölçülmez)
+        corpus: Çok belgeli arama için Corpus (verilirse pdf_chunks/pdf_index kullanılmaz)
+        doc_filter: Külliyatta yalnızca bu belgelerde ara (None ise hepsi)
+        section_filter: Külliyatta belge_adı -> bölüm numaraları (None ise bölüm filtresi yok)
+        pdf_sections: Tek belgeli aramada bölüm budaması için SectionIndex
+        limiter_timeout: Sınırlayıcıda en fazla bekleme (None = sınırsız)
+        
+    Returns:
+        tuple: (model_yanıtı, önbellekten_mi); akış modunda ve önbellekte yoksa
+            model_yanıtı metin parçaları üreten bir generator'dır
+    
+    Raises:
+        Exception: "Gemini yanıt hatası: ..."; asıl hata __cause__ alanındadır
+    """
+    try:
+        model_name = getattr(model, "model_name", str(model))
+        estimator = get_estimator(model_name)
+        full_prompt, relevant_context, history_text = build_prompt(
+            prompt, pdf_chunks, chat_history, pdf_index=pdf_index, retrieval_mode=retrieval_mode,
+            metrics=metrics, corpus=corpus, doc_filter=doc_filter,
+            context_budget=context_budget(model_name), estimator=estimator,
+            memory=get_conversation_memory(session_id), section_filter=section_filter,
+            pdf_sections=pdf_sections
+        )
+        
+        # Aynı model, soru, bağlam ve sohbet geçmişi için önceki yanıtı kullan (API çağrısı ve bekleme yok)
+        cache_key = make_key(
+            model_name,
+            prompt,
+            relevant_context,
+            GENERATION_CONFIG,
+            history=history_text
+        )
+        if answer_cache:
+            cached_answer = answer_cache.get(cache_key)
+            if cached_answer is not None:
+                return cached_answer, True
+        
+        # Rate limiting - sunucu genelinde paylaşılan istek/token bütçesi;
+        # 429 ve 5xx hataları geri çekilmeyle yeniden denenir
+        estimated_tokens = estimator.estimate(full_prompt)
+        started_at = time.perf_counter()
+        
+        def generate():
+            # Her deneme ayrı ölçülür; akış modunda süre, ilk yanıt nesnesine kadardır
+            with span(metrics, "generate_content"):
+                return model.generate_content(
+                    full_prompt,
+                    safety_settings=SAFETY_SETTINGS,
+                    stream=stream
+                )
+        
+        response, waited = call_with_retry(
+            generate,
+            limiter,
+            tokens=estimated_tokens,
+            session_id=session_id,
+            max_retries=max_retries,
+            timeout=limiter_timeout
+        )
+        if metrics is not None:
+            metrics.observe("limiter_wait_seconds", waited)
+        stats = stream_stats if stream_stats is not None else {}
+        
+        def finish(text, usage):
+            # Tahmini token ile gerçek kullanım arasındaki farkı bütçeye yansıt
+            stats["usage"] = usage
+            if usage is not None:
+                # Gerçek prompt token sayısı tahminciyi bu modele göre kalibre eder
+                estimator.observe(full_prompt, usage.prompt_token_count)
+                if limiter:
+                    limiter.adjust(usage.total_token_count - estimated_tokens)
+            if metrics is not None:
+                metrics.observe_usage(usage)
+                metrics.observe("answer_seconds", time.perf_counter() - started_at)
+                if "ttft" in stats:
+                    metrics.observe("time_to_first_token_seconds", stats["ttft"])
+            if answer_cache:
+                answer_cache.put(cache_key, text)
+        
+        if stream:
+            return stream_response_text(response, started_at, stats, finish), False
+        
+        finish(response.text, getattr(response, "usage_metadata", None))
+        return response.text, False
+    
+    except Exception as e:
+        raise Exception(f"Gemini yanıt hatası: {str(e)}") from e
+
+
+__all__ = [
+    "CONTEXT_CANDIDATES",
+    "GENERATION_CONFIG",
+    "SAFETY_SETTINGS",
+    "GeminiStreamError",
+    "get_text_stats",
+    "format_page_range",
+    "retrieve_passages",
+    "search_relevant_chunks",
+    "retrieve_corpus_passages",
+    "search_corpus",
+    "process_document",
+    "process_large_document",
+    "create_gemini_model",
+    "build_prompt",
+    "stream_response_text",
+    "get_gemini_response",
+]
@@ -0,0 +1,298 @@
+"""
+Süreç geneli istek/token hız sınırlayıcı.
+Aynı sunucu sürecindeki tüm Streamlit oturumları dakikalık istek ve token
+bütçelerini paylaşır; bekleyen istekler oturumlar arasında sırayla (round-robin)
+karşılanır. 429 ve 5xx hataları rastgele gecikmeli üstel geri çekilmeyle yeniden denenir.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Yeniden denenecek HTTP durum kodları
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+_RETRYABLE_MARKERS = ("429", "500", "502", "503", "504", "quota", "rate limit",
+                      "resource exhausted", "unavailable", "deadline exceeded")
+
+
+class RateLimitTimeout(Exception):
+    """Bütçe, verilen süre içinde açılmadığında fırlatılır."""
+
+
+class RateLimiter:
+    """
+    İki kovalı (istek/dakika ve token/dakika) token bucket sınırlayıcı.
+
+    Bekleyen istekler oturum başına kuyruklanır; her seferinde sıradaki oturumun
+    en eski isteği karşılanır ve o oturum sıranın sonuna alınır.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, clock=time.monotonic):
+        """
+        Args:
+            requests_per_minute: Dakikada en fazla istek sayısı
+            tokens_per_minute: Dakikada en fazla token sayısı (0 = sınırsız)
+            clock: Zaman kaynağı (saniye)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._request_level = float(requests_per_minute)
+        self._token_level = float(tokens_per_minute)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._queues = OrderedDict()  # oturum -> bekleyen biletler
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self._request_level = min(
+            self.requests_per_minute, self._request_level + elapsed * self.requests_per_minute / 60
+        )
+        if self.tokens_per_minute:
+            self._token_level = min(
+                self.tokens_per_minute, self._token_level + elapsed * self.tokens_per_minute / 60
+            )
+
+    def _wait_time(self, now, tokens):
+        # Bütçe yetiyorsa 0, yetmiyorsa açılmasına kalan süre
+        wait = max(0.0, self._blocked_until - now)
+        if self._request_level < 1:
+            wait = max(wait, (1 - self._request_level) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute and self._token_level < tokens:
+            wait = max(wait, (tokens - self._token_level) * 60 / self.tokens_per_minute)
+        return wait
+
+    def _is_next(self, session_id, ticket):
+        first_session = next(iter(self._queues))
+        return first_session == session_id and self._queues[session_id][0] is ticket
+
+    def _dequeue(self, session_id, ticket, served):
+        queue = self._queues[session_id]
+        queue.remove(ticket)
+        if not queue:
+            del self._queues[session_id]
+        elif served:
+            self._queues.move_to_end(session_id)
+        self._cond.notify_all()
+
+    def acquire(self, tokens=0, session_id=None, timeout=None):
+        """
+        Bir istek ve verilen token kadar bütçe ayırır; gerekirse bekler.
+
+        Args:
+            tokens: İstek için tahmini token sayısı
+            session_id: Adil sıralama için oturum kimliği
+            timeout: En fazla bekleme süresi (None = sınırsız)
+
+        Returns:
+            float: Beklenen süre (saniye)
+
+        Raises:
+            RateLimitTimeout: Süre içinde bütçe açılmazsa
+        """
+        if self.tokens_per_minute:
+            # Tek istekte kova kapasitesinden fazlası istenirse sonsuza kadar beklenmesin
+            tokens = min(tokens, self.tokens_per_minute)
+        ticket = object()
+        started = self._clock()
+        deadline = None if timeout is None else started + timeout
+
+        with self._cond:
+            self._queues.setdefault(session_id, deque()).append(ticket)
+            try:
+                while True:
+                    now = self._clock()
+                    wait = None
+                    if self._is_next(session_id, ticket):
+                        self._refill(now)
+                        wait = self._wait_time(now, tokens)
+                        if wait <= 0:
+                            self._request_level -= 1
+                            self._token_level -= tokens
+                            self._dequeue(session_id, ticket, served=True)
+                            return now - started
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise RateLimitTimeout("Hız sınırı bütçesi zamanında açılmadı")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in self._queues.get(session_id, ()):
+                    self._dequeue(session_id, ticket, served=False)
+                raise
+
+    def adjust(self, token_delta):
+        """
+        Gerçek token kullanımı tahminden farklıysa bütçeyi düzeltir.
+
+        Args:
+            token_delta: Gerçek - tahmini token (pozitif ise bütçeden düşülür)
+        """
+        if not self.tokens_per_minute or not token_delta:
+            return
+        with self._cond:
+            self._refill(self._clock())
+            self._token_level -= token_delta
+            self._cond.notify_all()
+
+    def block_for(self, seconds):
+        """
+        Tüm oturumları verilen süre boyunca bekletir (ör. 429 sonrası).
+
+        Args:
+            seconds: Bekleme süresi
+        """
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+            self._cond.notify_all()
+
+    def stats(self):
+        """
+        Anlık bütçe ve kuyruk durumunu döndürür.
+
+        Returns:
+            dict: requests_available, tokens_available, waiting
+        """
+        with self._cond:
+            self._refill(self._clock())
+            return {
+                "requests_available": self._request_level,
+                "tokens_available": self._token_level if self.tokens_per_minute else None,
+                "waiting": sum(len(q) for q in self._queues.values()),
+            }
+
+
+def is_retryable_error(error):
+    """
+    Hatanın 429 veya 5xx kaynaklı olup olmadığını belirler.
+
+    Args:
+        error: Yakalanan hata
+
+    Returns:
+        bool: Yeniden denenebilirse True
+    """
+    # google.api_core hataları HTTP durum kodunu "code" alanında taşır
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS_CODES
+    message = str(error).lower()
+    return any(marker in message for marker in _RETRYABLE_MARKERS)
+
+
+def _is_quota_error(error):
+    message = str(error).lower()
+    return getattr(error, "code", None) == 429 or "429" in message or "quota" in message
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=30.0):
+    """
+    "Full jitter" üstel geri çekilme süresi hesaplar.
+
+    Args:
+        attempt: 0'dan başlayan deneme numarası
+        base_delay: İlk denemenin üst sınırı (saniye)
+        max_delay: En fazla bekleme (saniye)
+
+    Returns:
+        float: Bekleme süresi
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def call_with_retry(fn, limiter=None, tokens=0, session_id=None, max_retries=3,
+                    base_delay=1.0, max_delay=30.0, sleep=time.sleep, timeout=None):
+    """
+    fn'i hız sınırlayıcıdan izin alarak çağırır; 429/5xx hatalarında yeniden dener.
+
+    Args:
+        fn: Argümansız çağrılacak fonksiyon
+        limiter: RateLimiter (None ise sınırlama yapılmaz)
+        tokens: Her deneme için ayrılacak tahmini token
+        session_id: Adil sıralama için oturum kimliği
+        max_retries: En fazla yeniden deneme sayısı
+        base_delay: Geri çekilme taban süresi
+        max_delay: Geri çekilme üst sınırı
+        sleep: Bekleme fonksiyonu
+        timeout: Her denemede sınırlayıcıda en fazla bekleme (None = sınırsız)
+
+    Returns:
+        tuple: (fn sonucu, toplam sınırlayıcı bekleme süresi)
+
+    Raises:
+        RateLimitTimeout: Bütçe timeout içinde açılmazsa
+    """
+    waited = 0.0
+    attempt = 0
+    while True:
+        if limiter:
+            waited += limiter.acquire(tokens, session_id=session_id, timeout=timeout)
+        try:
+            return fn(), waited
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable_error(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            if limiter and _is_quota_error(e):
+                # Kota aşıldıysa tüm oturumlar birlikte geri çekilsin; bekleme bir
+                # sonraki acquire içinde gerçekleşir
+                limiter.block_for(delay)
+            else:
+                sleep(delay)
+                waited += delay
+            attempt += 1
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def _env_number(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return float(default)
+
+
+def get_rate_limiter():
+    """
+    Ortam değişkenlerine göre yapılandırılmış süreç geneli sınırlayıcıyı döndürür.
+
+    GEMINI_RPM (varsayılan 15) ve GEMINI_TPM (varsayılan 1000000, 0 = sınırsız) kullanılır.
+
+    Returns:
+        RateLimiter: Paylaşılan sınırlayıcı
+    """
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            rpm = max(1.0, _env_number("GEMINI_RPM", "15"))
+            tpm = max(0.0, _env_number("GEMINI_TPM", "1000000"))
+            _default_limiter = RateLimiter(rpm, tpm)
+        return _default_limiter
+
+
+def max_retries_setting():
+    """
+    GEMINI_MAX_RETRIES ortam değişkenini okur (varsayılan 3).
+
+    Returns:
+        int: En fazla yeniden deneme sayısı
+    """
+    return max(0, int(_env_number("GEMINI_MAX_RETRIES", "3")))
+
+
+__all__ = [
+    "RateLimitTimeout",
+    "RateLimiter",
+    "is_retryable_error",
+    "backoff_delay",
+    "call_with_retry",
+    "get_rate_limiter",
+    "max_retries_setting",
+]
@@ -0,0 +1,636 @@
+"""
+Belge parçaları üzerinde arama için yardımcılar.
+Türkçe/İngilizce uyumlu metin normalizasyonu, BM25 puanlamalı ters indeks ve
+çevrimdışı çalışan, karakter n-gram tabanlı vektör araması içerir.
+"""
+
+import array
+import bisect
+import functools
+import heapq
+import io
+import itertools
+import math
+import os
+import re
+import tempfile
+import unicodedata
+import zlib
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+# Türkçe büyük/küçük harf dönüşümü "I" -> "ı", "İ" -> "i" şeklindedir; İngilizcede ise
+# "I" -> "i". Karışık dilli belgelerde eşleşmeyi kaçırmamak için hepsini "i"ye indiriyoruz.
+_TURKISH_I_MAP = str.maketrans({"İ": "i", "I": "i", "ı": "i"})
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_COMBINING_RE = re.compile(r"[\u0300-\u036f]")
+
+# İndeks yapısı veya normalizasyon değiştiğinde artırılır
+INDEX_VERSION = 3
+
+# BM25 varsayılan parametreleri
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Vektör araması: özetlenmiş (hashed) boyut ve karakter n-gram uzunlukları
+VECTOR_DIM = 2048
+NGRAM_SIZES = (3, 4)
+
+# Vektör/karma modlarında bu benzerliğin altındaki parçalar bağlam olarak gönderilmez
+MIN_VECTOR_SCORE = 0.05
+
+# Karma (hybrid) modda vektör skorunun ağırlığı; kalanı BM25'e aittir
+HYBRID_ALPHA = 0.5
+
+RETRIEVAL_MODES = ("bm25", "vector", "hybrid")
+
+
+def bm25_idf(doc_freq, doc_count):
+    """
+    BM25+ tarzı pozitif IDF: çok yaygın terimler negatif skor üretmesin.
+
+    Args:
+        doc_freq: Terimi içeren parça sayısı
+        doc_count: Toplam parça sayısı
+
+    Returns:
+        float: IDF değeri
+    """
+    return math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def normalize_text(text):
+    """
+    Metni arama için normalize eder (küçük harf, İ/ı eşleme, aksan temizleme).
+
+    Args:
+        text: Normalize edilecek metin
+
+    Returns:
+        str: Normalize edilmiş metin
+    """
+    text = text.translate(_TURKISH_I_MAP).casefold()
+    if text.isascii():
+        return text
+    # ş -> s, ğ -> g, ü -> u gibi: Türkçe klavyesi olmayan kullanıcıların sorularıyla da eşleşsin
+    return _COMBINING_RE.sub("", unicodedata.normalize("NFKD", text))
+
+
+def tokenize(text):
+    """
+    Metni noktalama işaretlerinden arındırılmış terimlere ayırır.
+
+    Args:
+        text: Bölünecek metin
+
+    Returns:
+        list: Normalize edilmiş terimler
+    """
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+class BM25Index:
+    """
+    Metin parçaları için ters indeks (inverted index) ve BM25 puanlaması.
+
+    İndeks belge işlenirken bir kez kurulur; sorgu maliyeti yalnızca sorgu
+    terimlerinin posting listelerinin uzunluğuna bağlıdır.
+    """
+
+    def __init__(self, chunks, k1=BM25_K1, b=BM25_B):
+        """
+        Args:
+            chunks: Metin parçaları ya da tokenize ile ayrılmış terim listeleri
+            k1: Terim frekansı doygunluk parametresi
+            b: Uzunluk normalizasyonu parametresi
+        """
+        self.k1 = k1
+        self.b = b
+        self.doc_count = 0
+        self.doc_lengths = []
+        # terim -> array("l", [parça_no, terim_frekansı, parça_no, terim_frekansı, ...]);
+        # demet listesine göre kayıt başına ~8 bayt
+        self.postings = {}
+        self.idf = {}
+
+        for chunk in chunks:
+            self._add(chunk)
+        self._finalize()
+
+    def _add(self, chunk):
+        doc_id = self.doc_count
+        terms = tokenize(chunk) if isinstance(chunk, str) else chunk
+        self.doc_lengths.append(len(terms))
+        for term, tf in Counter(terms).items():
+            plist = self.postings.get(term)
+            if plist is None:
+                plist = self.postings[term] = array.array("l")
+            plist.append(doc_id)
+            plist.append(tf)
+        self.doc_count += 1
+
+    def _finalize(self):
+        total = sum(self.doc_lengths)
+        self.avg_doc_length = total / self.doc_count if self.doc_count else 0.0
+        self.idf = {term: bm25_idf(len(plist) // 2, self.doc_count) for term, plist in self.postings.items()}
+        # Uzunluk normalizasyonu sorgu başına tekrar hesaplanmasın
+        avgdl = self.avg_doc_length or 1.0
+        self._length_norm = [
+            self.k1 * (1 - self.b + self.b * length / avgdl)
+            for length in self.doc_lengths
+        ]
+
+    def __len__(self):
+        return self.doc_count
+
+    def doc_freq(self, term):
+        """
+        Args:
+            term: Normalize edilmiş terim
+
+        Returns:
+            int: Terimi içeren parça sayısı
+        """
+        return len(self.postings.get(term, ())) // 2
+
+    def score(self, query, idf=None, chunk_ids=None):
+        """
+        Sorgu terimlerini içeren parçaların BM25 skorlarını hesaplar.
+
+        Args:
+            query: Kullanıcı sorusu
+            idf: Terim -> IDF eşlemesi; parçalı (sharded) aramada tüm külliyat
+                üzerinden hesaplanan değerler verilir (None ise bu indeksinki)
+            chunk_ids: Yalnızca bu parçaları skorla (None ise hepsi)
+
+        Returns:
+            dict: parça_no -> skor (yalnızca en az bir terimi içeren parçalar)
+        """
+        scores = {}
+        k1 = self.k1
+        length_norm = self._length_norm
+        idf_map = self.idf if idf is None else idf
+        ranges = None if chunk_ids is None else _id_ranges(chunk_ids)
+        for term in set(tokenize(query)):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = idf_map[term]
+            if ranges is None:
+                for doc_id, tf in zip(plist[::2], plist[1::2]):
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + length_norm[doc_id])
+                continue
+            # Posting listesi parça numarasına göre sıralıdır; her aralığın
+            # başı ve sonu ikili arama ile bulunur, aralık dışı kayıtlar gezilmez
+            doc_ids = memoryview(plist)[::2]
+            for lo, hi in ranges:
+                start = bisect.bisect_left(doc_ids, lo)
+                stop = bisect.bisect_left(doc_ids, hi, start)
+                for pos in range(start, stop):
+                    doc_id = doc_ids[pos]
+                    tf = plist[2 * pos + 1]
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + length_norm[doc_id])
+        return scores
+
+    def search(self, query, top_k=2, chunk_ids=None):
+        """
+        En yüksek BM25 skoruna sahip parçaları döndürür.
+
+        Args:
+            query: Kullanıcı sorusu
+            top_k: Kaç parça döndürülecek
+            chunk_ids: Yalnızca bu parçalarda ara (None ise hepsi)
+
+        Returns:
+            list: (parça_no, skor) çiftleri, skora göre azalan sırada
+        """
+        scores = self.score(query, chunk_ids=chunk_ids)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+def _id_ranges(chunk_ids):
+    # Sıralı parça numaralarını ardışık [başlangıç, bitiş) aralıklarına böler;
+    # bölüm filtreleri genellikle birkaç bitişik aralıktan oluşur
+    ids = np.asarray(chunk_ids, dtype=np.int64)
+    if not len(ids):
+        return []
+    breaks = np.flatnonzero(np.diff(ids) != 1) + 1
+    starts = ids[np.concatenate(([0], breaks))]
+    ends = ids[np.concatenate((breaks - 1, [len(ids) - 1]))] + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+@functools.lru_cache(maxsize=8192)
+def _word_features(word):
+    # Kelimenin kendisi ve kelime sınırlı karakter n-gramları; ortak kökler ve
+    # çekimler (ör. "sözleşme"/"sözleşmenin") ortak n-gramlar üzerinden eşleşir.
+    padded = f" {word} "
+    grams = [word] + [padded[i:i + n] for n in NGRAM_SIZES for i in range(len(padded) - n + 1)]
+    # crc32 süreçten bağımsızdır; önbellekte yalnızca özetler (int demeti) tutulur,
+    # sütun ve işaret dizileri her çağrıda bunlardan üretilir
+    return tuple(zlib.crc32(g.encode("utf-8")) for g in grams)
+
+
+def _hashed_vector(text):
+    # İşaretli özetleme (signed hashing) ile terim frekansı vektörü, log ile sönümlenmiş
+    counts = Counter(tokenize(text) if isinstance(text, str) else text)
+    if not counts:
+        return np.zeros(VECTOR_DIM, dtype=np.float32)
+    features = [_word_features(word) for word in counts]
+    hashes = np.fromiter(itertools.chain.from_iterable(features), dtype=np.uint32)
+    cols = (hashes % VECTOR_DIM).astype(np.intp)
+    signs = np.where(hashes & 0x80000000, 1.0, -1.0)
+    lengths = [len(f) for f in features]
+    weights = signs * np.repeat(list(counts.values()), lengths)
+    row = np.bincount(cols, weights=weights, minlength=VECTOR_DIM)
+    return (np.sign(row) * np.log1p(np.abs(row))).astype(np.float32)
+
+
+class VectorIndex:
+    """
+    Parçaların özetlenmiş TF-IDF vektörlerinden oluşan normalize NumPy matrisi.
+
+    Sorgu skoru tek bir matris-vektör çarpımı ve argpartition ile bulunur;
+    ağ ya da GPU gerektirmez.
+    """
+
+    def __init__(self, chunks):
+        """
+        Args:
+            chunks: Metin parçaları ya da tokenize ile ayrılmış terim listeleri
+        """
+        matrix = np.zeros((len(chunks), VECTOR_DIM), dtype=np.float32)
+        for i, chunk in enumerate(chunks):
+            matrix[i] = _hashed_vector(chunk)
+        self._finalize(matrix, np.count_nonzero(matrix, axis=0))
+
+    @classmethod
+    def from_matrix(cls, matrix, doc_freq):
+        """
+        Ham terim vektörlerinden (ör. diskteki np.memmap) indeks kurar.
+
+        Args:
+            matrix: (parça_sayısı, VECTOR_DIM) float32 dizi; yerinde normalize edilir
+            doc_freq: Sütun başına sıfır olmayan satır sayısı
+
+        Returns:
+            VectorIndex: İndeks
+        """
+        index = cls.__new__(cls)
+        index._finalize(matrix, doc_freq)
+        return index
+
+    def _finalize(self, matrix, doc_freq, batch_rows=4096):
+        self.idf = (np.log((1 + len(matrix)) / (1 + doc_freq)) + 1).astype(np.float32)
+        # Yerinde ve satır blokları halinde: diskteki matris belleğe kopyalanmaz
+        for start in range(0, len(matrix), batch_rows):
+            block = matrix[start:start + batch_rows]
+            block *= self.idf
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            block /= norms
+        self.matrix = matrix
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def query_vector(self, query):
+        """
+        Sorguyu parça matrisiyle aynı uzaya taşır.
+
+        Args:
+            query: Kullanıcı sorusu
+
+        Returns:
+            numpy.ndarray: Normalize sorgu vektörü
+        """
+        vector = _hashed_vector(query) * self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def score(self, query, chunk_ids=None):
+        """
+        Parçaların kosinüs benzerliğini hesaplar.
+
+        Args:
+            query: Kullanıcı sorusu
+            chunk_ids: Yalnızca bu parçaların satırlarını çarp (None ise hepsi)
+
+        Returns:
+            numpy.ndarray: Parça başına skor (chunk_ids verilirse onun sırasıyla)
+        """
+        if chunk_ids is not None:
+            return self.matrix[chunk_ids] @ self.query_vector(query)
+        return self.matrix @ self.query_vector(query)
+
+    def search(self, query, top_k=2):
+        """
+        En benzer parçaları döndürür.
+
+        Args:
+            query: Kullanıcı sorusu
+            top_k: Kaç parça döndürülecek
+
+        Returns:
+            list: (parça_no, skor) çiftleri, skora göre azalan sırada
+        """
+        return top_k_scores(self.score(query), top_k)
+
+
+def top_k_scores(scores, top_k, min_score=None, chunk_ids=None):
+    """
+    Skor dizisindeki en yüksek top_k değeri argpartition ile seçer.
+
+    Args:
+        scores: Parça başına skor dizisi
+        top_k: Kaç parça döndürülecek
+        min_score: Bu değerin altındaki skorlar elenir
+        chunk_ids: scores bu parçaların skorlarıysa konumları parça numarasına çevirir
+
+    Returns:
+        list: (parça_no, skor) çiftleri, skora göre azalan sırada
+    """
+    if len(scores) == 0 or top_k <= 0:
+        return []
+    if top_k < len(scores):
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        candidates = np.arange(len(scores))
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [
+        (int(i if chunk_ids is None else chunk_ids[i]), float(scores[i]))
+        for i in candidates
+        if min_score is None or scores[i] >= min_score
+    ]
+
+
+class DocumentIndex:
+    """
+    Bir belgenin BM25 ve vektör indekslerini birlikte tutar ve arama moduna göre sorgular.
+    """
+
+    def __init__(self, chunks):
+        """
+        Args:
+            chunks: Metin parçaları listesi
+        """
+        # Parçalar bir kez tokenize edilir, iki indeks de aynı terimleri kullanır
+        terms = [tokenize(chunk) for chunk in chunks]
+        self.bm25 = BM25Index(terms)
+        self.vectors = VectorIndex(terms)
+
+    @classmethod
+    def from_parts(cls, bm25, vectors):
+        """
+        Args:
+            bm25: BM25Index
+            vectors: VectorIndex
+
+        Returns:
+            DocumentIndex: İndeks
+        """
+        index = cls.__new__(cls)
+        index.bm25 = bm25
+        index.vectors = vectors
+        return index
+
+    def __len__(self):
+        return len(self.bm25)
+
+    def search(self, query, top_k=2, mode="bm25", chunk_ids=None):
+        """
+        Seçilen moda göre en alakalı parçaları döndürür.
+
+        Args:
+            query: Kullanıcı sorusu
+            top_k: Kaç parça döndürülecek
+            mode: "bm25", "vector" veya "hybrid"
+            chunk_ids: Yalnızca bu parçalarda ara (sıralı parça numaraları; None ise hepsi)
+
+        Returns:
+            list: (parça_no, skor) çiftleri, skora göre azalan sırada
+        """
+        if mode == "vector":
+            return top_k_scores(self.vectors.score(query, chunk_ids), top_k, MIN_VECTOR_SCORE, chunk_ids)
+        if mode == "hybrid":
+            bm25_scores = self.bm25.score(query, chunk_ids=chunk_ids)
+            best = max(bm25_scores.values()) if bm25_scores else 0.0
+            fused = fuse_scores(self.vectors.score(query, chunk_ids), bm25_scores, best, chunk_ids)
+            return top_k_scores(fused, top_k, MIN_VECTOR_SCORE * HYBRID_ALPHA, chunk_ids)
+        return self.bm25.search(query, top_k=top_k, chunk_ids=chunk_ids)
+
+
+class IndexBuilder:
+    """
+    DocumentIndex'i parçaları tek tek alarak kurar.
+
+    Vektör satırları geçici bir dosyaya yazılır ve sonunda bellek eşlemeli
+    (np.memmap) matris olarak açılır; parça sayısı ne olursa olsun vektörler
+    süreç belleğinde birikmez. in_memory ile satırlar bir bayt tamponunda
+    toplanır ve matris kopyalanmadan bu tampondan kurulur.
+    """
+
+    def __init__(self, directory=None, in_memory=False):
+        """
+        Args:
+            directory: Vektör dosyasının dizini (None ise sistem geçici dizini)
+            in_memory: True ise vektörler dosya yerine süreç belleğinde tutulur
+        """
+        self._bm25 = BM25Index([])
+        self._doc_freq = np.zeros(VECTOR_DIM, dtype=np.int64)
+        self._rows = io.BytesIO() if in_memory else tempfile.TemporaryFile(dir=directory)
+
+    def add(self, text):
+        """
+        Args:
+            text: Parça metni
+        """
+        terms = tokenize(text)
+        self._bm25._add(terms)
+        row = _hashed_vector(terms)
+        self._doc_freq += row != 0
+        self._rows.write(row.tobytes())
+
+    def finish(self):
+        """
+        Returns:
+            DocumentIndex: Kullanıma hazır indeks
+        """
+        self._bm25._finalize()
+        count = self._bm25.doc_count
+        if count and isinstance(self._rows, io.BytesIO):
+            matrix = np.frombuffer(self._rows.getbuffer(), dtype=np.float32).reshape(count, VECTOR_DIM)
+        elif count:
+            self._rows.flush()
+            matrix = np.memmap(self._rows, dtype=np.float32, mode="r+", shape=(count, VECTOR_DIM))
+        else:
+            matrix = np.zeros((0, VECTOR_DIM), dtype=np.float32)
+        return DocumentIndex.from_parts(self._bm25, VectorIndex.from_matrix(matrix, self._doc_freq))
+
+
+def fuse_scores(vector_scores, bm25_scores, bm25_best, chunk_ids=None):
+    """
+    Vektör ve BM25 skorlarını karma (hybrid) skora çevirir.
+
+    Args:
+        vector_scores: Parça başına kosinüs benzerliği dizisi
+        bm25_scores: parça_no -> BM25 skoru
+        bm25_best: BM25 skorlarının bölüneceği en yüksek değer
+        chunk_ids: vector_scores bu parçaların skorlarıysa sıralı parça numaraları
+
+    Returns:
+        numpy.ndarray: Parça başına karma skor
+    """
+    fused = vector_scores * HYBRID_ALPHA
+    if bm25_scores and bm25_best > 0:
+        # BM25 skorları en yüksek skora bölünerek [0, 1] aralığına çekilir
+        doc_ids = np.fromiter(bm25_scores.keys(), dtype=np.int64, count=len(bm25_scores))
+        if chunk_ids is not None:
+            doc_ids = np.searchsorted(chunk_ids, doc_ids)
+        values = np.fromiter(bm25_scores.values(), dtype=np.float32, count=len(bm25_scores))
+        fused[doc_ids] += (1 - HYBRID_ALPHA) * values / bm25_best
+    return fused
+
+
+class ShardedIndex:
+    """
+    Belge başına bir DocumentIndex parçası (shard) tutan külliyat indeksi.
+
+    Belge eklemek/çıkarmak yalnızca o belgenin parçasını etkiler. Sorgu seçili
+    parçalara dağıtılır, her parçanın en iyi top_k sonucu tek bir listede
+    birleştirilir. BM25 IDF'i sorgu anında seçili parçaların terim
+    frekanslarından hesaplandığı için skorlar belgeler arasında karşılaştırılabilir.
+    """
+
+    def __init__(self):
+        self.shards = OrderedDict()  # belge_kimliği -> DocumentIndex
+
+    def add(self, doc_id, index):
+        """
+        Args:
+            doc_id: Belge kimliği (aynı kimlik varsa parçası değiştirilir)
+            index: Belgenin DocumentIndex'i
+        """
+        self.shards[doc_id] = index
+
+    def remove(self, doc_id):
+        """
+        Args:
+            doc_id: Kaldırılacak belge kimliği
+        """
+        self.shards.pop(doc_id, None)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.shards
+
+    def __len__(self):
+        return sum(len(index) for index in self.shards.values())
+
+    def _global_idf(self, shards, query):
+        doc_count = sum(len(index) for index in shards.values())
+        idf = {}
+        for term in set(tokenize(query)):
+            doc_freq = sum(index.bm25.doc_freq(term) for index in shards.values())
+            if doc_freq:
+                idf[term] = bm25_idf(doc_freq, doc_count)
+        return idf
+
+    def search(self, query, top_k=2, mode="bm25", doc_ids=None, chunk_ids=None):
+        """
+        Seçili belgelerde arar ve sonuçları tek sıralamada birleştirir.
+
+        Args:
+            query: Kullanıcı sorusu
+            top_k: Toplamda kaç parça döndürülecek
+            mode: "bm25", "vector" veya "hybrid"
+            doc_ids: Aranacak belge kimlikleri (None ise hepsi)
+            chunk_ids: belge_kimliği -> yalnızca skorlanacak sıralı parça numaraları
+                (listede olmayan belgelerde tüm parçalar skorlanır)
+
+        Returns:
+            list: (belge_kimliği, parça_no, skor) üçlüleri, skora göre azalan sırada
+        """
+        shards = self.shards if doc_ids is None else OrderedDict(
+            (doc_id, self.shards[doc_id]) for doc_id in doc_ids if doc_id in self.shards
+        )
+        if not shards or top_k <= 0:
+            return []
+
+        subsets = chunk_ids or {}
+        bm25_scores = {}
+        if mode in ("bm25", "hybrid"):
+            # IDF bütün belge üzerinden kalır; budama yalnızca skorlanan parçaları azaltır
+            idf = self._global_idf(shards, query)
+            bm25_scores = {
+                doc_id: index.bm25.score(query, idf=idf, chunk_ids=subsets.get(doc_id))
+                for doc_id, index in shards.items()
+            }
+
+        if mode == "bm25":
+            candidates = (
+                (doc_id, chunk_no, score)
+                for doc_id, scores in bm25_scores.items()
+                for chunk_no, score in scores.items()
+            )
+        else:
+            # Normalizasyon için en yüksek BM25 skoru tüm parçalar üzerinden alınır
+            best = max((max(scores.values()) for scores in bm25_scores.values() if scores), default=0.0)
+            candidates = []
+            for doc_id, index in shards.items():
+                subset = subsets.get(doc_id)
+                scores = index.vectors.score(query, subset)
+                min_score = MIN_VECTOR_SCORE
+                if mode == "hybrid":
+                    scores = fuse_scores(scores, bm25_scores[doc_id], best, subset)
+                    min_score = MIN_VECTOR_SCORE * HYBRID_ALPHA
+                candidates.extend(
+                    (doc_id, chunk_no, score)
+                    for chunk_no, score in top_k_scores(scores, top_k, min_score, subset)
+                )
+
+        # Eşit skorlarda belge sırası ve parça numarası belirleyicidir
+        order = {doc_id: i for i, doc_id in enumerate(shards)}
+        return heapq.nlargest(top_k, candidates, key=lambda item: (item[2], -order[item[0]], -item[1]))
+
+
+def default_retrieval_mode():
+    """
+    Ortam değişkeninden varsayılan arama modunu okur.
+
+    Returns:
+        str: "bm25", "vector" veya "hybrid"
+    """
+    mode = os.getenv("RETRIEVAL_MODE", "bm25").strip().lower()
+    return mode if mode in RETRIEVAL_MODES else "bm25"
+
+
+def build_index(chunks):
+    """
+    Metin parçaları için BM25 ve vektör indekslerini oluşturur.
+
+    Args:
+        chunks: Metin parçaları listesi
+
+    Returns:
+        DocumentIndex: Kullanıma hazır indeks
+    """
+    return DocumentIndex(chunks)
+
+
+__all__ = [
+    "INDEX_VERSION",
+    "RETRIEVAL_MODES",
+    "normalize_text",
+    "tokenize",
+    "BM25Index",
+    "VectorIndex",
+    "DocumentIndex",
+    "ShardedIndex",
+    "IndexBuilder",
+    "bm25_idf",
+    "fuse_scores",
+    "top_k_scores",
+    "default_retrieval_mode",
+    "build_index",
+]
@@ -0,0 +1,261 @@
+"""
+Belgenin bölüm (section) ağacı ve bölüm başlıklarıyla arama budaması.
+Bölümler PDF'in içindekiler (outline/bookmark) girdilerinden, yoksa sayfa
+metnindeki başlık satırlarından çıkarılır; her bölüm kapsadığı parça aralığına
+eşlenir. Soru önce bölüm başlıklarıyla eşleştirilir ve yalnızca en iyi
+bölümlerin parçaları skorlanır; kullanıcı aramayı belirli bölümlerle de sınırlayabilir.
+"""
+
+import bisect
+import heapq
+import os
+import re
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from retrieval import BM25Index, tokenize
+
+# Bölüm: başlık, düzey (1 = en üst), sayfa aralığı ve [chunk_start, chunk_end) parça aralığı
+Section = namedtuple("Section", ["title", "level", "page_start", "page_end", "chunk_start", "chunk_end"])
+
+# Başlık sayılacak satırların sınırları
+MAX_HEADING_CHARS = 80
+MAX_HEADING_WORDS = 12
+MAX_HEADINGS_PER_PAGE = 4
+
+# Bu kadardan fazla sayfada tekrarlanan satırlar başlık değil, sayfa üst/alt bilgisidir
+MAX_HEADING_REPEATS = 2
+
+# Soru başına seçilecek en fazla bölüm ve en iyi skora göre alt sınır
+SECTION_CANDIDATES = 3
+SECTION_MATCH_RATIO = 0.5
+
+# Başlık eşleştirmesinde yok sayılan sık kelimeler (normalize edilmiş)
+STOPWORDS = frozenset(
+    "ve veya ile bir bu su icin gibi da de mi ne nedir nasil neden hangi kac "
+    "the and or of to in on for a an is are what how why which with by about".split()
+)
+
+_NUMBERED_RE = re.compile(r"^(\d{1,2}(?:\.\d{1,2}){0,3})\.?\s+(\S.*)$")
+_KEYWORD_RE = re.compile(
+    r"^(?:bölüm|bolum|kısım|kisim|ek|chapter|part|section|appendix)\s+[\w.]+", re.IGNORECASE
+)
+
+
+def _heading_level(line):
+    # Başlık satırıysa düzeyini, değilse None döndürür
+    if len(line) > MAX_HEADING_CHARS or len(line.split()) > MAX_HEADING_WORDS:
+        return None
+    if line[-1] in ".,;:" or line.startswith("---"):
+        return None
+    match = _NUMBERED_RE.match(line)
+    if match:
+        # "1.2 Ödeme Koşulları" -> düzey 2; numaralı madde listeleri büyük harfle başlamaz
+        return match.group(1).count(".") + 1 if match.group(2)[0].isupper() else None
+    if _KEYWORD_RE.match(line):
+        return 1
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) >= 4 and line.isupper():
+        return 1
+    return None
+
+
+def page_headings(page_num, page_text):
+    """
+    Sayfa metnindeki başlık satırlarını bulur.
+
+    Args:
+        page_num: 1'den başlayan sayfa numarası
+        page_text: Sayfa metni (ya da "--- Sayfa N ---" başlıklı sayfa bloğu)
+
+    Returns:
+        list: (başlık, düzey, sayfa_no) üçlüleri
+    """
+    headings = []
+    for line in page_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        level = _heading_level(line)
+        if level is not None:
+            headings.append((line, level, page_num))
+            if len(headings) == MAX_HEADINGS_PER_PAGE:
+                break
+    return headings
+
+
+def drop_repeated(headings):
+    """
+    Sayfa üst/alt bilgisi gibi çok sayfada tekrarlanan başlıkları atar.
+
+    Args:
+        headings: (başlık, düzey, sayfa_no) üçlüleri
+
+    Returns:
+        list: Kalan başlıklar
+    """
+    counts = Counter(title for title, _, _ in headings)
+    return [heading for heading in headings if counts[heading[0]] <= MAX_HEADING_REPEATS]
+
+
+def detect_headings(blocks):
+    """
+    Outline'ı olmayan belgeler için başlıkları sayfa metinlerinden çıkarır.
+
+    Args:
+        blocks: (sayfa_no, sayfa_metni) demetleri
+
+    Returns:
+        list: (başlık, düzey, sayfa_no) üçlüleri
+    """
+    headings = []
+    for page_num, block in blocks:
+        headings.extend(page_headings(page_num, block))
+    return drop_repeated(headings)
+
+
+def build_sections(entries, chunk_pages, page_count):
+    """
+    Başlık girdilerinden bölüm listesi kurar ve bölümleri parça aralıklarına eşler.
+
+    Bir bölüm, aynı veya daha üst düzeydeki bir sonraki başlığa kadar sürer
+    (alt bölümler üst bölümün aralığına dahildir). Başlıklar sayfa ortasında
+    da olabildiği için sonraki başlığın sayfası iki bölüme de dahil edilir.
+
+    Args:
+        entries: (başlık, düzey, sayfa_no) üçlüleri
+        chunk_pages: Parça başına (page_start, page_end), parça sırasıyla
+        page_count: Belgenin sayfa sayısı
+
+    Returns:
+        list: Section listesi, sayfa sırasıyla (parçası olmayan bölümler atlanır)
+    """
+    entries = sorted(entries, key=lambda entry: entry[2])
+    starts = [page_start for page_start, _ in chunk_pages]
+    ends = [page_end for _, page_end in chunk_pages]
+    sections = []
+    for i, (title, level, page) in enumerate(entries):
+        page_end = page_count
+        for _, next_level, next_page in entries[i + 1:]:
+            if next_level <= level:
+                page_end = max(page, next_page)
+                break
+        chunk_start = bisect.bisect_left(ends, page)
+        chunk_end = bisect.bisect_right(starts, page_end)
+        if chunk_start < chunk_end:
+            sections.append(Section(title, level, page, page_end, chunk_start, chunk_end))
+    return sections
+
+
+class SectionIndex:
+    """
+    Bir belgenin bölümleri ve bölüm başlıkları üzerinde BM25 araması.
+    """
+
+    def __init__(self, sections):
+        """
+        Args:
+            sections: build_sections sonucu Section listesi
+        """
+        self.sections = list(sections)
+        self._titles = BM25Index([
+            [term for term in tokenize(section.title) if term not in STOPWORDS and not term.isdigit()]
+            for section in self.sections
+        ])
+
+    def __len__(self):
+        return len(self.sections)
+
+    def __getitem__(self, i):
+        return self.sections[i]
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def label(self, i):
+        """
+        Returns:
+            str: Girintili başlık ve başlangıç sayfası (ör. "  1.2 Ödeme (s. 4)")
+        """
+        section = self.sections[i]
+        return f"{'  ' * (section.level - 1)}{section.title} (s. {section.page_start})"
+
+    def match(self, query, top_k=SECTION_CANDIDATES):
+        """
+        Soruyla başlığı en iyi eşleşen bölümleri bulur.
+
+        Args:
+            query: Kullanıcı sorusu
+            top_k: En fazla bölüm
+
+        Returns:
+            list: Bölüm numaraları, skora göre azalan sırada (eşleşme yoksa boş)
+        """
+        scores = self._titles.score(query)
+        if not scores:
+            return []
+        floor = max(scores.values()) * SECTION_MATCH_RATIO
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [i for i, score in best if score >= floor]
+
+    def chunk_ids(self, numbers):
+        """
+        Args:
+            numbers: Bölüm numaraları
+
+        Returns:
+            numpy.ndarray: Bölümlerin kapsadığı parça numaraları (sıralı, tekrarsız)
+        """
+        ranges = [np.arange(self.sections[i].chunk_start, self.sections[i].chunk_end) for i in numbers]
+        if not ranges:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(ranges))
+
+    def prune(self, query):
+        """
+        Args:
+            query: Kullanıcı sorusu
+
+        Returns:
+            numpy.ndarray | None: Skorlanacak parça numaraları (başlık eşleşmesi yoksa None)
+        """
+        numbers = self.match(query)
+        return self.chunk_ids(numbers) if numbers else None
+
+
+def build_section_index(entries, chunk_pages, page_count):
+    """
+    Args:
+        entries: (başlık, düzey, sayfa_no) üçlüleri (outline veya detect_headings)
+        chunk_pages: Parça başına (page_start, page_end)
+        page_count: Sayfa sayısı
+
+    Returns:
+        SectionIndex | None: Bölüm indeksi (bölüm bulunamadıysa None)
+    """
+    sections = build_sections(entries, chunk_pages, page_count)
+    return SectionIndex(sections) if sections else None
+
+
+def section_pruning_enabled():
+    """
+    SECTION_PRUNING ortam değişkenini okur (varsayılan açık).
+
+    Returns:
+        bool: Arama, soruyla eşleşen bölümlerle sınırlansın mı
+    """
+    return os.getenv("SECTION_PRUNING", "1").strip().lower() not in ("0", "false", "no", "")
+
+
+__all__ = [
+    "Section",
+    "SECTION_CANDIDATES",
+    "page_headings",
+    "drop_repeated",
+    "detect_headings",
+    "build_sections",
+    "SectionIndex",
+    "build_section_index",
+    "section_pruning_enabled",
+]
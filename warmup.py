@@ -0,0 +1,150 @@
+"""
+Ağır modüllerin ertelenmiş yüklenmesi ve arka planda önceden ısıtılması.
+Gemini SDK'sı (gRPC/protobuf yığınıyla) ve PyPDF2 ilk sayfa açılışında yüklenmez;
+ilk PDF işlenirken veya ilk soru sorulurken yüklenirler. PREWARM_IMPORTS açıksa
+sunucu başlar başlamaz bir arka plan thread'inde yüklenerek ilk isteğin
+beklemesi önlenir. Yükleme süreleri kaydedilir ve komut satırından raporlanabilir.
+
+Örnek:
+    python warmup.py
+    python -X importtime -c "import qa" 2> importtime.log
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+
+# İlk sayfa açılışında yüklenmeyen, ilk kullanımda gereken modüller
+HEAVY_IMPORTS = ("PyPDF2", "google.generativeai")
+
+# Uygulamanın ilk sayfa açılışında yüklediği yerel modüller (rapor için)
+STARTUP_IMPORTS = (
+    "dotenv",
+    "i18n",
+    "retrieval",
+    "answer_cache",
+    "rate_limit",
+    "doc_cache",
+    "pdf_pipeline",
+    "metrics",
+    "sections",
+    "corpus",
+    "doc_registry",
+    "context_packer",
+    "chat_export",
+    "chat_store",
+    "model_pool",
+    "qa",
+)
+
+_import_seconds = {}
+_import_lock = threading.Lock()
+_recorded = set()
+_prewarm_started = False
+
+
+def timed_import(name):
+    """
+    Modülü yükler ve süresini ölçer.
+
+    Args:
+        name: Modül adı
+
+    Returns:
+        float | None: Yükleme süresi (saniye); modül zaten yüklüyse veya kurulu değilse None
+    """
+    if name in sys.modules:
+        return None
+    started = time.perf_counter()
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        return None
+    return time.perf_counter() - started
+
+
+def record_import(name, seconds, metrics=None):
+    """
+    Bir yükleme süresini rapora (ve verilirse Metrics'e) yazar; aynı ad bir kez kaydedilir.
+
+    Args:
+        name: Modül veya modül grubu adı
+        seconds: Yükleme süresi
+        metrics: "import_<ad>_seconds" olarak yazılacak Metrics
+    """
+    with _import_lock:
+        if name in _recorded:
+            return
+        _recorded.add(name)
+        _import_seconds[name] = seconds
+    if metrics is not None:
+        metrics.observe(f"import_{name.replace('.', '_')}_seconds", seconds)
+
+
+def import_report():
+    """
+    Returns:
+        dict: Modül (veya grup) adı -> ölçülen yükleme süresi (saniye)
+    """
+    with _import_lock:
+        return dict(_import_seconds)
+
+
+def prewarm_enabled():
+    """
+    PREWARM_IMPORTS ortam değişkenini okur (varsayılan açık).
+
+    Returns:
+        bool: Ağır modüller arka planda önceden yüklensin mi
+    """
+    return os.getenv("PREWARM_IMPORTS", "1").strip().lower() not in ("0", "false", "no", "")
+
+
+def prewarm_imports(modules=HEAVY_IMPORTS, metrics=None):
+    """
+    Ağır modülleri arka planda yükler; süreç başına yalnızca bir kez çalışır.
+
+    Args:
+        modules: Yüklenecek modül adları
+        metrics: Yükleme sürelerinin "import_<modül>_seconds" olarak yazılacağı Metrics
+
+    Returns:
+        threading.Thread | None: Isınma thread'i (zaten başlatılmışsa None)
+    """
+    global _prewarm_started
+    with _import_lock:
+        if _prewarm_started:
+            return None
+        _prewarm_started = True
+
+    def run():
+        for name in modules:
+            seconds = timed_import(name)
+            if seconds is not None:
+                record_import(name, seconds, metrics)
+
+    thread = threading.Thread(target=run, name="import-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    # Her modül, bağımlılıkları önceki satırlarda yüklenmiş olarak ölçülür (artımlı süre)
+    total = 0.0
+    print(f"{'modül':24s} {'süre':>10s}")
+    for name in STARTUP_IMPORTS + HEAVY_IMPORTS:
+        seconds = timed_import(name)
+        if seconds is None:
+            status = "yüklü" if name in sys.modules else "kurulu değil"
+            print(f"{name:24s} {status:>10s}")
+            continue
+        total += seconds
+        marker = "  (ertelenmiş)" if name in HEAVY_IMPORTS else ""
+        print(f"{name:24s} {seconds * 1000:8.1f} ms{marker}")
+    print(f"{'toplam':24s} {total * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()